@@ -0,0 +1,14 @@
+"""Root pytest configuration.
+
+Registers the repository's pytest plugins (see tools/). Plugins must be listed
+in the root conftest so they load for every invocation, including plain
+`pytest` without the Makefile.
+"""
+
+pytest_plugins = [
+    "tools.pytest_impact",
+    "tools.pytest_circuit_breaker",
+    "tools.pytest_adaptive_timeouts",
+    "tools.pytest_cost_order",
+    "tools.pytest_result_cache",
+]
@@ -0,0 +1,229 @@
+import http from 'k6/http';
+import { check, sleep } from 'k6';
+import { withRequestId } from './lib/request_id.js';
+
+/**
+ * Markov user-journey load (production-shaped endpoint mix)
+ *
+ * Goal
+ * ----
+ * Drive the API with sessions that follow the transition probabilities and
+ * think times learned from captured traffic (tools/workload_model.py), instead
+ * of the fixed catalog -> lists -> product -> auth loop of the other scripts.
+ *
+ * Execution model
+ * ---------------
+ * - one iteration = one session: start state ~ model.start, then
+ *   request -> think time -> next state ~ model.transitions until "$end"
+ * - constant VUs (closed model) by default; with SESSION_RATE, sessions arrive
+ *   at a fixed rate (open model) like real users do
+ *
+ * Environment variables
+ * ---------------------
+ * - API_URL         Base URL (default: http://localhost:8091)
+ * - DEMO_EMAIL      Login user (default: customer@practicesoftwaretesting.com)
+ * - DEMO_PASSWORD   Login password (default: welcome01)
+ *
+ * - MODEL           Workload model JSON (default: models/journey.json, relative to this script;
+ *                   not shipped, learn it with `make workload-model` first)
+ * - VUS             Number of VUs, or max VUs with SESSION_RATE (default: 10)
+ * - DURATION        Test duration (default: 1m)
+ * - SESSION_RATE    New sessions per minute, "model" for the captured rate (default: unset = closed model)
+ * - THINK_SCALE     Multiplier for learned think times (default: 1; 0.1 compresses 10x)
+ * - MAX_STEPS       Upper bound of requests per session (default: 50)
+ * - AUTH            If "true", replay auth-only states with the demo user's token (default: true)
+ *
+ * Notes
+ * -----
+ * - Only GET/HEAD states are modelled (request bodies are not in access logs).
+ * - IDs in the captured URLs belong to another database; setup() collects
+ *   product / brand / category IDs of the target API and substitutes them.
+ * - Requests are tagged with the state name (e.g. "GET /products/{id}").
+ */
+const MODEL = JSON.parse(open(__ENV.MODEL || './models/journey.json'));
+if (MODEL.format !== 'toolshop.workload-model/v1') {
+  throw new Error(`Unsupported workload model format: ${MODEL.format}`);
+}
+if (!MODEL.id_segment) {
+  throw new Error('Workload model has no id_segment; re-learn it with `make workload-model`');
+}
+// Identifier segments as grouped by tools/endpoints.py, recorded in the model.
+const ID_SEGMENT = new RegExp(MODEL.id_segment);
+
+const VUS = Number(__ENV.VUS || 10);
+const DURATION = String(__ENV.DURATION || '1m');
+const SESSION_RATE = __ENV.SESSION_RATE === 'model' ? MODEL.sessions_per_minute : Number(__ENV.SESSION_RATE || 0);
+
+export const options = {
+  scenarios: {
+    sessions: SESSION_RATE > 0
+      ? {
+        executor: 'constant-arrival-rate',
+        rate: Math.max(1, Math.round(SESSION_RATE)),
+        timeUnit: '1m',
+        duration: DURATION,
+        preAllocatedVUs: VUS,
+        maxVUs: VUS * 5,
+      }
+      : { executor: 'constant-vus', vus: VUS, duration: DURATION },
+  },
+  thresholds: {
+    http_req_failed: ['rate<0.01'],
+    http_req_duration: ['p(95)<800', 'p(99)<1500'],
+  },
+};
+
+const API_BASE_URL = (__ENV.API_URL || 'http://localhost:8091').replace(/\/+$/, '');
+const DEMO_EMAIL = __ENV.DEMO_EMAIL || 'customer@practicesoftwaretesting.com';
+const DEMO_PASSWORD = __ENV.DEMO_PASSWORD || 'welcome01';
+const AUTH_ENABLED = String(__ENV.AUTH || 'true').toLowerCase() === 'true';
+const THINK_SCALE = Number(__ENV.THINK_SCALE || 1);
+const MAX_STEPS = Number(__ENV.MAX_STEPS || 50);
+const END = '$end';
+
+function buildUrl(path) {
+  return `${API_BASE_URL}${path}`;
+}
+
+/**
+ * Turn {key: probability} into cumulative arrays for sampling.
+ */
+function cumulative(probabilities) {
+  const keys = Object.keys(probabilities || {});
+  const cdf = [];
+  let acc = 0;
+  for (const k of keys) {
+    acc += Number(probabilities[k]) || 0;
+    cdf.push(acc);
+  }
+  return { keys, cdf, total: acc };
+}
+
+function sample(dist) {
+  if (dist.keys.length === 0) return END;
+  const r = Math.random() * dist.total;
+  for (let i = 0; i < dist.cdf.length; i++) {
+    if (r < dist.cdf[i]) return dist.keys[i];
+  }
+  return dist.keys[dist.keys.length - 1];
+}
+
+const START = cumulative(MODEL.start);
+const TRANSITIONS = {};
+for (const state of Object.keys(MODEL.transitions || {})) {
+  TRANSITIONS[state] = cumulative(MODEL.transitions[state]);
+}
+
+/**
+ * Inverse-transform sample of the think time (seconds) after `state`.
+ *
+ * think_ms holds the 0%, 5%, ..., 100% quantiles; interpolate between them.
+ */
+function thinkSeconds(state) {
+  const q = MODEL.think_ms && MODEL.think_ms[state];
+  if (!Array.isArray(q) || q.length === 0) return 0;
+  const pos = Math.random() * (q.length - 1);
+  const i = Math.floor(pos);
+  const ms = i + 1 < q.length ? q[i] + (q[i + 1] - q[i]) * (pos - i) : q[i];
+  return (ms / 1000) * THINK_SCALE;
+}
+
+function loginOnce() {
+  const payload = JSON.stringify({ email: DEMO_EMAIL, password: DEMO_PASSWORD });
+  const params = {
+    headers: { 'Content-Type': 'application/json' },
+    tags: { name: 'POST /users/login' },
+  };
+
+  const res = http.post(buildUrl('/users/login'), payload, withRequestId(params));
+  const ok = check(res, { 'login 200': (r) => r.status === 200 });
+  if (!ok) return null;
+
+  const body = res.json();
+  return body && body.access_token ? body.access_token : null;
+}
+
+function collectIds(path, name) {
+  const res = http.get(buildUrl(path), withRequestId({ tags: { name: `setup ${name}` } }));
+  if (res.status !== 200) return [];
+  const body = res.json();
+  const items = Array.isArray(body) ? body : (body && Array.isArray(body.data) ? body.data : []);
+  return items.filter((item) => item && item.id).map((item) => String(item.id));
+}
+
+/**
+ * Pool of target-database IDs for a path segment or query parameter name.
+ */
+function poolFor(name, pools) {
+  const n = String(name || '').toLowerCase();
+  if (n.indexOf('product') >= 0) return pools.products;
+  if (n.indexOf('brand') >= 0) return pools.brands;
+  if (n.indexOf('categor') >= 0) return pools.categories;
+  return null;
+}
+
+function pick(items) {
+  return items[Math.floor(Math.random() * items.length)];
+}
+
+/**
+ * Concrete URL for a state: a captured example with its IDs swapped for
+ * IDs of the target database (IDs without a known pool are kept as captured).
+ */
+function urlFor(state, pools) {
+  const info = MODEL.states[state];
+  const examples = info.examples && info.examples.length ? info.examples : [info.path];
+  const [path, query] = pick(examples).split('?');
+
+  const segments = path.split('/');
+  for (let i = 1; i < segments.length; i++) {
+    if (segments[i] === '{id}' || ID_SEGMENT.test(segments[i])) {
+      const pool = poolFor(segments[i - 1], pools);
+      if (pool && pool.length) segments[i] = pick(pool);
+    }
+  }
+
+  let qs = '';
+  if (query !== undefined) {
+    qs = '?' + query.split('&').map((pair) => {
+      const [key, value] = pair.split('=');
+      const pool = value !== undefined && ID_SEGMENT.test(value) ? poolFor(key, pools) : null;
+      return pool && pool.length ? `${key}=${pick(pool)}` : pair;
+    }).join('&');
+  }
+  return segments.join('/') + qs;
+}
+
+export function setup() {
+  const needsAuth = Object.keys(MODEL.states).some((s) => MODEL.states[s].auth);
+  return {
+    token: AUTH_ENABLED && needsAuth ? loginOnce() : null,
+    pools: {
+      products: collectIds('/products?page=1', 'GET /products'),
+      brands: collectIds('/brands', 'GET /brands'),
+      categories: collectIds('/categories', 'GET /categories'),
+    },
+  };
+}
+
+export default function (data) {
+  let state = sample(START);
+  for (let step = 0; state !== END && step < MAX_STEPS; step++) {
+    const info = MODEL.states[state];
+    if (!info) break;
+
+    if (info.auth && !(data && data.token)) {
+      // Auth replay disabled or login failed: the user leaves here.
+      break;
+    }
+    const params = { tags: { name: state } };
+    if (info.auth) params.headers = { Authorization: `Bearer ${data.token}` };
+
+    const res = http.request(info.method, buildUrl(urlFor(state, data.pools)), null, withRequestId(params));
+    check(res, { 'status < 400': (r) => r.status < 400 });
+
+    const next = sample(TRANSITIONS[state] || cumulative({}));
+    if (next !== END) sleep(thinkSeconds(state));
+    state = next;
+  }
+}
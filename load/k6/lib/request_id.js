@@ -0,0 +1,34 @@
+import exec from 'k6/execution';
+
+/**
+ * Request correlation shared by the k6 scripts in load/k6/.
+ *
+ * Module state lives in the VU's own runtime: every VU imports this file
+ * separately, so the prefix and sequence are per VU.
+ */
+
+// Unique per VU runtime (each VU evaluates the init code), so IDs never repeat
+// across VUs or runs sharing one nginx log.
+const REQUEST_ID_PREFIX = `k6-${Math.random().toString(36).slice(2, 10)}`;
+let requestSeq = 0;
+
+/**
+ * Add a unique X-Request-ID header to request params.
+ *
+ * nginx logs the ID next to its own timings (docker/nginx/timing.conf). The ID
+ * is attached to the k6 samples as metadata rather than a tag (no per-request
+ * series), so tools/request_timing.py can join both sides. The VU and send time
+ * let tools/k6_summary.py correct latency for coordinated omission.
+ */
+export function withRequestId(params) {
+  requestSeq += 1;
+  const id = `${REQUEST_ID_PREFIX}-${__VU}-${requestSeq}`;
+  if (__VU > 0) {
+    // no VU state in setup()
+    exec.vu.metrics.metadata.request_id = id;
+    exec.vu.metrics.metadata.vu = `${REQUEST_ID_PREFIX}-${__VU}`;
+    exec.vu.metrics.metadata.sent_at = String(Date.now());
+  }
+  const headers = Object.assign({}, params.headers, { 'X-Request-ID': id });
+  return Object.assign({}, params, { headers });
+}
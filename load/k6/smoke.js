@@ -1,5 +1,6 @@
 import http from 'k6/http';
 import { check, group, sleep } from 'k6';
+import { withRequestId } from './lib/request_id.js';
 
 /**
  * Smoke load test (cheap and fast)
@@ -54,7 +55,7 @@ function loginOnce() {
     tags: { name: 'POST /users/login' },
   };
 
-  const res = http.post(buildUrl('/users/login'), payload, params);
+  const res = http.post(buildUrl('/users/login'), payload, withRequestId(params));
   const ok = check(res, { 'login 200': (r) => r.status === 200 });
   if (!ok) return { token: null };
 
@@ -79,7 +80,7 @@ export default function (data) {
   let productId = null;
 
   group('catalog', () => {
-    const res = http.get(buildUrl('/products?page=1'), { tags: { name: 'GET /products' } });
+    const res = http.get(buildUrl('/products?page=1'), withRequestId({ tags: { name: 'GET /products' } }));
     check(res, { 'products 200': (r) => r.status === 200 });
 
     if (res.status === 200) {
@@ -90,31 +91,31 @@ export default function (data) {
   });
 
   group('lists', () => {
-    const brands = http.get(buildUrl('/brands'), { tags: { name: 'GET /brands' } });
+    const brands = http.get(buildUrl('/brands'), withRequestId({ tags: { name: 'GET /brands' } }));
     check(brands, { 'brands 200': (r) => r.status === 200 });
 
-    const categories = http.get(buildUrl('/categories'), { tags: { name: 'GET /categories' } });
+    const categories = http.get(buildUrl('/categories'), withRequestId({ tags: { name: 'GET /categories' } }));
     check(categories, { 'categories 200': (r) => r.status === 200 });
   });
 
   if (productId) {
     group('product-detail', () => {
-      const res = http.get(buildUrl(`/products/${productId}`), { tags: { name: 'GET /products/:id' } });
+      const res = http.get(buildUrl(`/products/${productId}`), withRequestId({ tags: { name: 'GET /products/:id' } }));
       check(res, { 'product 200': (r) => r.status === 200 });
     });
 
     group('product-related', () => {
-      const res = http.get(buildUrl(`/products/${productId}/related`), { tags: { name: 'GET /products/:id/related' } });
+      const res = http.get(buildUrl(`/products/${productId}/related`), withRequestId({ tags: { name: 'GET /products/:id/related' } }));
       check(res, { 'related 200': (r) => r.status === 200 });
     });
   }
 
   if (AUTH_ENABLED && data && data.token) {
     group('auth', () => {
-      const res = http.get(buildUrl('/users/me'), {
+      const res = http.get(buildUrl('/users/me'), withRequestId({
         headers: { Authorization: `Bearer ${data.token}` },
         tags: { name: 'GET /users/me' },
-      });
+      }));
       check(res, { 'me 200': (r) => r.status === 200 });
     });
   }
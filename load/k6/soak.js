@@ -1,5 +1,6 @@
 import http from 'k6/http';
 import { check, group, sleep } from 'k6';
+import { withRequestId } from './lib/request_id.js';
 
 /**
  * Soak test (sustained moderate load)
@@ -49,10 +50,10 @@ let tokenExpMs = 0;
 function login() {
   const payload = JSON.stringify({ email: DEMO_EMAIL, password: DEMO_PASSWORD });
 
-  const res = http.post(buildUrl('/users/login'), payload, {
+  const res = http.post(buildUrl('/users/login'), payload, withRequestId({
     headers: { 'Content-Type': 'application/json' },
     tags: { name: 'POST /users/login' },
-  });
+  }));
 
   const ok = check(res, { 'login 200': (r) => r.status === 200 });
   if (!ok) return;
@@ -84,7 +85,7 @@ export default function () {
   let productId = null;
 
   group('catalog', () => {
-    const res = http.get(buildUrl('/products?page=1'), { tags: { name: 'GET /products' } });
+    const res = http.get(buildUrl('/products?page=1'), withRequestId({ tags: { name: 'GET /products' } }));
     check(res, { 'products 200': (r) => r.status === 200 });
 
     if (res.status === 200) {
@@ -96,10 +97,10 @@ export default function () {
   jitter();
 
   group('lists', () => {
-    const brands = http.get(buildUrl('/brands'), { tags: { name: 'GET /brands' } });
+    const brands = http.get(buildUrl('/brands'), withRequestId({ tags: { name: 'GET /brands' } }));
     check(brands, { 'brands 200': (r) => r.status === 200 });
 
-    const categories = http.get(buildUrl('/categories'), { tags: { name: 'GET /categories' } });
+    const categories = http.get(buildUrl('/categories'), withRequestId({ tags: { name: 'GET /categories' } }));
     check(categories, { 'categories 200': (r) => r.status === 200 });
   });
 
@@ -107,14 +108,14 @@ export default function () {
 
   if (productId) {
     group('product-detail', () => {
-      const res = http.get(buildUrl(`/products/${productId}`), { tags: { name: 'GET /products/:id' } });
+      const res = http.get(buildUrl(`/products/${productId}`), withRequestId({ tags: { name: 'GET /products/:id' } }));
       check(res, { 'product 200': (r) => r.status === 200 });
     });
 
     jitter(0.2, 1.2);
 
     group('product-related', () => {
-      const res = http.get(buildUrl(`/products/${productId}/related`), { tags: { name: 'GET /products/:id/related' } });
+      const res = http.get(buildUrl(`/products/${productId}/related`), withRequestId({ tags: { name: 'GET /products/:id/related' } }));
       check(res, { 'related 200': (r) => r.status === 200 });
     });
   }
@@ -125,10 +126,10 @@ export default function () {
     ensureToken();
     if (!token) return;
 
-    const res = http.get(buildUrl('/users/me'), {
+    const res = http.get(buildUrl('/users/me'), withRequestId({
       headers: { Authorization: `Bearer ${token}` },
       tags: { name: 'GET /users/me' },
-    });
+    }));
     check(res, { 'me 200': (r) => r.status === 200 });
   });
 
@@ -6,6 +6,11 @@ This file centralizes:
 - Derivation of common endpoint paths from OpenAPI
 - Sample data fixtures (product/category/brand)
 - Optional auth token fixture (skips if login is not supported or creds are invalid)
+- Compiled OpenAPI response-schema validators (see tools/schema_validation.py)
+- Fail-fast circuit breaker on the shared session (see tools/pytest_circuit_breaker.py)
+- Adaptive per-endpoint timeouts on the shared session (see tools/pytest_adaptive_timeouts.py)
+- A unique X-Request-ID on every request, joinable with the nginx timing log
+  (see tools/request_timing.py)
 
 Environment variables
 ---------------------
@@ -22,17 +27,43 @@ Environment variables
     Defaults:
       DEMO_EMAIL="customer@practicesoftwaretesting.com"
       DEMO_PASSWORD="welcome01"
+
+- SCHEMA_MAX_ITEMS / SCHEMA_SAMPLING / SCHEMA_SAMPLING_SEED:
+    List sampling for response-schema validation.
+    Defaults: 5 / "first" / 0
+
+- CIRCUIT_BREAKER_THRESHOLD / CIRCUIT_BREAKER_COOLDOWN / CIRCUIT_BREAKER_ACTION:
+    Consecutive transport failures that trip the breaker (0 disables), seconds
+    until a half-open probe, and "fail" or "skip" for tests while it is open.
+    Defaults: 3 / 10 / "fail"
+
+- ADAPTIVE_TIMEOUTS / API_LATENCY_STORE:
+    Derive request timeouts from per-endpoint p99 latency, and where the
+    latency samples are persisted across runs.
+    Defaults: "true" / ".cache/api-latency.json"
+
+- API_CLIENT_TIMINGS:
+    If set, a JSONL file receiving one line per request (request id, endpoint,
+    status, client-side seconds) for `python -m tools.request_timing`.
+    Default: unset (nothing is written)
 """
 
 from __future__ import annotations
 
+import json
 import os
 import re
-from typing import Any, Optional
+import uuid
+from typing import IO, Any, Iterator, Optional
 
 import pytest
 import requests
 
+from tools.endpoints import endpoint_key
+from tools.pytest_adaptive_timeouts import AdaptiveTimeouts
+from tools.pytest_circuit_breaker import GATEWAY_ERROR_STATUSES, CircuitBreaker
+from tools.schema_validation import ValidatorRegistry
+
 DEFAULT_TIMEOUT_SECONDS = 30
 PROBE_TIMEOUT_SECONDS = 15
 
@@ -174,19 +205,107 @@ def _replace_first_path_param(path: str, value: str) -> str:
     return re.sub(r"\{[^}]+\}", value, path, count=1)
 
 
+class _ApiSession(requests.Session):
+    """requests.Session with a circuit breaker and adaptive per-endpoint timeouts.
+
+    - While the breaker is open, requests raise `requests.ConnectionError`
+      immediately instead of waiting for the timeout.
+    - Idempotent requests to endpoints with enough latency history use a
+      timeout derived from their p99 (the caller's timeout is the ceiling). The
+      first few per endpoint are warm-up and only reported when slower than it.
+      Otherwise, if it expires, the request is retried once with another
+      adaptive window when both fit under the ceiling, and fails otherwise;
+      either way it is reported.
+    - Every request carries a unique X-Request-ID (unless the caller set one),
+      and is appended to `timing_log` (if given) for correlation with nginx.
+    """
+
+    def __init__(
+        self, breaker: CircuitBreaker, timeouts: AdaptiveTimeouts, timing_log: Optional[IO[str]] = None
+    ) -> None:
+        super().__init__()
+        self.breaker = breaker
+        self.timeouts = timeouts
+        self.timing_log = timing_log
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> requests.Response:  # type: ignore[override]
+        reason = self.breaker.before_call()
+        if reason is not None:
+            raise requests.ConnectionError(f"{method} {url}: {reason}")
+        endpoint = endpoint_key(method, url, kwargs.get("params"))
+        headers = dict(kwargs.get("headers") or {})
+        if not any(k.lower() == "x-request-id" for k in headers):
+            headers["X-Request-ID"] = f"pytest-{uuid.uuid4().hex}"
+        kwargs["headers"] = headers
+        adaptive = self.timeouts.timeout_for(method, endpoint, kwargs.get("timeout"))
+        # Warm-up requests keep the caller's timeout; the adaptive one only flags them.
+        watched = adaptive if adaptive is not None and self.timeouts.warming_up(endpoint) else None
+        if watched is not None:
+            adaptive = None
+        try:
+            try:
+                r = super().request(method, url, *args, **({**kwargs, "timeout": adaptive} if adaptive else kwargs))
+            except requests.Timeout:
+                if adaptive is None:
+                    raise
+                retry = self.timeouts.retry_timeout(adaptive, kwargs["timeout"])
+                if retry is None:
+                    self.timeouts.record_exceeded(endpoint, adaptive, None)
+                    raise
+                try:
+                    r = super().request(method, url, *args, **{**kwargs, "timeout": retry})
+                except requests.Timeout:
+                    self.timeouts.record_exceeded(endpoint, adaptive, None)
+                    raise
+                self.timeouts.record_exceeded(endpoint, adaptive, r.elapsed.total_seconds())
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            self.breaker.record_failure(f"{method} {url}: {type(exc).__name__}")
+            raise
+        if r.status_code in GATEWAY_ERROR_STATUSES:
+            self.breaker.record_failure(f"{method} {url}: HTTP {r.status_code}")
+        else:
+            self.breaker.record_success()
+            self.timeouts.observe(endpoint, r.elapsed.total_seconds())
+        if watched is not None and r.elapsed.total_seconds() > watched:
+            self.timeouts.record_exceeded(endpoint, watched, r.elapsed.total_seconds(), warmup=True)
+        if self.timing_log is not None:
+            record = {
+                "request_id": r.request.headers.get("X-Request-ID"),
+                "endpoint": endpoint,
+                "status": r.status_code,
+                "seconds": round(r.elapsed.total_seconds(), 6),
+            }
+            self.timing_log.write(json.dumps(record) + "\n")
+        return r
+
+
 # -----------------------------------------------------------------------------
 # Core fixtures
 # -----------------------------------------------------------------------------
 @pytest.fixture(scope="session")
-def http() -> requests.Session:
+def http(circuit_breaker: CircuitBreaker, adaptive_timeouts: AdaptiveTimeouts) -> Iterator[requests.Session]:
     """Create a shared HTTP session for the test session.
 
-    Returns:
+    Args:
+        circuit_breaker: Session-wide breaker (tools/pytest_circuit_breaker.py).
+        adaptive_timeouts: Per-endpoint timeout policy (tools/pytest_adaptive_timeouts.py).
+
+    Yields:
         A configured requests.Session with JSON accept header.
     """
-    s = requests.Session()
+    timings_path = _env("API_CLIENT_TIMINGS", "")
+    timing_log: Optional[IO[str]] = None
+    if timings_path:
+        os.makedirs(os.path.dirname(timings_path) or ".", exist_ok=True)
+        timing_log = open(timings_path, "a", encoding="utf-8")
+    s = _ApiSession(circuit_breaker, adaptive_timeouts, timing_log)
     s.headers.update({"accept": "application/json"})
-    return s
+    try:
+        yield s
+    finally:
+        s.close()
+        if timing_log is not None:
+            timing_log.close()
 
 
 @pytest.fixture(scope="session")
@@ -276,6 +395,28 @@ def openapi(openapi_spec: dict[str, Any], openapi_paths: dict[str, Any], openapi
     return {"spec": openapi_spec, "paths": openapi_paths, "spec_url": openapi_spec_url}
 
 
+@pytest.fixture(scope="session")
+def schema_validator(openapi_spec: dict[str, Any]) -> ValidatorRegistry:
+    """Return a session-wide registry of compiled response-schema validators.
+
+    `$ref`s are resolved and schemas compiled once per operation/status, so
+    validating many responses stays cheap. Large list pages are sampled
+    (first K items by default) to bound the per-response cost.
+
+    Args:
+        openapi_spec: Parsed OpenAPI document.
+
+    Returns:
+        A ValidatorRegistry bound to the spec.
+    """
+    return ValidatorRegistry(
+        openapi_spec,
+        max_items=int(_env("SCHEMA_MAX_ITEMS", "5")),
+        sampling=_env("SCHEMA_SAMPLING", "first").lower(),
+        seed=int(_env("SCHEMA_SAMPLING_SEED", "0")),
+    )
+
+
 # -----------------------------------------------------------------------------
 # Path fixtures (derived from OpenAPI with safe fallbacks)
 # -----------------------------------------------------------------------------
@@ -20,6 +20,8 @@ from urllib.parse import urlencode
 import pytest
 import requests
 
+from tools.schema_validation import ValidatorRegistry
+
 DEFAULT_TIMEOUT_SECONDS = 30
 PRODUCTS_RESPONSE_TIME_LIMIT_SECONDS = 5.0
 
@@ -333,6 +335,44 @@ def test_products_list_has_minimum_fields(
     assert any(k in first for k in ("id", "uuid", "ulid", "slug", "code"))
 
 
+@pytest.mark.regression
+def test_products_list_matches_openapi_schema(
+    http: requests.Session,
+    api_base_url: str,
+    products_list_path: str,
+    schema_validator: ValidatorRegistry,
+) -> None:
+    """Validate the products list body against its OpenAPI response schema (sampled items)."""
+    r = http.get(_absolute(api_base_url, products_list_path), timeout=DEFAULT_TIMEOUT_SECONDS)
+    assert r.status_code == 200
+
+    if not schema_validator.has_schema("get", products_list_path, r.status_code):
+        problem = schema_validator.schema_problem("get", products_list_path, r.status_code)
+        pytest.skip(f"No usable response schema for GET {products_list_path}" + (f" ({problem})" if problem else ""))
+
+    errors = schema_validator.validate("get", products_list_path, r.status_code, r.json())
+    assert not errors, "Schema violations:\n" + "\n".join(errors)
+
+
+@pytest.mark.regression
+def test_product_details_matches_openapi_schema(
+    http: requests.Session,
+    sample_product_details_url: str,
+    product_details_path: str,
+    schema_validator: ValidatorRegistry,
+) -> None:
+    """Validate a product details body against its OpenAPI response schema."""
+    r = http.get(sample_product_details_url, timeout=DEFAULT_TIMEOUT_SECONDS)
+    assert r.status_code == 200
+
+    if not schema_validator.has_schema("get", product_details_path, r.status_code):
+        problem = schema_validator.schema_problem("get", product_details_path, r.status_code)
+        pytest.skip(f"No usable response schema for GET {product_details_path}" + (f" ({problem})" if problem else ""))
+
+    errors = schema_validator.validate("get", product_details_path, r.status_code, r.json())
+    assert not errors, "Schema violations:\n" + "\n".join(errors)
+
+
 @pytest.mark.regression
 def test_product_details_endpoint_returns_same_identifier(
     http: requests.Session,
@@ -677,6 +717,7 @@ def test_cart_get_requires_auth_if_present(
 
 
 @pytest.mark.regression
+@pytest.mark.no_result_cache
 def test_products_endpoint_response_time_is_reasonable(
     http: requests.Session, api_base_url: str, products_list_path: str
 ) -> None:
@@ -0,0 +1,96 @@
+"""Unit tests for the timeout policy and latency store in tools/pytest_adaptive_timeouts.py."""
+
+from pathlib import Path
+from typing import Any
+
+from tools.pytest_adaptive_timeouts import (
+    MAX_SAMPLES,
+    AdaptiveTimeouts,
+    load_store,
+    percentile,
+    save_store,
+    update_store,
+)
+
+ENDPOINT = "GET /products/{id}"
+
+
+def _policy(samples: list[float], **kwargs: Any) -> AdaptiveTimeouts:
+    return AdaptiveTimeouts(history={ENDPOINT: samples}, **kwargs)
+
+
+def test_percentile_is_nearest_rank() -> None:
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 99) == 99.0
+    assert percentile(samples, 50) == 50.0
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_timeout_is_multiplier_times_p99_clamped_to_floor_and_ceiling() -> None:
+    slow = _policy([0.1] * 19 + [1.0] * 1, multiplier=3.0, floor=2.0, min_samples=20)
+    fast = _policy([0.05] * 20, floor=2.0, min_samples=20)
+
+    assert slow.timeout_for("GET", ENDPOINT, 30) == 3.0
+    assert fast.timeout_for("GET", ENDPOINT, 30) == 2.0  # floor
+    assert slow.timeout_for("GET", ENDPOINT, 3) is None  # not below the caller's ceiling
+
+
+def test_timeout_is_only_adapted_for_idempotent_requests_with_history() -> None:
+    policy = _policy([0.05] * 20, min_samples=20)
+
+    assert policy.timeout_for("POST", ENDPOINT, 30) is None
+    assert policy.timeout_for("GET", ENDPOINT, (3.05, 30)) is None  # (connect, read) tuple
+    assert policy.timeout_for("GET", ENDPOINT, None) is None
+    assert policy.timeout_for("GET", "GET /brands", 30) is None
+    assert _policy([0.05] * 19, min_samples=20).timeout_for("GET", ENDPOINT, 30) is None
+    assert _policy([0.05] * 20, enabled=False).timeout_for("GET", ENDPOINT, 30) is None
+
+
+def test_retry_gets_one_more_window_only_when_both_fit() -> None:
+    assert AdaptiveTimeouts.retry_timeout(2.0, 30) == 2.0
+    assert AdaptiveTimeouts.retry_timeout(2.0, 4.0) == 2.0
+    assert AdaptiveTimeouts.retry_timeout(2.5, 4.0) is None
+
+
+def test_first_requests_per_endpoint_are_warm_up() -> None:
+    policy = _policy([0.05] * 20, warmup=2)
+
+    assert [policy.warming_up(ENDPOINT) for _ in range(3)] == [True, True, False]
+    assert policy.warming_up("GET /brands")
+
+
+def test_merged_history_appends_this_run_and_trims() -> None:
+    policy = _policy([1.0] * MAX_SAMPLES)
+    policy.observe(ENDPOINT, 0.123456)
+    policy.observe("GET /brands", 0.2)
+
+    merged = policy.merged_history()
+    assert len(merged[ENDPOINT]) == MAX_SAMPLES
+    assert merged[ENDPOINT][-1] == 0.1235
+    assert merged["GET /brands"] == [0.2]
+    assert policy.history[ENDPOINT][-1] == 1.0  # loaded history untouched
+
+
+def test_update_store_keeps_samples_saved_by_a_concurrent_run(tmp_path: Path) -> None:
+    store = tmp_path / "api-latency.json"
+    first, second = AdaptiveTimeouts(load_store(store)), AdaptiveTimeouts(load_store(store))
+    first.observe(ENDPOINT, 0.1)
+    second.observe(ENDPOINT, 0.2)
+
+    update_store(store, first)
+    update_store(store, second)
+
+    assert load_store(store) == {ENDPOINT: [0.1, 0.2]}
+
+
+def test_foreign_or_broken_store_loads_empty(tmp_path: Path) -> None:
+    store = tmp_path / "api-latency.json"
+    store.write_text("{not json", encoding="utf-8")
+    assert load_store(store) == {}
+
+    store.write_text('{"format": "other", "endpoints": {"x": [1]}}', encoding="utf-8")
+    assert load_store(store) == {}
+
+    save_store(store, {ENDPOINT: [0.5]})
+    assert load_store(store) == {ENDPOINT: [0.5]}
@@ -0,0 +1,85 @@
+"""Unit tests for the CircuitBreaker state machine in tools/pytest_circuit_breaker.py."""
+
+from tools.pytest_circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(threshold: int = 3, cooldown: float = 10.0) -> tuple[CircuitBreaker, FakeClock]:
+    clock = FakeClock()
+    return CircuitBreaker(threshold=threshold, cooldown=cooldown, clock=clock), clock
+
+
+def test_opens_after_threshold_consecutive_failures() -> None:
+    breaker, _ = _breaker()
+    for _ in range(2):
+        breaker.record_failure("ConnectionError")
+        assert breaker.state == CLOSED
+    breaker.record_failure("502 Bad Gateway")
+
+    assert breaker.state == OPEN
+    assert breaker.trips == 1
+    reason = breaker.before_call()
+    assert reason is not None and "3 consecutive failure(s)" in reason and "502 Bad Gateway" in reason
+    assert breaker.short_circuited == 1
+
+
+def test_success_resets_the_failure_count() -> None:
+    breaker, _ = _breaker()
+    breaker.record_failure("timeout")
+    breaker.record_failure("timeout")
+    breaker.record_success()
+    breaker.record_failure("timeout")
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 1
+
+
+def test_half_open_probe_closes_on_success() -> None:
+    breaker, clock = _breaker(threshold=1)
+    breaker.record_failure("timeout")
+    clock.now += 9.9
+    assert breaker.open_reason() is not None
+
+    clock.now += 0.1
+    assert breaker.open_reason() is None
+    assert breaker.before_call() is None
+    assert breaker.state == HALF_OPEN
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.before_call() is None
+
+
+def test_failed_probe_reopens_for_a_full_cooldown() -> None:
+    breaker, clock = _breaker(threshold=2)
+    breaker.record_failure("timeout")
+    breaker.record_failure("timeout")
+    clock.now += 10.0
+    assert breaker.before_call() is None  # half-open probe
+
+    breaker.record_failure("timeout")
+
+    assert breaker.state == OPEN
+    assert breaker.opened_at == clock.now
+    assert breaker.trips == 1  # a failed probe is not a new trip
+    clock.now += 5.0
+    assert breaker.before_call() is not None
+
+
+def test_threshold_zero_disables_the_breaker() -> None:
+    breaker, _ = _breaker(threshold=0)
+    for _ in range(10):
+        breaker.record_failure("timeout")
+
+    assert not breaker.enabled
+    assert breaker.state == CLOSED
+    assert breaker.before_call() is None
@@ -0,0 +1,113 @@
+"""Unit tests for cost-aware ordering in tools/pytest_cost_order.py."""
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import pytest
+
+from tools.pytest_cost_order import (
+    _RUN_KEY,
+    UNKNOWN_FAILURE_PRIOR,
+    load_history,
+    locality_key,
+    order_items,
+    pytest_sessionfinish,
+    record_run,
+    score,
+    update_entry,
+)
+
+
+def _item(nodeid: str, module_fixture: Optional[str] = None, param: Optional[int] = None) -> Any:
+    """Stand-in for a collected item, optionally using a module-scoped fixture."""
+    fixturedefs = {"http": [SimpleNamespace(scope="function")]}
+    if module_fixture:
+        fixturedefs[module_fixture] = [SimpleNamespace(scope="module")]
+    module = nodeid.split("::", 1)[0]
+    callspec = None
+    if param is not None:
+        callspec = SimpleNamespace(params={module_fixture: "x"}, indices={module_fixture: param})
+    return SimpleNamespace(
+        nodeid=nodeid,
+        path=Path(module),
+        _fixtureinfo=SimpleNamespace(name2fixturedefs=fixturedefs),
+        callspec=callspec,
+        getparent=lambda cls: SimpleNamespace(nodeid=module),
+    )
+
+
+def _entry(duration: float, failure_rate: float, last_failed: bool = False) -> dict[str, Any]:
+    return {"duration": duration, "failure_rate": failure_rate, "runs": 5, "last_failed": last_failed}
+
+
+def test_score_prefers_likely_failures_and_cheap_tests() -> None:
+    assert score(_entry(1.0, 0.5), 1.0) > score(_entry(1.0, 0.1), 1.0)
+    assert score(_entry(0.1, 0.1), 1.0) > score(_entry(1.0, 0.1), 1.0)
+    # Stable tests still order by duration (failure-rate floor), unknown ones go early.
+    assert score(_entry(0.1, 0.0), 1.0) > score(_entry(1.0, 0.0), 1.0) > 0
+    assert score(None, 1.0) == UNKNOWN_FAILURE_PRIOR
+
+
+def test_update_entry_smooths_failures_and_durations() -> None:
+    first = update_entry(None, 2.0, failed=True)
+    second = update_entry(first, 1.0, failed=False)
+
+    assert first == {"duration": 2.0, "failure_rate": 1.0, "runs": 1, "last_failed": True}
+    assert second == {"duration": 1.5, "failure_rate": 0.7, "runs": 2, "last_failed": False}
+
+
+def test_items_without_shared_fixtures_are_ordered_by_score() -> None:
+    items = [_item("t.py::stable_slow"), _item("t.py::flaky"), _item("t.py::new"), _item("t.py::stable_fast")]
+    history = {
+        "t.py::stable_slow": _entry(3.0, 0.0),
+        "t.py::flaky": _entry(1.0, 0.9),
+        "t.py::stable_fast": _entry(0.1, 0.0),
+    }
+
+    ordered = [it.nodeid for it in order_items(items, history, "cost")]
+    assert ordered == ["t.py::flaky", "t.py::new", "t.py::stable_fast", "t.py::stable_slow"]
+
+
+def test_ff_puts_last_failures_first() -> None:
+    items = [_item("t.py::flaky"), _item("t.py::failed_last")]
+    history = {"t.py::flaky": _entry(0.1, 0.9), "t.py::failed_last": _entry(5.0, 0.3, last_failed=True)}
+
+    assert [it.nodeid for it in order_items(items, history, "ff")][0] == "t.py::failed_last"
+
+
+def test_module_fixture_users_stay_contiguous() -> None:
+    a1, a2 = _item("a.py::t1", "db"), _item("a.py::t2", "db")
+    b = _item("b.py::t1")
+    history = {"a.py::t1": _entry(0.1, 0.9), "a.py::t2": _entry(5.0, 0.0), "b.py::t1": _entry(0.5, 0.5)}
+
+    assert locality_key(a1) == locality_key(a2) == "module:a.py"
+    assert locality_key(b) == "b.py::t1"
+    # a.py's best test outranks b.py, so its whole group goes first.
+    assert [it.nodeid for it in order_items([b, a2, a1], history, "cost")] == ["a.py::t1", "a.py::t2", "b.py::t1"]
+
+
+def test_parametrized_instances_of_a_shared_fixture_form_separate_groups() -> None:
+    assert locality_key(_item("a.py::t[0]", "db", param=0)) != locality_key(_item("a.py::t[1]", "db", param=1))
+
+
+def test_record_run_skips_skip_only_tests(tmp_path: Path) -> None:
+    path = tmp_path / "test-history.json"
+    record_run(path, {"t.py::a": [0.2, False, False], "t.py::skipped": [0.0, False, True]})
+    record_run(path, {"t.py::a": [0.4, True, False]})
+
+    history = load_history(path)
+    assert set(history) == {"t.py::a"}
+    assert history["t.py::a"]["runs"] == 2
+    assert history["t.py::a"]["last_failed"] is True
+
+
+@pytest.mark.parametrize(("mode", "written"), [("off", False), ("cost", True)])
+def test_history_is_only_written_by_ordered_runs(tmp_path: Path, mode: str, written: bool) -> None:
+    path = tmp_path / "test-history.json"
+    options = {"collectonly": False, "test_order": mode, "test_history": str(path)}
+    config = SimpleNamespace(stash={_RUN_KEY: {"t.py::a": [0.2, False, False]}}, getoption=options.__getitem__)
+
+    pytest_sessionfinish(SimpleNamespace(config=config), 0)
+
+    assert path.exists() is written
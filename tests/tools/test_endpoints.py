@@ -0,0 +1,18 @@
+"""Unit tests for endpoint grouping in tools/endpoints.py."""
+
+from tools.endpoints import ID_SEGMENT, endpoint_key
+
+
+def test_endpoint_key_collapses_ids_and_keeps_parameter_names() -> None:
+    assert endpoint_key("get", "http://h/products/01HV8J8ZK7Q3M2N4P5R6S7T8V9") == "GET /products/{id}"
+    assert endpoint_key("GET", "http://h/products?page=2", {"sort": "name,asc"}) == "GET /products?page,sort"
+    assert endpoint_key("GET", "http://h/brands/42", [("x", 1)]) == "GET /brands/{id}?x"
+    assert endpoint_key("GET", "/products/search?q=&page=1") == "GET /products/search?page,q"
+    assert endpoint_key("GET", "") == "GET /"
+
+
+def test_id_segment_matches_numbers_uuids_and_ulids_only() -> None:
+    for seg in ("42", "3f2b8c1e-7d4a-4b1f-9a62-0c5d8e7f6a1b", "01HV8J8ZK7Q3M2N4P5R6S7T8V9"):
+        assert ID_SEGMENT.match(seg), seg
+    for seg in ("products", "me", "tree", "v1"):
+        assert not ID_SEGMENT.match(seg), seg
@@ -0,0 +1,59 @@
+"""Unit tests for the coordinated-omission correction in tools/k6_summary.py.
+
+The samples are synthetic: one VU runs an iteration every second that sends
+"GET /products" and, right after it, "GET /brands", so the VU's back-to-back
+spacing (50ms) differs from its cadence per request (1s). No stack is needed.
+"""
+
+from typing import Optional
+
+from tools.k6_summary import ALL_ENDPOINTS, K6Aggregator
+
+ITERATION_MS = 1000.0
+BACK_TO_BACK_MS = 50.0
+LATENCY_MS = 40.0
+
+
+def _run(iterations: int, stall_at: Optional[int] = None, stall_ms: float = 0.0) -> K6Aggregator:
+    """Feed `iterations` iterations of one VU; iteration `stall_at` has a slow first request.
+
+    Args:
+        iterations: Number of iterations.
+        stall_at: Index of the iteration whose "GET /products" takes `stall_ms`.
+        stall_ms: Latency of the stalled request (ms).
+
+    Returns:
+        The aggregator after all samples.
+    """
+    agg = K6Aggregator()
+    now = 0.0
+    for i in range(iterations):
+        first = stall_ms if i == stall_at else LATENCY_MS
+        for name, latency in (("GET /products", first), ("GET /brands", LATENCY_MS)):
+            metadata = {"vu": "k6-test-1", "sent_at": str(now)}
+            agg.add_point("http_req_duration", latency, {"name": name}, None, metadata)
+            now += max(latency, BACK_TO_BACK_MS)
+        # The VU sleeps out the rest of the iteration (none left after a stall).
+        now = max(now, (i + 1) * ITERATION_MS)
+    return agg
+
+
+def test_steady_run_adds_no_synthetic_samples() -> None:
+    agg = _run(20)
+
+    assert agg.synthetic == 0
+    assert agg.series[ALL_ENDPOINTS].corrected is not None
+    assert agg.series[ALL_ENDPOINTS].corrected.count == 40
+
+
+def test_stall_adds_one_sample_per_missed_iteration() -> None:
+    # 5s stall at a 1s cadence: the sends due after 1s..4s were omitted and get
+    # the latencies 4s, 3s, 2s and 1s. Mixing in the 50ms back-to-back spacing
+    # would shrink E and add more.
+    agg = _run(20, stall_at=10, stall_ms=5000.0)
+
+    assert agg.synthetic == 4
+    corrected = agg.series["GET /products"].corrected
+    assert corrected is not None
+    assert corrected.count == 20 + 4
+    assert agg.series["GET /brands"].corrected.count == 20
@@ -0,0 +1,118 @@
+"""Unit tests for OpenAPI diff -> topics -> selected tests (tools/openapi_impact.py, tools/pytest_impact.py)."""
+
+import copy
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from tools.openapi_impact import diff_specs, topics_for_diff
+from tools.pytest_impact import item_topics, pytest_collection_modifyitems
+
+
+def _op(schema: str, params: tuple[str, ...] = ()) -> dict[str, Any]:
+    return {
+        "parameters": [{"name": p, "in": "query", "schema": {"type": "string"}} for p in params],
+        "responses": {"200": {"content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{schema}"}}}}},
+    }
+
+
+SPEC: dict[str, Any] = {
+    "openapi": "3.0.0",
+    "info": {"title": "Toolshop", "version": "5.0.0"},
+    "paths": {
+        "/products": {"get": _op("ProductList", ("sort", "page"))},
+        "/products/{productId}": {"get": _op("Product")},
+        "/products/{productId}/related": {"get": _op("ProductList")},
+        "/brands": {"get": _op("Brand")},
+    },
+    "components": {
+        "schemas": {
+            "Product": {"type": "object", "properties": {"name": {"type": "string"}}},
+            "ProductList": {"type": "array", "items": {"$ref": "#/components/schemas/Product"}},
+            "Brand": {"type": "object"},
+        }
+    },
+}
+
+
+def _topics(change: Any) -> set[str]:
+    new = copy.deepcopy(SPEC)
+    change(new)
+    return topics_for_diff(diff_specs(SPEC, new))
+
+
+def test_identical_specs_have_no_diff() -> None:
+    assert diff_specs(SPEC, copy.deepcopy(SPEC)).empty
+
+
+def test_parameter_change_maps_to_its_param_topic_only() -> None:
+    def change(spec: dict[str, Any]) -> None:
+        spec["paths"]["/products"]["get"]["parameters"][0]["schema"]["enum"] = ["name,asc"]
+
+    assert _topics(change) == {"param:sort"}
+
+
+def test_shared_schema_change_reaches_every_operation_using_it() -> None:
+    def change(spec: dict[str, Any]) -> None:
+        spec["components"]["schemas"]["Product"]["required"] = ["name"]
+
+    assert _topics(change) == {"products-list", "products-details", "products-related"}
+
+
+def test_added_operation_and_info_change() -> None:
+    def change(spec: dict[str, Any]) -> None:
+        spec["paths"]["/categories/tree"] = {"get": _op("Brand")}
+        spec["info"]["version"] = "5.1.0"
+
+    assert _topics(change) == {"categories", "openapi"}
+
+
+def _item(name: str, *fixtures: str) -> SimpleNamespace:
+    return SimpleNamespace(name=name, originalname=name, _fixtureinfo=SimpleNamespace(argnames=fixtures))
+
+
+def test_item_topics_use_own_fixtures_and_name_keywords() -> None:
+    assert item_topics(_item("test_products_list_supports_sort", "http", "products_list_path")) == {
+        "products-list",
+        "param:sort",
+    }
+    assert item_topics(_item("test_related_products_are_listed", "http", "sample_product_id")) == {
+        "products-details",
+        "products-related",
+    }
+    # "me" must be a whole token, not part of "name".
+    assert item_topics(_item("test_product_has_name", "http")) == set()
+
+
+def _run_selection(tmp_path: Path, impact: dict[str, Any], mode: str, items: list[Any]) -> list[Any]:
+    path = tmp_path / "impact.json"
+    path.write_text(json.dumps(impact), encoding="utf-8")
+    deselected: list[Any] = []
+    options = {"impact": str(path), "impact_mode": mode}
+    config = SimpleNamespace(
+        getoption=options.__getitem__,
+        hook=SimpleNamespace(pytest_deselected=lambda items: deselected.extend(items)),
+        pluginmanager=SimpleNamespace(get_plugin=lambda name: None),
+    )
+    pytest_collection_modifyitems(config, items)
+    return deselected
+
+
+def test_affected_tests_run_first_or_alone(tmp_path: Path) -> None:
+    brands = _item("test_brands_list", "brands_list_path")
+    sort = _item("test_products_sort", "products_list_path")
+    details = _item("test_product_details", "product_details_path")
+    impact = {"mode": "selective", "topics": ["param:sort"]}
+
+    items = [brands, details, sort]
+    assert _run_selection(tmp_path, impact, "first", items) == []
+    assert items == [sort, brands, details]
+
+    items = [brands, details, sort]
+    assert _run_selection(tmp_path, impact, "only", items) == [brands, details]
+    assert items == [sort]
+
+    items = [brands, details, sort]
+    _run_selection(tmp_path, impact, "rest", items)
+    assert items == [brands, details]
@@ -0,0 +1,124 @@
+"""Unit tests for key derivation and TTL handling in tools/pytest_result_cache.py."""
+
+import importlib.util
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+from typing import Any
+
+import pytest
+
+from tools import pytest_result_cache
+from tools.pytest_result_cache import ResultCache
+
+FINGERPRINT = {"image": "sha256:aaa", "openapi": "o1", "db": "d1"}
+
+TEST_MODULE = '''
+def helper():
+    return 1
+
+
+def test_it(sample):
+    assert helper() == 1
+'''
+
+FIXTURE_MODULE = '''
+def sample():
+    return {"id": "01A"}
+'''
+
+
+def _module(path: Path, source: str) -> ModuleType:
+    path.write_text(source, encoding="utf-8")
+    spec = importlib.util.spec_from_file_location(f"rc_{path.stem}_{abs(hash(source))}", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _item(test_module: ModuleType, fixture_module: ModuleType, value: Any) -> Any:
+    return SimpleNamespace(
+        nodeid="tests/api/test_x.py::test_it",
+        function=test_module.test_it,
+        _fixtureinfo=SimpleNamespace(name2fixturedefs={"sample": [SimpleNamespace(func=fixture_module.sample)]}),
+        funcargs={"sample": value, "request": object()},
+    )
+
+
+@pytest.fixture()
+def modules(tmp_path: Path) -> tuple[ModuleType, ModuleType]:
+    return _module(tmp_path / "test_x.py", TEST_MODULE), _module(tmp_path / "fixtures_x.py", FIXTURE_MODULE)
+
+
+def _key(tmp_path: Path, test_module: ModuleType, fixture_module: ModuleType, value: Any, **fingerprint: str) -> str:
+    cache = ResultCache(tmp_path / "result-cache.json", 3600, {**FINGERPRINT, **fingerprint})
+    return cache.key_for(_item(test_module, fixture_module, value))
+
+
+def test_key_is_stable_for_identical_inputs(tmp_path: Path, modules: tuple[ModuleType, ModuleType]) -> None:
+    assert _key(tmp_path, *modules, {"id": "01A"}) == _key(tmp_path, *modules, {"id": "01A"})
+
+
+def test_key_changes_with_fixture_values_and_environment(
+    tmp_path: Path, modules: tuple[ModuleType, ModuleType]
+) -> None:
+    base = _key(tmp_path, *modules, {"id": "01A"})
+
+    assert _key(tmp_path, *modules, {"id": "01B"}) != base
+    assert _key(tmp_path, *modules, {"id": "01A"}, db="d2") != base
+    assert _key(tmp_path, *modules, {"id": "01A"}, image="sha256:bbb") != base
+
+
+def test_helper_edit_outside_the_test_function_changes_the_key(tmp_path: Path) -> None:
+    fixtures = _module(tmp_path / "fixtures_x.py", FIXTURE_MODULE)
+    before = _key(tmp_path, _module(tmp_path / "test_x.py", TEST_MODULE), fixtures, {"id": "01A"})
+    edited = TEST_MODULE.replace("return 1", "return 2")
+    after = _key(tmp_path, _module(tmp_path / "test_x.py", edited), fixtures, {"id": "01A"})
+
+    assert before != after
+
+
+def test_fixture_module_edit_changes_the_key(tmp_path: Path) -> None:
+    test_module = _module(tmp_path / "test_x.py", TEST_MODULE)
+    before = _key(tmp_path, test_module, _module(tmp_path / "fixtures_x.py", FIXTURE_MODULE), {"id": "01A"})
+    edited = FIXTURE_MODULE + "\n\nLIMIT = 5\n"
+    after = _key(tmp_path, test_module, _module(tmp_path / "fixtures_x.py", edited), {"id": "01A"})
+
+    assert before != after
+
+
+def test_non_json_fixture_values_contribute_their_type(
+    tmp_path: Path, modules: tuple[ModuleType, ModuleType]
+) -> None:
+    class Session:
+        pass
+
+    assert _key(tmp_path, *modules, Session()) == _key(tmp_path, *modules, Session())
+
+
+def test_passes_expire_after_the_ttl(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1_000_000.0]
+    monkeypatch.setattr(pytest_result_cache.time, "time", lambda: now[0])
+    path = tmp_path / "result-cache.json"
+    cache = ResultCache(path, 60, FINGERPRINT)
+    cache.store("k1", "tests/api/test_x.py::test_it", 1.23456)
+    cache.save()
+
+    now[0] += 59
+    assert cache.lookup("k1") == {
+        "nodeid": "tests/api/test_x.py::test_it",
+        "passed_at": 1_000_000.0,
+        "duration": 1.2346,
+    }
+    assert ResultCache(path, 60, FINGERPRINT).entries.keys() == {"k1"}
+
+    now[0] += 1
+    assert cache.lookup("k1") is None
+    assert ResultCache(path, 60, FINGERPRINT).entries == {}
+
+
+def test_foreign_cache_file_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "result-cache.json"
+    path.write_text('{"format": "other", "entries": {"k1": {"passed_at": 1e12}}}', encoding="utf-8")
+
+    assert ResultCache(path, 3600, FINGERPRINT).entries == {}
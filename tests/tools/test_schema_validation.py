@@ -0,0 +1,115 @@
+"""Unit tests for tools/schema_validation.py (keyword checks and $ref handling)."""
+
+from typing import Any
+
+import pytest
+
+from tools.schema_validation import SchemaCompiler, ValidatorRegistry, _Context
+
+PRODUCT = {
+    "type": "object",
+    "required": ["id", "name", "price"],
+    "properties": {
+        "id": {"type": "string", "minLength": 1},
+        "name": {"type": "string"},
+        "price": {"type": "number", "minimum": 0},
+        "brand": {"$ref": "#/components/schemas/Brand"},
+    },
+}
+BRAND = {"type": "object", "required": ["name"], "properties": {"name": {"type": "string"}}}
+# Recursive through a property: must compile and terminate.
+CATEGORY = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "sub_categories": {"type": "array", "items": {"$ref": "#/components/schemas/Category"}},
+    },
+}
+
+
+def _json_response(schema: dict[str, Any]) -> dict[str, Any]:
+    return {"get": {"responses": {"200": {"content": {"application/json": {"schema": schema}}}}}}
+
+
+SPEC = {
+    "components": {
+        "schemas": {
+            "Product": PRODUCT,
+            "Brand": BRAND,
+            "Category": CATEGORY,
+            "Remote": {"$ref": "other.yaml#/X"},
+            "Loop": {"$ref": "#/components/schemas/Loop2"},
+            "Loop2": {"$ref": "#/components/schemas/Loop"},
+        }
+    },
+    "paths": {
+        "/products": _json_response({"type": "array", "items": {"$ref": "#/components/schemas/Product"}}),
+        "/categories": _json_response({"$ref": "#/components/schemas/Category"}),
+        "/remote": _json_response({"$ref": "#/components/schemas/Remote"}),
+        "/loop": _json_response({"$ref": "#/components/schemas/Loop"}),
+    },
+}
+
+
+def _errors(schema: dict[str, Any], value: Any) -> list[str]:
+    ctx = _Context()
+    SchemaCompiler(SPEC).compile(schema)(value, "$", ctx)
+    return ctx.errors
+
+
+def test_valid_product_list_has_no_errors() -> None:
+    registry = ValidatorRegistry(SPEC, max_items=0)
+    payload = [{"id": "01A", "name": "Pliers", "price": 12.5, "brand": {"name": "ForgeFlex"}}]
+
+    assert registry.validate("get", "/products", 200, payload) == []
+
+
+def test_keyword_violations_are_reported_with_their_location() -> None:
+    errors = _errors(
+        {"$ref": "#/components/schemas/Product"},
+        {"id": "", "price": -1, "brand": {"name": 3}},
+    )
+
+    assert "$: missing required property 'name'" in errors
+    assert "$.id: string shorter than minLength=1" in errors
+    assert "$.price: -1 < minimum 0" in errors
+    assert "$.brand.name: expected type string, got int" in errors
+
+
+def test_bool_is_not_an_integer_and_nullable_admits_null() -> None:
+    assert _errors({"type": "integer"}, True) == ["$: expected type integer, got bool"]
+    assert _errors({"type": "string", "nullable": True, "minLength": 2}, None) == []
+
+
+def test_list_sampling_validates_only_the_first_items() -> None:
+    registry = ValidatorRegistry(SPEC, max_items=2)
+    bad = {"id": "x", "name": "n"}  # no price
+    payload = [{"id": "a", "name": "a", "price": 1}] * 2 + [bad]
+
+    assert registry.validate("get", "/products", 200, payload) == []
+    assert registry.validate("get", "/products", 200, payload, max_items=0) != []
+
+
+def test_recursive_ref_validates_nested_levels() -> None:
+    registry = ValidatorRegistry(SPEC, max_items=0)
+    payload = {"name": "Hand Tools", "sub_categories": [{"name": "Pliers", "sub_categories": [{"name": 7}]}]}
+
+    assert registry.validate("get", "/categories", 200, payload) == [
+        "$.sub_categories[0].sub_categories[0].name: expected type string, got int"
+    ]
+
+
+def test_failed_ref_compile_does_not_leave_an_accept_all_validator() -> None:
+    compiler = SchemaCompiler(SPEC)
+    for _ in range(2):
+        with pytest.raises(KeyError, match="Only local"):
+            compiler.compile({"$ref": "#/components/schemas/Remote"})
+
+
+@pytest.mark.parametrize(("path", "problem"), [("/remote", "Only local"), ("/loop", "Circular")])
+def test_unusable_schema_counts_as_not_described(path: str, problem: str) -> None:
+    registry = ValidatorRegistry(SPEC)
+
+    assert not registry.has_schema("get", path, 200)
+    assert problem in (registry.schema_problem("get", path, 200) or "")
+    assert registry.validate("get", path, 200, {"anything": 1}) == []
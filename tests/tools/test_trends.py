@@ -0,0 +1,105 @@
+"""Unit tests for the regression detection in tools/trends.py."""
+
+import random
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from tools.trends import ALL_ENDPOINTS, Finding, RunRecord, TrendStore, compare_run, main, mann_whitney_greater
+
+ENDPOINT = "GET /products"
+
+
+def _record(n: int, p95: float, samples: Optional[list[float]] = None) -> RunRecord:
+    return RunRecord(
+        kind="k6",
+        scenario="smoke",
+        source=f"run-{n:03d}",
+        recorded_at=1_700_000_000.0 + n,
+        metrics={ENDPOINT: {"p95": p95, "rps": 50.0, "count": 100}},
+        samples={ENDPOINT: samples} if samples is not None else {},
+    )
+
+
+def _store(tmp_path: Path, candidate_p95: float, candidate_samples: Optional[list[float]] = None) -> TrendStore:
+    rng = random.Random(1)
+    store = TrendStore(tmp_path / "trends.sqlite")
+    for n, p95 in enumerate((100.0, 102.0, 98.0, 101.0, 99.0)):
+        store.ingest(_record(n, p95, [rng.gauss(100, 10) for _ in range(200)]))
+    store.ingest(_record(5, candidate_p95, candidate_samples))
+    return store
+
+
+def _by_metric(findings: list[Finding]) -> dict[str, Finding]:
+    return {f.metric: f for f in findings}
+
+
+def test_mann_whitney_detects_a_shift_but_not_noise() -> None:
+    rng = random.Random(7)
+    baseline = [rng.gauss(100, 10) for _ in range(300)]
+
+    assert mann_whitney_greater([rng.gauss(100, 10) for _ in range(300)], baseline) > 0.01
+    assert mann_whitney_greater([rng.gauss(120, 10) for _ in range(300)], baseline) < 1e-6
+    assert mann_whitney_greater([1.0], baseline) == 1.0
+
+
+def test_value_inside_the_noise_band_is_not_a_regression(tmp_path: Path) -> None:
+    with _store(tmp_path, candidate_p95=108.0) as store:
+        run_id, findings = compare_run(store, "k6", "smoke")
+
+    p95 = _by_metric(findings)["p95"]
+    assert run_id == 6
+    assert p95.baseline_median == 100.0
+    assert p95.noise_band == 10.0  # rel_tol * median beats 3 * 1.4826 * MAD(=1)
+    assert not p95.regression
+    assert "count" not in _by_metric(findings)
+
+
+def test_value_outside_the_noise_band_is_a_regression(tmp_path: Path) -> None:
+    with _store(tmp_path, candidate_p95=125.0) as store:
+        _, findings = compare_run(store, "k6", "smoke")
+
+    assert _by_metric(findings)["p95"].regression
+
+
+def test_min_baseline_skips_young_series(tmp_path: Path) -> None:
+    with _store(tmp_path, candidate_p95=500.0) as store:
+        _, findings = compare_run(store, "k6", "smoke", baseline_runs=2, min_baseline=3)
+
+    assert findings == []
+
+
+def test_significant_sample_shift_needs_the_minimum_effect(tmp_path: Path) -> None:
+    rng = random.Random(2)
+    shifted = [rng.gauss(104, 10) for _ in range(2000)]  # ~4% slower, highly significant
+    with _store(tmp_path, candidate_p95=100.0, candidate_samples=shifted) as store:
+        _, default = compare_run(store, "k6", "smoke")
+        _, sensitive = compare_run(store, "k6", "smoke", min_effect=0.02)
+
+    assert _by_metric(default)["samples_median"].p_value < 0.01
+    assert not _by_metric(default)["samples_median"].regression
+    assert _by_metric(sensitive)["samples_median"].regression
+
+
+def test_cli_passes_min_effect(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    rng = random.Random(2)
+    shifted = [rng.gauss(104, 10) for _ in range(2000)]
+    _store(tmp_path, candidate_p95=100.0, candidate_samples=shifted).close()
+    args = ["--db", str(tmp_path / "trends.sqlite"), "compare", "--kind", "k6", "--scenario", "smoke"]
+
+    assert main([*args, "--fail-on-regression"]) == 0
+    assert main([*args, "--fail-on-regression", "--min-effect", "0.02"]) == 1
+    assert "samples_median" in capsys.readouterr().out
+
+
+def test_run_wide_endpoint_is_compared_like_any_other(tmp_path: Path) -> None:
+    store = TrendStore(tmp_path / "trends.sqlite")
+    for n in range(4):
+        record = _record(n, 100.0)
+        record.metrics[ALL_ENDPOINTS] = {"error_rate": 0.0 if n < 3 else 0.02}
+        store.ingest(record)
+    with store:
+        _, findings = compare_run(store, "k6", "smoke")
+
+    assert [f.regression for f in findings if f.endpoint == ALL_ENDPOINTS] == [True]
@@ -0,0 +1,119 @@
+"""Unit tests for session splitting, transitions and think times in tools/workload_model.py."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from tools.endpoints import ID_SEGMENT
+from tools.workload_model import END, THINK_QUANTILES, JourneyLearner, main, parse_line
+
+
+def _line(session: str, ts: float, path: str, method: str = "GET", status: int = 200, seconds: float = 0.1) -> str:
+    return json.dumps(
+        {"ts": ts, "session": session, "method": method, "path": path, "status": status, "seconds": seconds}
+    )
+
+
+def _learn(lines: list[str], session_gap: float = 1800.0, min_count: int = 1) -> dict[str, Any]:
+    learner = JourneyLearner(session_gap=session_gap)
+    learner.feed(lines)
+    learner.finish()
+    return learner.model(min_count)
+
+
+def test_start_and_transition_probabilities() -> None:
+    model = _learn([
+        _line("a", 0.0, "/products?page=1"),
+        _line("a", 1.0, "/carts", method="POST"),  # activity, not a state
+        _line("a", 2.1, "/assets/app.js"),  # static file
+        _line("a", 3.0, "/products/42"),
+        _line("b", 0.0, "/products?page=2"),
+        _line("b", 1.1, "/brands"),
+        _line("b", 2.0, "/categories", status=502),  # 5xx responses are not replayed
+        _line("c", 0.0, "/products/01HV8J8ZK7Q3M2N4P5R6S7T8V9"),
+    ])
+
+    assert model["sessions"] == 3
+    assert model["requests"] == 8
+    assert model["skipped_requests"] == 3
+    assert model["start"] == {"GET /products?page": 0.6667, "GET /products/{id}": 0.3333}
+    assert model["transitions"] == {
+        "GET /brands": {END: 1.0},
+        "GET /products/{id}": {END: 1.0},
+        "GET /products?page": {"GET /brands": 0.5, "GET /products/{id}": 0.5},
+    }
+    assert model["states"]["GET /products/{id}"]["path"] == "/products/{id}"
+    assert sorted(model["states"]["GET /products/{id}"]["examples"]) == [
+        "/products/01HV8J8ZK7Q3M2N4P5R6S7T8V9",
+        "/products/42",
+    ]
+    assert model["id_segment"] == ID_SEGMENT.pattern
+
+
+def test_inactivity_gap_starts_a_new_session() -> None:
+    lines = [_line("a", 0.0, "/products"), _line("a", 30.0, "/brands"), _line("a", 200.0, "/products")]
+
+    split = _learn(lines, session_gap=60.0)
+    joined = _learn(lines, session_gap=300.0)
+
+    assert split["sessions"] == 2
+    assert split["start"] == {"GET /products": 1.0}
+    assert split["transitions"]["GET /products"] == {"GET /brands": 0.5, END: 0.5}
+    assert joined["sessions"] == 1
+    assert joined["transitions"]["GET /brands"] == {"GET /products": 1.0}
+
+
+def test_think_time_runs_from_response_end_to_next_request() -> None:
+    # Requests take 0.5s; the next one starts 1s, 2s and 3s after the previous response.
+    lines = [_line("a", 0.0, "/products", seconds=0.5)]
+    ts = 0.0
+    for think in (1.0, 2.0, 3.0):
+        ts += 0.5 + think
+        lines.append(_line("a", ts, "/products", seconds=0.5))
+
+    think_ms = _learn(lines)["think_ms"]["GET /products"]
+
+    assert len(think_ms) == len(THINK_QUANTILES)
+    assert abs(think_ms[0] - 1000.0) <= 10.0
+    assert abs(think_ms[len(think_ms) // 2] - 2000.0) <= 20.0
+    assert abs(think_ms[-1] - 3000.0) <= 30.0
+
+
+def test_rare_states_are_dropped_and_probabilities_renormalised() -> None:
+    lines = []
+    for i in range(3):
+        lines += [_line(f"s{i}", 0.0, "/products"), _line(f"s{i}", 1.0, "/brands")]
+    lines += [_line("rare", 0.0, "/products"), _line("rare", 1.0, "/messages")]
+
+    model = _learn(lines, min_count=2)
+
+    assert set(model["states"]) == {"GET /products", "GET /brands"}
+    assert model["transitions"]["GET /products"] == {"GET /brands": 1.0}
+    assert model["think_ms"].keys() == {"GET /products"}
+
+
+def test_parse_line_reads_nginx_timing_and_combined_logs() -> None:
+    timing = parse_line(
+        'web-1 | {"ts": 100.5, "request_time": 0.5, "method": "GET", "uri": "/brands", "status": 200,'
+        ' "request_id": "k6-smoke-3-17"}'
+    )
+    combined = parse_line(
+        '10.0.0.1 - - [19/Oct/2026:10:00:00 +0000] "GET /products?page=2 HTTP/1.1" 200 512 "-" "curl/8"'
+    )
+
+    assert timing is not None and (timing.client, timing.start, timing.end) == ("k6-smoke-3", 100.0, 100.5)
+    assert combined is not None and (combined.client, combined.uri) == ("10.0.0.1|curl/8", "/products?page=2")
+    assert parse_line("not a request") is None
+
+
+def test_cli_writes_the_model_and_fails_without_replayable_sessions(tmp_path: Path) -> None:
+    capture = tmp_path / "capture.jsonl"
+    output = tmp_path / "models" / "journey.json"
+    capture.write_text("\n".join([_line("a", 0.0, "/products"), _line("a", 1.0, "/brands")]), encoding="utf-8")
+
+    assert main([str(capture), "--output", str(output), "--min-count", "1"]) == 0
+    assert json.loads(output.read_text(encoding="utf-8"))["format"] == "toolshop.workload-model/v1"
+
+    capture.write_text(_line("a", 0.0, "/carts", method="POST"), encoding="utf-8")
+    assert main([str(capture), "--output", str(tmp_path / "empty.json")]) == 1
+    assert not (tmp_path / "empty.json").exists()
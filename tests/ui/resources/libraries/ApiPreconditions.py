@@ -0,0 +1,160 @@
+"""API-seeded preconditions for the Toolshop UI suites.
+
+Cart and product-detail suites used to click through the listing (and the
+add-to-cart flow) just to reach their starting state. This library builds that
+state through the HTTP API instead:
+
+- a product pool crawled once from `GET /products` (in-stock, non-rental items),
+  cached on disk so parallel robot workers share it,
+- carts created with `POST /carts` + `POST /carts/{id}`.
+
+common.robot turns these into browser state (`Go To Seeded Product Page`,
+`Seed Cart With Product`), so a UI test only spends time on the behaviour under
+test.
+
+Environment variables
+---------------------
+- API_HOST:             API gateway (default: http://localhost:8091)
+- SEED_POOL_PAGES:      Product list pages to crawl (default: 1)
+- SEED_POOL_TTL:        Seconds the cached pool stays valid (default: 600)
+- SEED_CACHE_DIR:       Cache directory (default: .cache/ui-seed)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import requests
+from robot.api import logger
+from robot.api.deco import keyword, library
+
+DEFAULT_TIMEOUT_SECONDS = 30
+
+
+def _env(name: str, default: str) -> str:
+    v = os.getenv(name)
+    return v.strip() if isinstance(v, str) and v.strip() else default
+
+
+def _items(payload: Any) -> list[dict[str, Any]]:
+    """Return list items from a plain or paginated (`data`) response."""
+    if isinstance(payload, dict) and isinstance(payload.get("data"), list):
+        payload = payload["data"]
+    return [x for x in payload if isinstance(x, dict)] if isinstance(payload, list) else []
+
+
+@library(scope="GLOBAL", auto_keywords=False)
+class ApiPreconditions:
+    """Build UI test preconditions (products, carts) via the API."""
+
+    def __init__(self) -> None:
+        self.api_host = _env("API_HOST", "http://localhost:8091").rstrip("/")
+        self.pool_pages = int(_env("SEED_POOL_PAGES", "1"))
+        self.pool_ttl = float(_env("SEED_POOL_TTL", "600"))
+        self.cache_dir = Path(_env("SEED_CACHE_DIR", ".cache/ui-seed"))
+        self._pool: Optional[list[dict[str, Any]]] = None
+        self._http = requests.Session()
+        self._http.headers.update({"accept": "application/json"})
+
+    # -- helpers ---------------------------------------------------------------
+    def _url(self, path: str) -> str:
+        return self.api_host + "/" + path.lstrip("/")
+
+    def _pool_file(self) -> Path:
+        key = hashlib.sha1(self.api_host.encode()).hexdigest()[:12]
+        return self.cache_dir / f"products-{key}.json"
+
+    def _crawl(self) -> list[dict[str, Any]]:
+        pool: list[dict[str, Any]] = []
+        for page in range(1, self.pool_pages + 1):
+            r = self._http.get(self._url("/products"), params={"page": page}, timeout=DEFAULT_TIMEOUT_SECONDS)
+            if r.status_code != 200:
+                raise AssertionError(f"GET /products?page={page} failed: status={r.status_code}")
+            items = _items(r.json())
+            if not items:
+                break
+            for p in items:
+                if p.get("id") is None or p.get("is_rental") or p.get("in_stock") is False:
+                    continue
+                pool.append({"id": str(p["id"]), "name": str(p.get("name", "")).strip()})
+        if not pool:
+            raise AssertionError("Product pool is empty (no in-stock, non-rental products)")
+        return pool
+
+    def _load_pool(self, refresh: bool = False) -> list[dict[str, Any]]:
+        if self._pool is not None and not refresh:
+            return self._pool
+        path = self._pool_file()
+        if not refresh and path.is_file() and time.time() - path.stat().st_mtime < self.pool_ttl:
+            self._pool = json.loads(path.read_text(encoding="utf-8"))
+            return self._pool
+
+        self._pool = self._crawl()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._pool), encoding="utf-8")
+        tmp.replace(path)
+        logger.info(f"Crawled product pool: {len(self._pool)} products -> {path}")
+        return self._pool
+
+    # -- keywords --------------------------------------------------------------
+    @keyword("Get Seed Product")
+    def get_seed_product(self, index: int = 0) -> dict[str, str]:
+        """Return `{id, name}` of a product from the pool (index wraps around)."""
+        pool = self._load_pool()
+        return dict(pool[int(index) % len(pool)])
+
+    def _new_cart_with(self, product_id: str, quantity: int) -> Optional[str]:
+        """Create a cart holding the product; None if the product does not exist."""
+        r = self._http.post(self._url("/carts"), timeout=DEFAULT_TIMEOUT_SECONDS)
+        if r.status_code not in (200, 201):
+            raise AssertionError(f"POST /carts failed: status={r.status_code}")
+        cart_id = str(r.json().get("id", ""))
+        if not cart_id:
+            raise AssertionError("POST /carts returned no cart id")
+
+        r = self._http.post(
+            self._url(f"/carts/{cart_id}"),
+            json={"product_id": product_id, "quantity": int(quantity)},
+            timeout=DEFAULT_TIMEOUT_SECONDS,
+        )
+        if r.status_code == 404:
+            return None
+        if r.status_code not in (200, 201):
+            raise AssertionError(f"POST /carts/{cart_id} failed: status={r.status_code}")
+        logger.info(f"Seeded cart {cart_id} with {quantity} x {product_id}")
+        return cart_id
+
+    @keyword("Create Seeded Cart")
+    def create_seeded_cart(self, product_id: str, quantity: int = 1) -> str:
+        """Create a cart containing `quantity` x `product_id` and return the cart id.
+
+        Fails if the product does not exist; use `Create Seeded Cart From Pool`
+        to recover from a pool cached before the database was re-seeded.
+        """
+        cart_id = self._new_cart_with(product_id, quantity)
+        if cart_id is None:
+            raise AssertionError(f"Product {product_id} not found")
+        return cart_id
+
+    @keyword("Create Seeded Cart From Pool")
+    def create_seeded_cart_from_pool(self, index: int = 0, quantity: int = 1) -> dict[str, str]:
+        """Create a cart with pool product `index`; return `{id, name, cart_id}`.
+
+        If the product no longer exists (database re-seeded since the pool was
+        cached), the pool is crawled again and the same index is tried once more.
+        """
+        for refresh in (False, True):
+            pool = self._load_pool(refresh=refresh)
+            product = dict(pool[int(index) % len(pool)])
+            cart_id = self._new_cart_with(product["id"], quantity)
+            if cart_id is not None:
+                product["cart_id"] = cart_id
+                return product
+            logger.info(f"Product {product['id']} not found; refreshing product pool")
+        raise AssertionError(f"Product {product['id']} not found even after refreshing the product pool")
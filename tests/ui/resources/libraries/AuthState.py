@@ -0,0 +1,151 @@
+"""Login-once Playwright storage state for the Toolshop UI suites.
+
+Driving the login form costs a full UI round trip per suite. This library logs
+in once through the API (same endpoint as the `auth_token` pytest fixture and
+the k6 scripts), writes the token into a Playwright storage-state file and lets
+`Open Toolshop    authenticated=${True}` start contexts that are already logged in.
+
+The storage state is cached on disk so parallel robot workers share one login
+per run. It is rebuilt when the token is about to expire (JWT `exp` claim, or
+`expires_in` from the login response).
+
+Environment variables
+---------------------
+- API_HOST:           API gateway (default: http://localhost:8091)
+- AUTH_LOGIN_PATH:    Login endpoint path (default: /users/login)
+- AUTH_STORAGE_KEY:   localStorage key the Angular app reads (default: auth-token)
+- AUTH_STATE_DIR:     Cache directory (default: .cache/ui-auth)
+- DEMO_EMAIL / DEMO_PASSWORD: Credentials (same defaults as common.robot)
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+import requests
+from robot.api import logger
+from robot.api.deco import keyword, library
+
+DEFAULT_TIMEOUT_SECONDS = 30
+
+# Rebuild the state when the token expires within this many seconds.
+EXPIRY_MARGIN_SECONDS = 60
+
+# Used when neither the JWT nor the response tells us the lifetime.
+DEFAULT_TOKEN_TTL_SECONDS = 300
+
+
+def _env(name: str, default: str) -> str:
+    v = os.getenv(name)
+    return v.strip() if isinstance(v, str) and v.strip() else default
+
+
+def _jwt_exp(token: str) -> Optional[float]:
+    """Return the `exp` claim of a JWT, or None if the token is not a JWT."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1] + "=" * (-len(parts[1]) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+    except (ValueError, json.JSONDecodeError):
+        return None
+    exp = claims.get("exp") if isinstance(claims, dict) else None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def _origin(url: str) -> str:
+    p = urlparse(url)
+    return f"{p.scheme}://{p.netloc}"
+
+
+@library(scope="GLOBAL", auto_keywords=False)
+class AuthState:
+    """Create and cache an authenticated Playwright storage state."""
+
+    def __init__(self) -> None:
+        self.api_host = _env("API_HOST", "http://localhost:8091").rstrip("/")
+        self.login_path = _env("AUTH_LOGIN_PATH", "/users/login")
+        self.storage_key = _env("AUTH_STORAGE_KEY", "auth-token")
+        self.state_dir = Path(_env("AUTH_STATE_DIR", ".cache/ui-auth"))
+
+    # -- helpers ---------------------------------------------------------------
+    def _state_paths(self, base_url: str, email: str) -> tuple[Path, Path]:
+        key = hashlib.sha1(f"{base_url}|{self.api_host}|{email}".encode()).hexdigest()[:12]
+        return self.state_dir / f"storage-state-{key}.json", self.state_dir / f"storage-state-{key}.meta.json"
+
+    def _login(self, email: str, password: str) -> tuple[str, float]:
+        """Log in via the API and return (token, expires_at)."""
+        url = self.api_host + "/" + self.login_path.lstrip("/")
+        r = requests.post(
+            url,
+            json={"email": email, "password": password},
+            headers={"accept": "application/json"},
+            timeout=DEFAULT_TIMEOUT_SECONDS,
+        )
+        if r.status_code not in (200, 201):
+            raise AssertionError(f"API login failed: status={r.status_code} url={url}")
+        data: Any = r.json()
+        token = None
+        if isinstance(data, dict):
+            for k in ("access_token", "token", "accessToken", "jwt"):
+                if isinstance(data.get(k), str) and data[k].strip():
+                    token = data[k].strip()
+                    break
+        if not token:
+            raise AssertionError(f"API login returned no token (keys={list(data) if isinstance(data, dict) else type(data)})")
+
+        expires_at = _jwt_exp(token)
+        if expires_at is None:
+            ttl = data.get("expires_in") if isinstance(data, dict) else None
+            expires_at = time.time() + float(ttl if isinstance(ttl, (int, float)) else DEFAULT_TOKEN_TTL_SECONDS)
+        return token, expires_at
+
+    # -- keywords --------------------------------------------------------------
+    @keyword("Get Authenticated Storage State")
+    def get_authenticated_storage_state(self, base_url: str, email: str, password: str) -> str:
+        """Return the path of a storage-state file logged in as `email`.
+
+        The cached file is reused until the token is within
+        EXPIRY_MARGIN_SECONDS of expiring; then a fresh API login is done.
+        """
+        state_path, meta_path = self._state_paths(base_url, email)
+        if state_path.is_file() and meta_path.is_file():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            remaining = float(meta.get("expires_at", 0)) - time.time()
+            if remaining > EXPIRY_MARGIN_SECONDS:
+                logger.info(f"Reusing storage state {state_path} (token valid for {remaining:.0f}s)")
+                return str(state_path)
+            logger.info(f"Storage state {state_path} expired or expiring; logging in again")
+
+        token, expires_at = self._login(email, password)
+        state = {
+            "cookies": [],
+            "origins": [
+                {
+                    "origin": _origin(base_url),
+                    "localStorage": [{"name": self.storage_key, "value": token}],
+                }
+            ],
+        }
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent workers never read a partial file.
+        for path, payload in ((state_path, state), (meta_path, {"expires_at": expires_at})):
+            tmp = path.with_suffix(path.suffix + f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(payload), encoding="utf-8")
+            tmp.replace(path)
+        logger.info(f"Created storage state {state_path} (expires in {expires_at - time.time():.0f}s)")
+        return str(state_path)
+
+    @keyword("Invalidate Authenticated Storage State")
+    def invalidate_authenticated_storage_state(self, base_url: str, email: str) -> None:
+        """Delete the cached storage state (e.g. after the backend rejected the token)."""
+        for path in self._state_paths(base_url, email):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,131 @@
+"""Batched DOM extraction for list-heavy UI checks.
+
+Reading N cards with `Get Text` / `Get Attribute` costs N Playwright round
+trips. `Extract Rows` resolves a selector once and evaluates a single in-page
+function over all matches (Browser `Evaluate JavaScript` with
+`all_elements=True`), returning one dictionary per element.
+
+Fields are given as `name=spec`, where spec is `<kind>[:<name>][@<css>]`:
+
+| Spec              | Value per element                                   |
+|-------------------|-----------------------------------------------------|
+| `text`            | trimmed innerText                                   |
+| `attr:src@img`    | `src` attribute of the first `img` inside           |
+| `prop:naturalWidth@img` | DOM property                                  |
+| `visible`         | has a non-empty box and is not hidden               |
+| `count@li`        | number of matching descendants                      |
+
+Example:
+    ${rows}=    Wait For Extracted Rows    ${PRODUCT_CARD}    name=text@h5    src=attr:src@img
+    Every Row Should Have Value    ${rows}    src
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any
+
+from robot.api import logger
+from robot.api.deco import keyword, library
+from robot.libraries.BuiltIn import BuiltIn
+from robot.utils import timestr_to_secs
+
+_SPEC = re.compile(r"^(?P<kind>text|attr|prop|visible|count)(?::(?P<name>[^@]+))?(?:@(?P<sub>.+))?$")
+
+POLL_INTERVAL_SECONDS = 0.5
+
+_EXTRACT_JS = """
+(elements, fields) => elements.map((el) => {
+    const row = {};
+    for (const [key, spec] of Object.entries(fields)) {
+        if (spec.kind === "count") {
+            row[key] = spec.sub ? el.querySelectorAll(spec.sub).length : 1;
+            continue;
+        }
+        const target = spec.sub ? el.querySelector(spec.sub) : el;
+        if (!target) {
+            row[key] = null;
+            continue;
+        }
+        if (spec.kind === "text") {
+            row[key] = (target.innerText ?? target.textContent ?? "").trim();
+        } else if (spec.kind === "attr") {
+            row[key] = target.getAttribute(spec.name);
+        } else if (spec.kind === "prop") {
+            const v = target[spec.name];
+            row[key] = v === undefined ? null : v;
+        } else if (spec.kind === "visible") {
+            const box = target.getBoundingClientRect();
+            const style = getComputedStyle(target);
+            row[key] = box.width > 0 && box.height > 0 && style.visibility !== "hidden" && style.display !== "none";
+        }
+    }
+    return row;
+})
+"""
+
+
+def parse_field_spec(spec: str) -> dict[str, Any]:
+    """Parse `<kind>[:<name>][@<css>]` into the structure the in-page function expects."""
+    m = _SPEC.match(spec.strip())
+    if not m:
+        raise ValueError(f"Invalid field spec {spec!r} (expected <kind>[:<name>][@<css>])")
+    kind, name = m.group("kind"), m.group("name")
+    if kind in ("attr", "prop") and not name:
+        raise ValueError(f"Field spec {spec!r} needs a name, e.g. {kind}:src")
+    return {"kind": kind, "name": name, "sub": m.group("sub")}
+
+
+@library(scope="GLOBAL", auto_keywords=False)
+class DomExtract:
+    """Extract structured rows from many elements in one round trip."""
+
+    def _browser(self) -> Any:
+        return BuiltIn().get_library_instance("Browser")
+
+    @keyword("Extract Rows")
+    def extract_rows(self, selector: str, **fields: str) -> list[dict[str, Any]]:
+        """Return one dictionary per element matching `selector` (may be empty)."""
+        if not fields:
+            raise ValueError("Extract Rows needs at least one field, e.g. text=text")
+        specs = {key: parse_field_spec(spec) for key, spec in fields.items()}
+        rows = self._browser().evaluate_javascript(selector, _EXTRACT_JS, arg=specs, all_elements=True)
+        return rows if isinstance(rows, list) else []
+
+    @keyword("Wait For Extracted Rows")
+    def wait_for_extracted_rows(
+        self, selector: str, *, min_rows: int = 1, timeout: str = "60s", **fields: str
+    ) -> list[dict[str, Any]]:
+        """Poll `Extract Rows` until at least `min_rows` elements match, then return the rows."""
+        deadline = time.monotonic() + timestr_to_secs(timeout)
+        attempts = 0
+        while True:
+            attempts += 1
+            rows = self.extract_rows(selector, **fields)
+            if len(rows) >= int(min_rows):
+                logger.info(f"Extracted {len(rows)} row(s) from {selector} after {attempts} evaluation(s)")
+                return rows
+            if time.monotonic() >= deadline:
+                raise AssertionError(f"Expected at least {min_rows} element(s) for {selector} within {timeout}, got {len(rows)}")
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+    @keyword("Every Row Should Have Value")
+    def every_row_should_have_value(self, rows: list[dict[str, Any]], field: str) -> None:
+        """Fail if any row has an empty/None `field`."""
+        bad = [i for i, r in enumerate(rows) if r.get(field) in (None, "")]
+        if not rows or bad:
+            raise AssertionError(f"{len(bad)} of {len(rows)} row(s) have empty '{field}' (indices: {bad[:10]})")
+
+    @keyword("Every Row Should Match")
+    def every_row_should_match(self, rows: list[dict[str, Any]], field: str, pattern: str) -> None:
+        """Fail if any row's `field` does not match the regular expression `pattern`."""
+        regex = re.compile(pattern, re.DOTALL)
+        bad = [i for i, r in enumerate(rows) if not regex.search(str(r.get(field) or ""))]
+        if not rows or bad:
+            raise AssertionError(f"{len(bad)} of {len(rows)} row(s) have '{field}' not matching {pattern!r} (indices: {bad[:10]})")
+
+    @keyword("Filter Rows")
+    def filter_rows(self, rows: list[dict[str, Any]], field: str) -> list[dict[str, Any]]:
+        """Return the rows whose `field` is truthy."""
+        return [r for r in rows if r.get(field)]
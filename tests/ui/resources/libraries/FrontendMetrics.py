@@ -0,0 +1,110 @@
+"""Frontend performance metrics per route, with optional budgets.
+
+`Open Toolshop` installs the capture (Browser JS extension
+libraries/perf_metrics.js); every hard navigation and Angular route change
+becomes a "visit" with Navigation Timing, resource timing, LCP, CLS, TBT and
+JS heap size. `Close Toolshop` hands the visits to `Record Frontend Metrics`,
+which normalizes paths to routes (`/product/:id`), writes
+`${OUTPUT DIR}/frontend/<suite>.json` and, when budgets are enabled, fails the
+suite teardown on violations. `python -m tools.frontend_metrics <run dir>`
+aggregates the suite files into `<run dir>/frontend_metrics.json`.
+
+Environment variables
+---------------------
+- PERF_BUDGETS:  "true" to enforce tests/ui/resources/perf_budgets.json, or a
+                 path to another budgets file (default: off, metrics only)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Optional
+
+from robot.api import logger
+from robot.api.deco import keyword, library
+from robot.libraries.BuiltIn import BuiltIn
+
+BUDGETS_FILE = Path(__file__).resolve().parent.parent / "perf_budgets.json"
+
+# Known parameterized routes of the Toolshop app.
+ROUTE_PATTERNS: tuple[tuple[re.Pattern[str], str], ...] = (
+    (re.compile(r"^/product/[^/]+$"), "/product/:id"),
+    (re.compile(r"^/category/[^/]+$"), "/category/:slug"),
+    (re.compile(r"^/account/invoices/[^/]+$"), "/account/invoices/:id"),
+)
+
+# Generic id-like path segments (ULIDs, UUIDs, numbers).
+_ID_SEGMENT = re.compile(r"^(?:\d+|[0-9A-HJKMNP-TV-Z]{26}|[0-9a-f]{8}-[0-9a-f-]{27})$", re.IGNORECASE)
+
+
+def route_of(path: str) -> str:
+    """Map a URL path to its route template."""
+    path = "/" + path.strip("/")
+    for pattern, route in ROUTE_PATTERNS:
+        if pattern.match(path):
+            return route
+    return "/" + "/".join(":id" if _ID_SEGMENT.match(s) else s for s in path.strip("/").split("/") if s)
+
+
+def _load_budgets() -> Optional[dict[str, Any]]:
+    setting = os.getenv("PERF_BUDGETS", "").strip()
+    if not setting or setting.lower() in ("0", "false", "no", "off"):
+        return None
+    path = BUDGETS_FILE if setting.lower() in ("1", "true", "yes", "on") else Path(setting)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def budget_for(budgets: dict[str, Any], route: str) -> dict[str, float]:
+    """Default budget overlaid with the route's own thresholds."""
+    merged = dict(budgets.get("default", {}))
+    merged.update(budgets.get("routes", {}).get(route, {}))
+    return merged
+
+
+@library(scope="GLOBAL", auto_keywords=False)
+class FrontendMetrics:
+    """Write per-suite frontend metrics and enforce per-route budgets."""
+
+    def __init__(self) -> None:
+        self.budgets = _load_budgets()
+
+    @keyword("Record Frontend Metrics")
+    def record_frontend_metrics(self, visits: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Store `visits` for the current suite; fail on budget violations.
+
+        Returns:
+            The violations found in `visits` (empty when budgets are off).
+        """
+        violations: list[dict[str, Any]] = []
+        for visit in visits:
+            visit["route"] = route_of(str(visit.get("path", "/")))
+            if self.budgets is None:
+                continue
+            for metric, limit in budget_for(self.budgets, visit["route"]).items():
+                value = visit.get(metric)
+                if isinstance(value, (int, float)) and value > float(limit):
+                    violations.append(
+                        {"route": visit["route"], "url": visit.get("url"), "metric": metric, "value": value, "budget": limit}
+                    )
+
+        builtin = BuiltIn()
+        suite_name = builtin.get_variable_value("${SUITE NAME}", "suite")
+        suite = re.sub(r"[^A-Za-z0-9._-]+", "_", suite_name)
+        out = Path(builtin.get_variable_value("${OUTPUT DIR}", ".")) / "frontend" / f"{suite}.json"
+        data: dict[str, Any] = {"suite": suite_name, "visits": [], "violations": []}
+        if out.is_file():
+            # Test-level setups open several contexts per suite; accumulate.
+            data = json.loads(out.read_text(encoding="utf-8"))
+        data["visits"].extend(visits)
+        data["violations"].extend(violations)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        logger.info(f"Recorded {len(visits)} frontend visit(s) -> {out}")
+
+        if violations:
+            lines = [f"{v['route']} {v['metric']}={v['value']} > {v['budget']}" for v in violations]
+            raise AssertionError("Frontend performance budget exceeded:\n" + "\n".join(lines))
+        return violations
@@ -0,0 +1,164 @@
+"""Per-suite network interception profiles and bytes/requests-saved reports.
+
+Profiles live in tests/ui/resources/network_profiles.json. A suite opts in by
+tagging its tests `network:<profile>` (e.g. `network:text` for route/text-only
+checks); NETWORK_PROFILE overrides the choice for the whole run (`full`
+disables interception). The interception itself runs inside Playwright via the
+Browser JS extension libraries/network_profile.js.
+
+After each context, `Record Network Savings` writes
+`${OUTPUT DIR}/network/<suite>.json`. Blocked requests never download, so their
+size is estimated from a catalog of sizes learned from unblocked runs
+(`$ARTIFACTS/ui/resource_sizes.json`), falling back to the average size of the
+same resource type.
+
+Environment variables
+---------------------
+- NETWORK_PROFILE:  Force a profile for every suite
+- API_HOST:         Treated as first-party next to BASE_URL
+- ARTIFACTS:        Artifacts root for the size catalog (default: artifacts)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+from robot.api import logger
+from robot.api.deco import keyword, library
+from robot.libraries.BuiltIn import BuiltIn
+
+PROFILES_FILE = Path(__file__).resolve().parent.parent / "network_profiles.json"
+TAG_PREFIX = "network:"
+
+_TAGS_LINE = re.compile(r"^(?:\s+\[Tags\]|Test Tags|Force Tags|Default Tags)\s{2,}(?P<tags>.+)$", re.IGNORECASE)
+
+
+def _env(name: str, default: str) -> str:
+    v = os.getenv(name)
+    return v.strip() if isinstance(v, str) and v.strip() else default
+
+
+def _origin(url: str) -> str:
+    p = urlsplit(url)
+    return f"{p.scheme}://{p.netloc}"
+
+
+def _catalog_key(url: str) -> str:
+    """Resource identity for the size catalog (query/fragment dropped)."""
+    p = urlsplit(url)
+    return urlunsplit((p.scheme, p.netloc, p.path, "", ""))
+
+
+def _suite_tags(source: str) -> set[str]:
+    """Lower-cased tags used in a .robot file (cheap text scan)."""
+    path = Path(source)
+    if not path.is_file():
+        return set()
+    tags: set[str] = set()
+    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        m = _TAGS_LINE.match(line)
+        if m:
+            tags.update(t.strip().lower() for t in re.split(r"\s{2,}|\t", m.group("tags")) if t.strip())
+    return tags
+
+
+@library(scope="GLOBAL", auto_keywords=False)
+class NetworkProfile:
+    """Select interception profiles and report what they saved."""
+
+    def __init__(self) -> None:
+        config = json.loads(PROFILES_FILE.read_text(encoding="utf-8"))
+        self.profiles: dict[str, dict[str, Any]] = config.get("profiles", {})
+        self.default = str(config.get("default", "full"))
+        self.catalog_path = Path(_env("ARTIFACTS", "artifacts")) / "ui" / "resource_sizes.json"
+
+    @keyword("Select Network Profile")
+    def select_network_profile(self, suite_source: str, base_url: str) -> tuple[str, dict[str, Any]]:
+        """Return `(name, profile)` for the suite in `suite_source`."""
+        name = os.getenv("NETWORK_PROFILE", "").strip()
+        if not name:
+            tagged = sorted(t[len(TAG_PREFIX):] for t in _suite_tags(suite_source) if t.startswith(TAG_PREFIX))
+            name = tagged[0] if tagged else self.default
+        if name not in self.profiles:
+            raise AssertionError(f"Unknown network profile {name!r} (known: {', '.join(sorted(self.profiles))})")
+        profile = dict(self.profiles[name])
+        profile["first_party"] = [_origin(base_url), _origin(_env("API_HOST", "http://localhost:8091"))]
+        return name, profile
+
+    # -- size catalog ----------------------------------------------------------
+    def _load_catalog(self) -> dict[str, dict[str, Any]]:
+        if not self.catalog_path.is_file():
+            return {}
+        return json.loads(self.catalog_path.read_text(encoding="utf-8"))
+
+    def _save_catalog(self, catalog: dict[str, dict[str, Any]]) -> None:
+        self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.catalog_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(catalog, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.catalog_path)
+
+    @keyword("Record Network Savings")
+    def record_network_savings(self, stats: dict[str, Any]) -> dict[str, Any]:
+        """Merge the context's request stats into the suite report and return it."""
+        catalog = self._load_catalog()
+        for row in stats.get("allowed", []):
+            if isinstance(row.get("bytes"), (int, float)) and row["bytes"] > 0:
+                catalog[_catalog_key(row["url"])] = {"type": row.get("type", "other"), "bytes": int(row["bytes"])}
+        if stats.get("allowed"):
+            self._save_catalog(catalog)
+
+        type_sizes: dict[str, list[int]] = {}
+        for entry in catalog.values():
+            type_sizes.setdefault(entry["type"], []).append(entry["bytes"])
+        type_avg = {t: sum(v) / len(v) for t, v in type_sizes.items()}
+
+        counts = stats.get("counts", {})
+        report = {
+            "profile": stats.get("profile", "none"),
+            "requests": {k: int(counts.get(k, 0)) for k in ("allowed", "aborted", "stubbed")},
+            "bytes_downloaded": sum(int(r.get("bytes") or 0) for r in stats.get("allowed", [])),
+            "bytes_saved_known": 0,
+            "bytes_saved_estimated": 0,
+            "unknown_size_requests": 0,
+            "saved_by_type": {},
+        }
+        for row in stats.get("aborted", []) + stats.get("stubbed", []):
+            rtype = row.get("type", "other")
+            by_type = report["saved_by_type"].setdefault(rtype, {"requests": 0, "bytes": 0})
+            by_type["requests"] += 1
+            known = catalog.get(_catalog_key(row["url"]))
+            if known:
+                report["bytes_saved_known"] += known["bytes"]
+                by_type["bytes"] += known["bytes"]
+            elif rtype in type_avg:
+                report["bytes_saved_estimated"] += int(type_avg[rtype])
+                by_type["bytes"] += int(type_avg[rtype])
+            else:
+                report["unknown_size_requests"] += 1
+
+        builtin = BuiltIn()
+        suite = re.sub(r"[^A-Za-z0-9._-]+", "_", builtin.get_variable_value("${SUITE NAME}", "suite"))
+        out = Path(builtin.get_variable_value("${OUTPUT DIR}", ".")) / "network" / f"{suite}.json"
+        if out.is_file():
+            # Test-level setups open several contexts per suite; accumulate.
+            prev = json.loads(out.read_text(encoding="utf-8"))
+            for k in ("bytes_downloaded", "bytes_saved_known", "bytes_saved_estimated", "unknown_size_requests"):
+                report[k] += prev.get(k, 0)
+            for k, v in prev.get("requests", {}).items():
+                report["requests"][k] = report["requests"].get(k, 0) + v
+            for t, v in prev.get("saved_by_type", {}).items():
+                cur = report["saved_by_type"].setdefault(t, {"requests": 0, "bytes": 0})
+                cur["requests"] += v.get("requests", 0)
+                cur["bytes"] += v.get("bytes", 0)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
+
+        saved = report["bytes_saved_known"] + report["bytes_saved_estimated"]
+        blocked = report["requests"]["aborted"] + report["requests"]["stubbed"]
+        logger.info(f"Network profile '{report['profile']}': {blocked} request(s) blocked, ~{saved} bytes saved -> {out}")
+        return report
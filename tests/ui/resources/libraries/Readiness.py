@@ -0,0 +1,108 @@
+"""Event-driven readiness waits that report how long they took.
+
+The waits run in the Playwright (Node) process through the Browser JS
+extension libraries/readiness.js and resolve on the signal itself:
+
+- `Wait For Api Response`: a matching API response (e.g. the products list),
+  failing with the last matching status/item count seen,
+- `Wait For Network Quiet`: no request in flight for a bounded quiet window,
+- `Wait For Angular Stable`: Angular reports no pending zone tasks.
+
+Every wait is logged and appended to `${OUTPUT DIR}/readiness/<suite>.json`;
+`python -m tools.frontend_metrics` summarizes them per wait (p50/p95/max), so
+slow app boot and over-generous timeouts are visible across runs.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+from robot.api import logger
+from robot.api.deco import keyword, library
+from robot.libraries.BuiltIn import BuiltIn
+from robot.utils import timestr_to_secs
+
+
+def _ms(timeout: str) -> int:
+    return int(timestr_to_secs(timeout) * 1000)
+
+
+@library(scope="GLOBAL", auto_keywords=False)
+class Readiness:
+    """Readiness waits on concrete signals, with timing reports."""
+
+    def _call(self, name: str, **args: Any) -> dict[str, Any]:
+        browser = BuiltIn().get_library_instance("Browser")
+        return browser.call_js_keyword(name, **args)
+
+    def _record(self, wait: str, result: dict[str, Any]) -> None:
+        builtin = BuiltIn()
+        suite_name = builtin.get_variable_value("${SUITE NAME}", "suite")
+        suite = re.sub(r"[^A-Za-z0-9._-]+", "_", suite_name)
+        out = Path(builtin.get_variable_value("${OUTPUT DIR}", ".")) / "readiness" / f"{suite}.json"
+        data: dict[str, Any] = {"suite": suite_name, "waits": []}
+        if out.is_file():
+            data = json.loads(out.read_text(encoding="utf-8"))
+        data["waits"].append(
+            {
+                "wait": wait,
+                "ms": result.get("ms"),
+                "ok": bool(result.get("ok")),
+                "test": builtin.get_variable_value("${TEST NAME}", None),
+            }
+        )
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        logger.info(f"{wait}: {'ready' if result.get('ok') else 'NOT ready'} after {result.get('ms')} ms")
+
+    @keyword("Install Readiness Tracker")
+    def install_readiness_tracker(self) -> None:
+        """Start tracking network events of the current context (call before `New Page`)."""
+        self._call("installReadinessTracker")
+
+    @keyword("Wait For Api Response")
+    def wait_for_api_response(
+        self, pattern: str, timeout: str = "20s", require_items: bool = False, name: str = ""
+    ) -> dict[str, Any]:
+        """Wait for a response (< 400) whose URL matches the regexp `pattern`.
+
+        With `require_items=True`, a JSON list (or paginated `data`) must be
+        non-empty. Responses since the last document navigation count, so the
+        wait returns at once if the response already arrived. `name` labels the
+        wait in the report (default: the pattern).
+
+        Returns:
+            `{ok, ms, url, status, items}`.
+        """
+        result = self._call("waitForApiResponse", pattern=pattern, requireItems=bool(require_items), timeoutMs=_ms(timeout))
+        self._record(f"api:{name or pattern}", result)
+        if not result.get("ok"):
+            last = result.get("last") or {}
+            seen = f"last match: {last.get('url')} status={last.get('status')} items={last.get('items')}" if last else "no matching response"
+            raise AssertionError(f"No successful response matching {pattern!r} within {timeout} ({seen})")
+        return result
+
+    @keyword("Wait For Network Quiet")
+    def wait_for_network_quiet(self, quiet: str = "500ms", timeout: str = "10s", fail: bool = False) -> bool:
+        """Wait until no request has been in flight for `quiet`, at most `timeout`.
+
+        Returns whether the network went quiet; only fails when `fail=True`
+        (long-polling or analytics can keep the network busy).
+        """
+        result = self._call("waitForNetworkQuiet", quietMs=_ms(quiet), timeoutMs=_ms(timeout))
+        self._record(f"network-quiet:{quiet}", result)
+        if not result.get("ok") and fail:
+            raise AssertionError(f"Network not quiet for {quiet} within {timeout}; in flight: {result.get('inflight')}")
+        return bool(result.get("ok"))
+
+    @keyword("Wait For Angular Stable")
+    def wait_for_angular_stable(self, timeout: str = "20s") -> int:
+        """Wait until Angular is stable; returns the milliseconds waited."""
+        result = self._call("waitForAngularStable", timeoutMs=_ms(timeout))
+        self._record("angular-stable", result)
+        if not result.get("ok"):
+            raise AssertionError(f"Angular not stable within {timeout}: {result.get('error')}")
+        return int(result.get("ms") or 0)
@@ -0,0 +1,93 @@
+// Browser library JS extension: request interception profiles for UI suites.
+//
+// Loaded via `Library    Browser    jsextension=...` in common.robot. Exported
+// functions become keywords; `context` and `logger` are filled in by Browser.
+//
+// A profile is { "abort": [resourceType...], "stub": [resourceType...],
+// "block_third_party": bool, "first_party": [origin...] }. Aborted requests
+// never hit the network; stubbed ones get a tiny local response (e.g. a 1x1 GIF
+// for images) so layout and `img.src` checks keep working.
+
+const TRANSPARENT_GIF = Buffer.from("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7", "base64");
+
+const STUBS = {
+    image: { status: 200, contentType: "image/gif", body: TRANSPARENT_GIF },
+    stylesheet: { status: 200, contentType: "text/css", body: "" },
+    font: { status: 204, body: "" },
+    media: { status: 204, body: "" },
+    script: { status: 200, contentType: "application/javascript", body: "" },
+};
+
+// Cap on per-request rows kept in the stats (counters stay exact).
+const MAX_ROWS = 2000;
+
+const STATS = new WeakMap();
+
+function originOf(url) {
+    try {
+        return new URL(url).origin;
+    } catch (e) {
+        return "";
+    }
+}
+
+function newStats(name) {
+    return { profile: name, allowed: [], aborted: [], stubbed: [], counts: { allowed: 0, aborted: 0, stubbed: 0 } };
+}
+
+function push(stats, kind, row) {
+    stats.counts[kind] += 1;
+    if (stats[kind].length < MAX_ROWS) stats[kind].push(row);
+}
+
+async function applyNetworkProfile(name, profile, context, logger) {
+    const stats = newStats(name);
+    STATS.set(context, stats);
+    const abort = new Set(profile.abort || []);
+    const stub = new Set(profile.stub || []);
+    const firstParty = new Set((profile.first_party || []).map(originOf));
+    const blockThirdParty = Boolean(profile.block_third_party) && firstParty.size > 0;
+    const handled = new WeakSet();
+
+    if (abort.size || stub.size || blockThirdParty) {
+        await context.route("**/*", async (route) => {
+            const req = route.request();
+            const type = req.resourceType();
+            const url = req.url();
+            const origin = originOf(url);
+            const thirdParty = blockThirdParty && origin.startsWith("http") && !firstParty.has(origin);
+            if (stub.has(type) && !thirdParty) {
+                handled.add(req);
+                push(stats, "stubbed", { url, type });
+                return route.fulfill(STUBS[type] || { status: 204, body: "" });
+            }
+            if (abort.has(type) || thirdParty) {
+                handled.add(req);
+                push(stats, "aborted", { url, type });
+                return route.abort("blockedbyclient");
+            }
+            return route.fallback();
+        });
+    }
+
+    // Record what was actually downloaded; the Python side learns resource sizes
+    // from this to estimate the bytes saved by aborted/stubbed requests.
+    context.on("requestfinished", async (req) => {
+        if (handled.has(req)) return;
+        try {
+            const sizes = await req.sizes();
+            push(stats, "allowed", { url: req.url(), type: req.resourceType(), bytes: sizes.responseBodySize + sizes.responseHeadersSize });
+        } catch (e) {
+            // Context closed while the request was in flight.
+        }
+    });
+    logger(`Network profile '${name}': abort=[${[...abort]}] stub=[${[...stub]}] third_party=${blockThirdParty ? "blocked" : "allowed"}`);
+}
+applyNetworkProfile.rfdoc = "Install the interception profile `profile` (named `name`) on the current context.";
+
+async function networkProfileStats(context) {
+    return STATS.get(context) || newStats("none");
+}
+networkProfileStats.rfdoc = "Return allowed/aborted/stubbed request rows recorded for the current context.";
+
+module.exports = { applyNetworkProfile, networkProfileStats };
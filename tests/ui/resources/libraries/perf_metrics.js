@@ -0,0 +1,132 @@
+// Browser library JS extension: frontend performance capture per page visit.
+//
+// `installPerfCapture` adds an init script to the current context that records,
+// per document, Navigation Timing, resource timing, LCP, CLS, long tasks (TBT)
+// and JS heap size. Angular router changes (history.pushState / popstate) start
+// a new "soft" visit. Finished visits are reported to Node through an exposed
+// binding; `collectPerfMetrics` adds a final snapshot of every open page.
+
+const INIT_SCRIPT = `(() => {
+    if (window.__rfPerfSnapshot) return;
+    const totals = { lcp: null, cls: 0, tbt: 0, longTasks: 0 };
+    const observe = (type, fn) => {
+        try {
+            new PerformanceObserver((list) => list.getEntries().forEach(fn)).observe({ type, buffered: true });
+        } catch (e) {}
+    };
+    observe("largest-contentful-paint", (e) => { totals.lcp = e.startTime; });
+    observe("layout-shift", (e) => { if (!e.hadRecentInput) totals.cls += e.value; });
+    observe("longtask", (e) => { totals.longTasks += 1; totals.tbt += Math.max(0, e.duration - 50); });
+
+    let seq = 0;
+    const newVisit = (kind) => ({
+        id: performance.timeOrigin + ":" + (seq++),
+        kind,
+        path: location.pathname,
+        start: kind === "hard" ? 0 : performance.now(),
+        base: { cls: totals.cls, tbt: totals.tbt, longTasks: totals.longTasks },
+    });
+    let visit = newVisit("hard");
+
+    const round = (v) => (v === null || v === undefined ? null : Math.round(v * 10) / 10);
+    const snapshot = () => {
+        const now = performance.now();
+        const resources = performance.getEntriesByType("resource").filter((r) => r.startTime >= visit.start);
+        const byType = {};
+        let bytes = 0;
+        let end = visit.start;
+        for (const r of resources) {
+            const t = (byType[r.initiatorType] = byType[r.initiatorType] || { count: 0, bytes: 0 });
+            t.count += 1;
+            t.bytes += r.transferSize || 0;
+            bytes += r.transferSize || 0;
+            end = Math.max(end, r.responseEnd);
+        }
+        const slowest = resources
+            .slice()
+            .sort((a, b) => b.duration - a.duration)
+            .slice(0, 5)
+            .map((r) => ({ url: r.name, type: r.initiatorType, duration_ms: round(r.duration) }));
+        const out = {
+            id: visit.id,
+            kind: visit.kind,
+            path: visit.path,
+            url: location.href,
+            observed_ms: round(now - visit.start),
+            cls: Math.round((totals.cls - visit.base.cls) * 10000) / 10000,
+            tbt_ms: round(totals.tbt - visit.base.tbt),
+            long_tasks: totals.longTasks - visit.base.longTasks,
+            resources: resources.length,
+            transfer_bytes: bytes,
+            resources_by_type: byType,
+            slowest_resources: slowest,
+            js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null,
+        };
+        if (visit.kind === "hard") {
+            const nav = performance.getEntriesByType("navigation")[0];
+            if (nav) {
+                out.ttfb_ms = round(nav.responseStart);
+                out.dom_content_loaded_ms = round(nav.domContentLoadedEventEnd) || null;
+                out.load_ms = round(nav.loadEventEnd) || null;
+                out.document_bytes = nav.transferSize || 0;
+            }
+            out.lcp_ms = round(totals.lcp);
+        } else {
+            out.duration_ms = round(end - visit.start);
+        }
+        return out;
+    };
+    const report = (snap) => {
+        try {
+            window.__rfPerfReport(snap);
+        } catch (e) {}
+    };
+    for (const method of ["pushState", "replaceState"]) {
+        const original = history[method];
+        history[method] = function (...args) {
+            const before = location.pathname;
+            const snap = snapshot();
+            const result = original.apply(this, args);
+            if (location.pathname !== before) {
+                report(snap);
+                visit = newVisit("soft");
+            }
+            return result;
+        };
+    }
+    addEventListener("popstate", () => {
+        report(Object.assign(snapshot(), { path: visit.path }));
+        visit = newVisit("soft");
+    });
+    addEventListener("pagehide", () => report(snapshot()));
+    window.__rfPerfSnapshot = snapshot;
+})();`;
+
+const VISITS = new WeakMap();
+
+async function installPerfCapture(context, logger) {
+    const visits = new Map();
+    VISITS.set(context, visits);
+    await context.exposeBinding("__rfPerfReport", (_source, snap) => {
+        if (snap && snap.id) visits.set(snap.id, snap);
+    });
+    await context.addInitScript({ content: INIT_SCRIPT });
+    logger("Frontend performance capture installed");
+}
+installPerfCapture.rfdoc = "Record per-visit frontend performance metrics for pages opened in the current context.";
+
+async function collectPerfMetrics(context) {
+    const visits = VISITS.get(context) || new Map();
+    for (const page of context.pages()) {
+        try {
+            const snap = await page.evaluate(() => (window.__rfPerfSnapshot ? window.__rfPerfSnapshot() : null));
+            if (snap && snap.id) visits.set(snap.id, snap);
+        } catch (e) {
+            // Page closed or navigating.
+        }
+    }
+    return [...visits.values()];
+}
+collectPerfMetrics.rfdoc = "Return the visits recorded in the current context (final snapshot of open pages included).";
+
+module.exports = { installPerfCapture, collectPerfMetrics };
@@ -0,0 +1,128 @@
+// Browser library JS extension: event-driven readiness signals.
+//
+// `installReadinessTracker` listens to the current context's network events in
+// the Node process (no polling round trips from Robot). The wait keywords then
+// resolve on the event itself and return how long they waited:
+//
+// - waitForApiResponse: a response whose URL matches `pattern` (responses since
+//   the last main-frame document navigation count, so it never misses one that
+//   finished before the wait started),
+// - waitForNetworkQuiet: no request in flight for `quietMs`,
+// - waitForAngularStable: all Angular testabilities report stable.
+//
+// Timeouts resolve with { ok: false } instead of throwing, so the Python side
+// can report the elapsed time and the last thing it saw.
+
+const TRACKERS = new WeakMap();
+
+function isMainDocument(req) {
+    try {
+        const frame = req.frame();
+        return req.isNavigationRequest() && frame === frame.page().mainFrame();
+    } catch (e) {
+        return false;
+    }
+}
+
+function bodyItems(body) {
+    if (Array.isArray(body)) return body.length;
+    if (body && Array.isArray(body.data)) return body.data.length;
+    return null;
+}
+
+async function installReadinessTracker(context) {
+    const t = { inflight: new Set(), lastActivity: Date.now(), responses: [], listeners: new Set() };
+    TRACKERS.set(context, t);
+    context.on("request", (req) => {
+        if (isMainDocument(req)) t.responses = [];
+        t.inflight.add(req);
+        t.lastActivity = Date.now();
+    });
+    const done = (req) => {
+        t.inflight.delete(req);
+        t.lastActivity = Date.now();
+    };
+    context.on("requestfinished", done);
+    context.on("requestfailed", done);
+    context.on("response", async (resp) => {
+        const entry = { url: resp.url(), status: resp.status(), items: null };
+        if ((resp.headers()["content-type"] || "").includes("json")) {
+            try {
+                entry.items = bodyItems(await resp.json());
+            } catch (e) {
+                // Body unavailable (redirect, navigation in between).
+            }
+        }
+        t.responses.push(entry);
+        for (const listener of t.listeners) listener(entry);
+    });
+}
+installReadinessTracker.rfdoc = "Track network activity of the current context for the readiness waits.";
+
+async function waitForApiResponse(pattern, requireItems, timeoutMs, context) {
+    const t = TRACKERS.get(context);
+    if (!t) throw new Error("Readiness tracker not installed on the current context");
+    const re = new RegExp(pattern);
+    const started = Date.now();
+    let last = null;
+    const accept = (e) => {
+        if (!re.test(e.url)) return false;
+        last = e;
+        return e.status < 400 && (!requireItems || e.items === null || e.items > 0);
+    };
+    const seen = t.responses.filter(accept);
+    if (seen.length) return { ok: true, ms: 0, ...seen[seen.length - 1] };
+    return new Promise((resolve) => {
+        const listener = (e) => {
+            if (!accept(e)) return;
+            finish({ ok: true, ...e });
+        };
+        const timer = setTimeout(() => finish({ ok: false, last }), timeoutMs);
+        const finish = (result) => {
+            clearTimeout(timer);
+            t.listeners.delete(listener);
+            resolve({ ...result, ms: Date.now() - started });
+        };
+        t.listeners.add(listener);
+    });
+}
+waitForApiResponse.rfdoc = "Wait for a successful response whose URL matches `pattern`.";
+
+async function waitForNetworkQuiet(quietMs, timeoutMs, context) {
+    const t = TRACKERS.get(context);
+    if (!t) throw new Error("Readiness tracker not installed on the current context");
+    const started = Date.now();
+    while (Date.now() - started < timeoutMs) {
+        if (t.inflight.size === 0 && Date.now() - t.lastActivity >= quietMs) {
+            return { ok: true, ms: Date.now() - started };
+        }
+        await new Promise((r) => setTimeout(r, 25));
+    }
+    return { ok: false, ms: Date.now() - started, inflight: [...t.inflight].slice(0, 5).map((r) => r.url()) };
+}
+waitForNetworkQuiet.rfdoc = "Wait until no request has been in flight for `quietMs`.";
+
+async function waitForAngularStable(timeoutMs, page) {
+    const started = Date.now();
+    try {
+        // Angular registers its testability while main.js runs, i.e. before the
+        // load event; a loaded document without it is a build without testability.
+        const handle = await page.waitForFunction(
+            () => {
+                const all = window.getAllAngularTestabilities;
+                if (!all) return document.readyState === "complete" ? "absent" : false;
+                const list = all();
+                return list.length > 0 && list.every((x) => x.isStable()) ? "stable" : false;
+            },
+            null,
+            { timeout: timeoutMs, polling: "raf" }
+        );
+        const state = await handle.jsonValue();
+        return { ok: true, ms: Date.now() - started, angular: state === "stable" };
+    } catch (e) {
+        return { ok: false, ms: Date.now() - started, error: String(e.message || e).split("\n")[0] };
+    }
+}
+waitForAngularStable.rfdoc = "Wait until every Angular root reports stable (zone has no pending tasks); resolves once the document is loaded when the build has no Angular testability.";
+
+module.exports = { installReadinessTracker, waitForApiResponse, waitForNetworkQuiet, waitForAngularStable };
@@ -0,0 +1,11 @@
+"""Python tooling for the Toolshop test automation harness.
+
+The modules in this package support the pytest / Robot / k6 suites. They are
+plain Python (stdlib first) so they can run on CI runners without extra setup.
+
+Modules are importable from the repository root, e.g.:
+
+    python -m tools.<module> --help
+
+pytest picks them up via `pythonpath = .` in `pytest.ini`.
+"""
@@ -0,0 +1,92 @@
+"""Helpers for the `artifacts/` directory layout.
+
+Mirrors the conventions implemented in the Makefile:
+
+- UI:  artifacts/ui/<suite>/run-XXX/
+- API: artifacts/api/<suite>/
+- k6:  artifacts/k6/<scenario>/run-XXX/
+
+Run folders are numbered with three digits (run-001, run-002, ...).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Optional
+
+RUN_DIR_PATTERN = re.compile(r"^run-(\d+)$")
+
+
+def env(name: str, default: str) -> str:
+    """Read an environment variable with a safe default.
+
+    Args:
+        name: Environment variable name.
+        default: Fallback value if variable is missing or empty.
+
+    Returns:
+        The stripped value if present and non-empty, otherwise the default.
+    """
+    v = os.getenv(name)
+    return v.strip() if isinstance(v, str) and v.strip() else default
+
+
+def artifacts_root() -> Path:
+    """Return the artifacts root directory (ARTIFACTS env, default "artifacts")."""
+    return Path(env("ARTIFACTS", "artifacts"))
+
+
+def run_number(path: Path) -> Optional[int]:
+    """Return the numeric suffix of a run-XXX directory, or None."""
+    m = RUN_DIR_PATTERN.match(path.name)
+    return int(m.group(1)) if m else None
+
+
+def list_run_dirs(base_dir: Path) -> list[Path]:
+    """List run-XXX directories below `base_dir`, oldest first."""
+    if not base_dir.is_dir():
+        return []
+    runs = [p for p in base_dir.iterdir() if p.is_dir() and run_number(p) is not None]
+    return sorted(runs, key=lambda p: run_number(p) or 0)
+
+
+def latest_run_dir(base_dir: Path) -> Optional[Path]:
+    """Return the most recent run-XXX directory below `base_dir`, if any."""
+    runs = list_run_dirs(base_dir)
+    return runs[-1] if runs else None
+
+
+def next_run_dir(base_dir: Path, create: bool = True) -> Path:
+    """Allocate the next run-XXX directory (same numbering as the Makefile).
+
+    Args:
+        base_dir: Suite/scenario directory, e.g. artifacts/k6/smoke.
+        create: Create the directory (and parents) when True.
+
+    Returns:
+        Path of the new run directory.
+    """
+    last = latest_run_dir(base_dir)
+    nxt = (run_number(last) or 0) + 1 if last else 1
+    out = base_dir / f"run-{nxt:03d}"
+    if create:
+        out.mkdir(parents=True, exist_ok=True)
+    return out
+
+
+def write_json(path: Path, data: Any) -> Path:
+    """Write pretty-printed JSON (creating parent directories).
+
+    Args:
+        path: Output file path.
+        data: JSON-serializable data.
+
+    Returns:
+        The written path.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return path
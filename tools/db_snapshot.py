@@ -0,0 +1,318 @@
+"""MariaDB snapshot/restore seed manager.
+
+`make seed` used to run `php artisan migrate:fresh --seed` (SEED_CMD) on every
+run. This module seeds once, snapshots the database with `mysqldump` into a
+gzip file keyed by the API image digest (plus the seed command), and on later
+runs restores that snapshot instead, which takes seconds for the demo dataset.
+
+A logical dump was chosen over copying the data-directory volume: it does not
+require stopping MariaDB and is independent of the storage engine layout.
+
+Every seed/restore is verified: the `products` table must be non-empty (what
+`make verify-seed` checks) and, after a restore, every table must have the row
+count recorded when the snapshot was taken. A failed restore falls back to a
+full seed and re-snapshots.
+
+Usage
+-----
+    python -m tools.db_snapshot seed       # restore if a snapshot exists, else seed + snapshot
+    python -m tools.db_snapshot snapshot   # (re)create the snapshot from the current DB
+    python -m tools.db_snapshot restore
+    python -m tools.db_snapshot verify
+    python -m tools.db_snapshot list
+
+Environment variables
+---------------------
+- DC:               compose command (default: "docker compose"; the Makefile passes its own)
+- COMPOSE_FILE:     compose file the API image digest is read from
+- API_SERVICE / DB_SERVICE / DB_NAME / SEED_CMD: same as the Makefile
+- DB_SNAPSHOT_DIR:  snapshot directory (default: .cache/db-snapshots)
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from tools.artifacts import env, write_json
+from tools.openapi_impact import api_image_digest
+
+CHUNK_SIZE = 1 << 20
+
+DUMP_OPTIONS = (
+    "--single-transaction --quick --extended-insert --routines --triggers "
+    "--add-drop-table --skip-comments --skip-dump-date"
+)
+
+# Wrapped around the dump on restore: skip per-row checks and commit once.
+RESTORE_HEADER = b"SET foreign_key_checks=0; SET unique_checks=0; SET autocommit=0;\n"
+RESTORE_FOOTER = b"\nCOMMIT; SET unique_checks=1; SET foreign_key_checks=1;\n"
+
+_ROOT = '-uroot -p"$MYSQL_ROOT_PASSWORD" -h 127.0.0.1'
+
+
+@dataclass
+class Settings:
+    """Where the stack lives and how it is seeded."""
+
+    dc: list[str]
+    compose_file: Path
+    api_service: str
+    db_service: str
+    db_name: str
+    seed_cmd: str
+    snapshot_dir: Path
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            dc=shlex.split(env("DC", "docker compose")),
+            compose_file=Path(env("COMPOSE_FILE", "docker/docker-compose.yml")),
+            api_service=env("API_SERVICE", "laravel-api"),
+            db_service=env("DB_SERVICE", "mariadb"),
+            db_name=env("DB_NAME", "toolshop"),
+            seed_cmd=env("SEED_CMD", "php artisan migrate:fresh --seed"),
+            snapshot_dir=Path(env("DB_SNAPSHOT_DIR", ".cache/db-snapshots")),
+        )
+
+    def exec_db(self, script: str) -> list[str]:
+        """argv running a shell script inside the DB container."""
+        return [*self.dc, "exec", "-T", self.db_service, "sh", "-lc", script]
+
+
+# -----------------------------------------------------------------------------
+# Snapshot identity
+# -----------------------------------------------------------------------------
+def snapshot_key(settings: Settings) -> str:
+    """Snapshot key: API image digest + hash of the seed command."""
+    digest = api_image_digest(settings.compose_file, settings.api_service) or "unpinned"
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", digest.replace("sha256:", ""))[:24]
+    seed = hashlib.sha1(settings.seed_cmd.encode()).hexdigest()[:8]
+    return f"{settings.db_name}-{slug}-{seed}"
+
+
+def snapshot_paths(settings: Settings) -> tuple[Path, Path]:
+    """(dump file, metadata file) for the current key."""
+    key = snapshot_key(settings)
+    return settings.snapshot_dir / f"{key}.sql.gz", settings.snapshot_dir / f"{key}.json"
+
+
+# -----------------------------------------------------------------------------
+# Database operations
+# -----------------------------------------------------------------------------
+def _query(settings: Settings, sql: str) -> str:
+    script = f"mysql -N -B {_ROOT} -e {shlex.quote(sql)} {shlex.quote(settings.db_name)}"
+    return subprocess.run(settings.exec_db(script), check=True, capture_output=True, text=True).stdout
+
+
+def table_counts(settings: Settings) -> dict[str, int]:
+    """Exact row count of every base table in the database."""
+    tables = _query(
+        settings,
+        "SELECT table_name FROM information_schema.tables "
+        f"WHERE table_schema = '{settings.db_name}' AND table_type = 'BASE TABLE' ORDER BY table_name;",
+    ).split()
+    if not tables:
+        return {}
+    union = " UNION ALL ".join(f"SELECT '{t}', COUNT(*) FROM `{t}`" for t in tables)
+    counts: dict[str, int] = {}
+    for line in _query(settings, union + ";").splitlines():
+        name, _, value = line.partition("\t")
+        if value.strip().isdigit():
+            counts[name] = int(value)
+    return counts
+
+
+def table_checksums(settings: Settings, exclude: tuple[str, ...] = ()) -> dict[str, str]:
+    """Content checksum (CHECKSUM TABLE) of every base table, except `exclude`."""
+    tables = [
+        t
+        for t in _query(
+            settings,
+            "SELECT table_name FROM information_schema.tables "
+            f"WHERE table_schema = '{settings.db_name}' AND table_type = 'BASE TABLE' ORDER BY table_name;",
+        ).split()
+        if t not in exclude
+    ]
+    if not tables:
+        return {}
+    checksums: dict[str, str] = {}
+    for line in _query(settings, f"CHECKSUM TABLE {', '.join(f'`{t}`' for t in tables)};").splitlines():
+        name, _, value = line.partition("\t")
+        checksums[name.rsplit(".", 1)[-1]] = value.strip()
+    return checksums
+
+
+def verify(settings: Settings, expected: Optional[dict[str, int]] = None) -> list[str]:
+    """Return verification problems (empty list == OK).
+
+    Same check as `make verify-seed` (products > 0), plus exact per-table row
+    counts when `expected` is given.
+    """
+    try:
+        counts = table_counts(settings)
+    except subprocess.CalledProcessError as exc:
+        return [f"cannot query {settings.db_name}: {exc.stderr.strip() or exc}"]
+    problems = []
+    if counts.get("products", 0) <= 0:
+        problems.append(f"products count is {counts.get('products', 0)}")
+    for table, want in (expected or {}).items():
+        if counts.get(table) != want:
+            problems.append(f"{table}: expected {want} rows, found {counts.get(table)}")
+    return problems
+
+
+def run_seed(settings: Settings) -> None:
+    """Run SEED_CMD in the API container."""
+    print(f"Running seed: {settings.seed_cmd}")
+    subprocess.run([*settings.dc, "exec", "-T", settings.api_service, *shlex.split(settings.seed_cmd)], check=True)
+
+
+def create_snapshot(settings: Settings) -> Path:
+    """Dump the database into the snapshot file and record its table counts."""
+    dump, meta = snapshot_paths(settings)
+    dump.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dump.with_name(f".{dump.name}.{os.getpid()}.tmp")  # parallel stacks may snapshot at once
+    started = time.monotonic()
+    script = f"mysqldump {DUMP_OPTIONS} {_ROOT} {shlex.quote(settings.db_name)}"
+    with subprocess.Popen(settings.exec_db(script), stdout=subprocess.PIPE) as proc, gzip.open(tmp, "wb", 6) as out:
+        assert proc.stdout is not None
+        for chunk in iter(lambda: proc.stdout.read(CHUNK_SIZE), b""):
+            out.write(chunk)
+    if proc.returncode != 0:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"mysqldump failed with exit code {proc.returncode}")
+    tmp.replace(dump)
+    write_json(
+        meta,
+        {
+            "key": snapshot_key(settings),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "seed_cmd": settings.seed_cmd,
+            "bytes": dump.stat().st_size,
+            "tables": table_counts(settings),
+        },
+    )
+    print(f"Snapshot written: {dump} ({dump.stat().st_size} bytes, {time.monotonic() - started:.1f}s)")
+    return dump
+
+
+def restore_snapshot(settings: Settings) -> dict[str, int]:
+    """Recreate the database from the snapshot; returns the expected table counts."""
+    dump, meta = snapshot_paths(settings)
+    if not dump.is_file() or not meta.is_file():
+        raise FileNotFoundError(f"No snapshot {dump}")
+    started = time.monotonic()
+    db = settings.db_name
+    reset = f"mysql {_ROOT} -e 'DROP DATABASE IF EXISTS `{db}`; CREATE DATABASE `{db}`;'"
+    subprocess.run(settings.exec_db(reset), check=True)
+    script = f"mysql {_ROOT} {shlex.quote(db)}"
+    with subprocess.Popen(settings.exec_db(script), stdin=subprocess.PIPE) as proc, gzip.open(dump, "rb") as src:
+        assert proc.stdin is not None
+        try:
+            proc.stdin.write(RESTORE_HEADER)
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                proc.stdin.write(chunk)
+            proc.stdin.write(RESTORE_FOOTER)
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass  # mysql exited early; reported via the return code below
+    if proc.returncode != 0:
+        raise RuntimeError(f"restore failed with exit code {proc.returncode}")
+    print(f"Snapshot restored: {dump} ({time.monotonic() - started:.1f}s)")
+    return json.loads(meta.read_text(encoding="utf-8")).get("tables", {})
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _report(problems: list[str]) -> int:
+    for p in problems:
+        print(f"Seed verification failed: {p}")
+    if not problems:
+        print("Seed verification OK")
+    return 1 if problems else 0
+
+
+def _cmd_seed(settings: Settings, args: argparse.Namespace) -> int:
+    dump, _ = snapshot_paths(settings)
+    if dump.is_file() and not args.force:
+        try:
+            problems = verify(settings, restore_snapshot(settings))
+        except (RuntimeError, FileNotFoundError, subprocess.CalledProcessError) as exc:
+            problems = [str(exc)]
+        if not problems:
+            return _report(problems)
+        print("Restore did not verify; falling back to a full seed.")
+        _report(problems)
+    run_seed(settings)
+    problems = verify(settings)
+    if problems:
+        return _report(problems)
+    create_snapshot(settings)
+    return _report(problems)
+
+
+def _cmd_snapshot(settings: Settings, args: argparse.Namespace) -> int:
+    problems = verify(settings)
+    if problems:
+        return _report(problems)
+    create_snapshot(settings)
+    return 0
+
+
+def _cmd_restore(settings: Settings, args: argparse.Namespace) -> int:
+    return _report(verify(settings, restore_snapshot(settings)))
+
+
+def _cmd_verify(settings: Settings, args: argparse.Namespace) -> int:
+    _, meta = snapshot_paths(settings)
+    expected = json.loads(meta.read_text(encoding="utf-8")).get("tables") if args.against_snapshot else None
+    return _report(verify(settings, expected))
+
+
+def _cmd_list(settings: Settings, args: argparse.Namespace) -> int:
+    current = snapshot_key(settings)
+    for meta in sorted(settings.snapshot_dir.glob("*.json")):
+        data = json.loads(meta.read_text(encoding="utf-8"))
+        mark = "*" if data.get("key") == current else " "
+        print(f"{mark} {data.get('key')}  {data.get('created')}  {data.get('bytes')} bytes")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.db_snapshot", description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    seed = sub.add_parser("seed", help="restore the snapshot, or seed and snapshot")
+    seed.add_argument("--force", action="store_true", help="always run SEED_CMD and re-snapshot")
+    sub.add_parser("snapshot", help="snapshot the current database")
+    sub.add_parser("restore", help="restore the snapshot for the current key")
+    verify_p = sub.add_parser("verify", help="check the seeded database")
+    verify_p.add_argument("--against-snapshot", action="store_true", help="also compare table row counts")
+    sub.add_parser("list", help="list snapshots (* = current key)")
+    args = parser.parse_args(argv)
+
+    handlers = {
+        "seed": _cmd_seed,
+        "snapshot": _cmd_snapshot,
+        "restore": _cmd_restore,
+        "verify": _cmd_verify,
+        "list": _cmd_list,
+    }
+    return handlers[args.command](Settings.from_env(), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""Endpoint grouping shared by the API test plugins and the load tooling.
+
+A request is reduced to its method, its path with identifier segments
+replaced by `{id}`, and the sorted *names* of its query parameters, e.g.
+"GET /products/{id}" or "GET /products?page,sort". The adaptive timeouts
+(tools/pytest_adaptive_timeouts.py) bucket latencies by this key, and the
+workload model (tools/workload_model.py) uses it as its Markov states.
+`ID_SEGMENT` is also written into the workload model, so load/k6/journey.js
+recognises the same identifier segments without a copy of the pattern.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+# Path segments that are identifiers rather than routes: numbers, UUIDs, ULIDs.
+ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F-]{32,36}|[0-9A-Za-z]{26})$")
+
+
+def endpoint_key(method: str, url: str, params: Any = None) -> str:
+    """Return the endpoint of a request, e.g. "GET /products/{id}?page,sort".
+
+    Args:
+        method: HTTP method (any case).
+        url: Absolute URL or path, optionally with a query string.
+        params: `requests`-style params (dict or list of pairs) merged into the query names.
+    """
+    parts = urlsplit(url)
+    path = "/".join("{id}" if ID_SEGMENT.match(seg) else seg for seg in parts.path.split("/")) or "/"
+    names = {k for k, _ in parse_qsl(parts.query, keep_blank_values=True)}
+    if isinstance(params, dict):
+        names.update(str(k) for k in params)
+    elif isinstance(params, (list, tuple)):
+        names.update(str(p[0]) for p in params if isinstance(p, (list, tuple)) and p)
+    query = f"?{','.join(sorted(names))}" if names else ""
+    return f"{method.upper()} {path}{query}"
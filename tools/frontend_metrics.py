@@ -0,0 +1,157 @@
+"""Per-route aggregation of frontend performance metrics from Robot runs.
+
+The UI keyword library tests/ui/resources/libraries/FrontendMetrics.py writes
+one `frontend/<suite>.json` per suite into the robot output directory (or per
+worker for `tools.robot_parallel`). This module folds them into a single
+`<run dir>/frontend_metrics.json`:
+
+    {
+      "format": "toolshop.frontend-metrics/v1",
+      "routes": {
+        "/product/:id": {
+          "visits": 6, "hard": 2, "soft": 4,
+          "metrics": {"lcp_ms": {"count": 2, "p50": ..., "p95": ..., "max": ...}, ...}
+        }
+      },
+      "violations": [...],
+      "readiness": {"api:products": {"count": 14, "failures": 0, "p50": ..., "p95": ..., "max": ...}}
+    }
+
+`readiness` summarizes the timed waits written by
+tests/ui/resources/libraries/Readiness.py (`readiness/<suite>.json`).
+
+Usage
+-----
+    python -m tools.frontend_metrics artifacts/ui/smoke/run-007
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+from tools.artifacts import write_json
+
+FORMAT = "toolshop.frontend-metrics/v1"
+OUTPUT_NAME = "frontend_metrics.json"
+
+# Numeric per-visit fields summarized per route.
+METRICS = (
+    "ttfb_ms",
+    "dom_content_loaded_ms",
+    "load_ms",
+    "lcp_ms",
+    "cls",
+    "tbt_ms",
+    "long_tasks",
+    "duration_ms",
+    "resources",
+    "transfer_bytes",
+    "js_heap_bytes",
+)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list (q in 0..100)."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def aggregate(run_dir: Path) -> dict[str, Any]:
+    """Aggregate every `frontend/*.json` below `run_dir` per route."""
+    visits: list[dict[str, Any]] = []
+    violations: list[dict[str, Any]] = []
+    suites = 0
+    for path in sorted(run_dir.rglob("frontend/*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        suites += 1
+        for v in data.get("visits", []):
+            visits.append({**v, "suite": data.get("suite")})
+        for v in data.get("violations", []):
+            violations.append({**v, "suite": data.get("suite")})
+
+    routes: dict[str, Any] = {}
+    for route in sorted({str(v.get("route", "?")) for v in visits}):
+        rv = [v for v in visits if v.get("route") == route]
+        metrics: dict[str, Any] = {}
+        for name in METRICS:
+            values = [float(v[name]) for v in rv if isinstance(v.get(name), (int, float))]
+            if values:
+                metrics[name] = {
+                    "count": len(values),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "max": max(values),
+                }
+        routes[route] = {
+            "visits": len(rv),
+            "hard": sum(1 for v in rv if v.get("kind") == "hard"),
+            "soft": sum(1 for v in rv if v.get("kind") == "soft"),
+            "metrics": metrics,
+        }
+    return {
+        "format": FORMAT,
+        "suites": suites,
+        "routes": routes,
+        "violations": violations,
+        "readiness": aggregate_readiness(run_dir),
+    }
+
+
+def aggregate_readiness(run_dir: Path) -> dict[str, Any]:
+    """Summarize the timed readiness waits below `run_dir` per wait name."""
+    waits: dict[str, list[dict[str, Any]]] = {}
+    for path in sorted(run_dir.rglob("readiness/*.json")):
+        for w in json.loads(path.read_text(encoding="utf-8")).get("waits", []):
+            waits.setdefault(str(w.get("wait")), []).append(w)
+    out: dict[str, Any] = {}
+    for name, rows in sorted(waits.items()):
+        values = [float(w["ms"]) for w in rows if isinstance(w.get("ms"), (int, float))]
+        out[name] = {
+            "count": len(rows),
+            "failures": sum(1 for w in rows if not w.get("ok")),
+            **({"p50": percentile(values, 50), "p95": percentile(values, 95), "max": max(values)} if values else {}),
+        }
+    return out
+
+
+def write_summary(run_dir: Path) -> Optional[Path]:
+    """Write `<run_dir>/frontend_metrics.json`; None when no suite recorded metrics."""
+    summary = aggregate(run_dir)
+    if not summary["suites"] and not summary["readiness"]:
+        return None
+    out = run_dir / OUTPUT_NAME
+    write_json(out, summary)
+    return out
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.frontend_metrics", description=__doc__.split("\n")[0])
+    parser.add_argument("run_dir", type=Path, help="robot output directory (run-XXX)")
+    args = parser.parse_args(argv)
+
+    out = write_summary(args.run_dir)
+    if out is None:
+        print(f"No frontend metrics under {args.run_dir}")
+        return 0
+    summary = json.loads(out.read_text(encoding="utf-8"))
+    for route, data in summary["routes"].items():
+        lcp = data["metrics"].get("lcp_ms", {}).get("p95")
+        load = data["metrics"].get("load_ms", {}).get("p95")
+        print(f"{route:<24} visits={data['visits']:<3} lcp_p95={lcp} load_p95={load}")
+    for wait, data in summary["readiness"].items():
+        print(f"wait {wait:<19} count={data['count']:<3} p95_ms={data.get('p95')} failures={data['failures']}")
+    if summary["violations"]:
+        print(f"{len(summary['violations'])} budget violation(s)")
+    print(f"Frontend metrics: {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""A/B benchmark of gateway (nginx) and PHP-FPM pool configuration variants.
+
+docker/nginx/default.conf is a plain FastCGI pass-through. Before tuning it
+(upstream keepalive, buffers, micro-caching, pool sizing) we want numbers. This
+runner applies each configuration variant to the running stack, drives the same
+k6 workload against it and writes a side-by-side comparison.
+
+A variant is a directory `docker/variants/<name>/` with
+- nginx.conf:    replaces docker/nginx/default.conf in the `web` container
+                 (includes docker/nginx/timing.conf, which stays mounted)
+- php-fpm.conf:  extra pool config for the API container, loaded after the
+                 image's own (FPM_POOL_TARGET)
+
+"baseline" is the stock configuration and the reference for every delta.
+
+Each variant is applied through a generated compose override and `make up`,
+which recreates only the changed containers (the seeded DB volume is kept).
+It is then warmed up and measured. Every round runs every variant, and the
+order rotates per round, so drift (cache warm-up, noisy neighbours) does not
+favour one of them.
+
+Artifacts: artifacts/gateway-ab/run-XXX/
+    compose.<variant>.yml
+    <variant>/round-N/{summary.json,metrics.json.gz,k6_summary.json}
+    comparison.json, comparison.md
+
+Per endpoint (`name` tag) and run-wide ("*") the comparison reports the median
+over rounds of rps, p50/p95/p99 and error rate, the change against baseline, and
+a one-sided Mann-Whitney p-value over the pooled latency samples (tools/trends.py).
+
+Usage
+-----
+    make up seed
+    python -m tools.gateway_ab --variant baseline --variant upstream-keepalive --rounds 3
+    python -m tools.gateway_ab --list
+
+Environment variables
+---------------------
+- API_HOST / COMPOSE_PROJECT_NAME / WEB_PORT: the stack under test (as in the Makefile)
+- WEB_SERVICE / API_SERVICE: compose service names (default: web / laravel-api)
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from tools.artifacts import artifacts_root, env, next_run_dir, write_json
+from tools.k6_summary import DEFAULT_OUTPUT_NAME, summarize
+from tools.trends import ALL_ENDPOINTS, RunRecord, mann_whitney_greater
+
+VARIANTS_DIR = Path("docker/variants")
+BASELINE = "baseline"
+
+NGINX_TARGET = "/etc/nginx/conf.d/default.conf"
+FPM_POOL_TARGET = "/usr/local/etc/php-fpm.d/zz-variant.conf"
+
+COMPARED_METRICS = ("rps", "p50", "p95", "p99", "error_rate")
+
+# p-value below which a latency difference is called significant.
+SIGNIFICANCE = 0.05
+
+
+@dataclass
+class Variant:
+    """One gateway / pool configuration."""
+
+    name: str
+    nginx: Optional[Path] = None
+    fpm_pool: Optional[Path] = None
+
+    @classmethod
+    def load(cls, name: str, root: Path = VARIANTS_DIR) -> "Variant":
+        """Resolve a variant by name ("baseline" or a directory below `root`)."""
+        if name == BASELINE:
+            return cls(name)
+        directory = root / name
+        nginx, pool = directory / "nginx.conf", directory / "php-fpm.conf"
+        variant = cls(name, nginx if nginx.is_file() else None, pool if pool.is_file() else None)
+        if variant.nginx is None and variant.fpm_pool is None:
+            raise ValueError(f"{directory} has neither nginx.conf nor php-fpm.conf")
+        return variant
+
+    def compose_override(self, web_service: str, api_service: str) -> Optional[str]:
+        """Compose override mounting the variant's files (None for baseline).
+
+        Compose merges `volumes` by container path, so the nginx mount replaces
+        the stock default.conf mount. Paths are absolute because compose resolves
+        relative ones against the first compose file's directory.
+        """
+        mounts = {
+            web_service: [(self.nginx, NGINX_TARGET)] if self.nginx else [],
+            api_service: [(self.fpm_pool, FPM_POOL_TARGET)] if self.fpm_pool else [],
+        }
+        lines = ["services:"]
+        for service, pairs in mounts.items():
+            if not pairs:
+                continue
+            lines += [f"  {service}:", "    volumes:"]
+            lines += [f'      - "{src.resolve()}:{target}:ro"' for src, target in pairs]
+        return "\n".join(lines) + "\n" if len(lines) > 1 else None
+
+
+def available_variants(root: Path = VARIANTS_DIR) -> list[str]:
+    """Baseline plus every variant directory."""
+    names = sorted(p.name for p in root.iterdir() if p.is_dir()) if root.is_dir() else []
+    return [BASELINE, *names]
+
+
+def round_order(names: list[str], round_no: int) -> list[str]:
+    """Rotate the variant order per round (round 1: as given)."""
+    shift = (round_no - 1) % len(names)
+    return names[shift:] + names[:shift]
+
+
+# -----------------------------------------------------------------------------
+# Running
+# -----------------------------------------------------------------------------
+def _make_env(override: Optional[Path]) -> dict[str, str]:
+    inherited = {k: v for k, v in os.environ.items() if k not in ("MAKEFLAGS", "MFLAGS", "MAKELEVEL")}
+    return {**inherited, "COMPOSE_OVERRIDE": str(override) if override else ""}
+
+
+def apply_variant(variant: Variant, run_dir: Path, log: Path) -> int:
+    """Write the variant's compose override and `make up wait-api` with it."""
+    override = None
+    text = variant.compose_override(env("WEB_SERVICE", "web"), env("API_SERVICE", "laravel-api"))
+    if text is not None:
+        override = run_dir / f"compose.{variant.name}.yml"
+        override.write_text(text, encoding="utf-8")
+    log.parent.mkdir(parents=True, exist_ok=True)
+    with log.open("ab") as out:
+        return subprocess.call(
+            ["make", "--no-print-directory", "up", "wait-api"],
+            env=_make_env(override),
+            stdout=out,
+            stderr=subprocess.STDOUT,
+        )
+
+
+def run_k6(script: str, duration: str, vus: int, extra_env: dict[str, str], out_dir: Optional[Path]) -> int:
+    """Run one k6 workload (no outputs when `out_dir` is None, e.g. warm-up)."""
+    k6_env = {
+        **os.environ,
+        "API_URL": env("API_HOST", "http://localhost:8091"),
+        "VUS": str(vus),
+        "DURATION": duration,
+        **extra_env,
+    }
+    cmd = [env("K6", "k6"), "run", "--no-thresholds", "--quiet"]
+    if out_dir is None:
+        cmd.append("--no-summary")
+    else:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        cmd += [f"--summary-export={out_dir / 'summary.json'}", f"--out=json={out_dir / 'metrics.json.gz'}"]
+    return subprocess.call([*cmd, script], env=k6_env, stdout=subprocess.DEVNULL if out_dir is None else None)
+
+
+# -----------------------------------------------------------------------------
+# Comparison
+# -----------------------------------------------------------------------------
+def _median(values: list[float]) -> Optional[float]:
+    return statistics.median(values) if values else None
+
+
+def compare(results: dict[str, list[RunRecord]], baseline: str = BASELINE) -> dict[str, Any]:
+    """Side-by-side medians per variant/endpoint with deltas against `baseline`.
+
+    Returns:
+        {"baseline": name, "variants": [...], "endpoints": {endpoint: {variant: {...}}}}
+    """
+    endpoints = sorted({ep for records in results.values() for r in records for ep in r.metrics})
+    table: dict[str, dict[str, Any]] = {}
+    for ep in endpoints:
+        row: dict[str, Any] = {}
+        base_samples = [v for r in results.get(baseline, []) for v in r.samples.get(ep, [])]
+        for name, records in results.items():
+            cell: dict[str, Any] = {"rounds": sum(1 for r in records if ep in r.metrics)}
+            for metric in COMPARED_METRICS:
+                value = _median([r.metrics[ep][metric] for r in records if metric in r.metrics.get(ep, {})])
+                if value is not None:
+                    cell[metric] = round(value, 4)
+            samples = [v for r in records for v in r.samples.get(ep, [])]
+            if name != baseline and samples and base_samples:
+                cell["p_faster"] = round(mann_whitney_greater(base_samples, samples), 4)
+                cell["p_slower"] = round(mann_whitney_greater(samples, base_samples), 4)
+            row[name] = cell
+        base = row.get(baseline, {})
+        for name, cell in row.items():
+            if name == baseline:
+                continue
+            for metric in COMPARED_METRICS:
+                if metric in cell and base.get(metric):
+                    cell[f"{metric}_change"] = round((cell[metric] - base[metric]) / base[metric], 4)
+        table[ep] = row
+    return {"baseline": baseline, "variants": list(results), "endpoints": table}
+
+
+def _verdict(cell: dict[str, Any]) -> str:
+    if cell.get("p_faster", 1.0) < SIGNIFICANCE:
+        return "faster"
+    if cell.get("p_slower", 1.0) < SIGNIFICANCE:
+        return "slower"
+    return "~"
+
+
+def render_markdown(comparison: dict[str, Any]) -> str:
+    """Markdown tables: one per endpoint, one row per variant (change vs. baseline in brackets)."""
+    baseline = comparison["baseline"]
+    lines = [f"# Gateway A/B comparison (baseline: {baseline})", ""]
+    endpoints = sorted(comparison["endpoints"], key=lambda ep: (ep != ALL_ENDPOINTS, ep))
+    for ep in endpoints:
+        lines += [f"## {ep}", "", "| variant | rps | p50 ms | p95 ms | p99 ms | errors | latency |", "|---|---|---|---|---|---|---|"]
+        for name, cell in comparison["endpoints"][ep].items():
+            parts = []
+            for metric in COMPARED_METRICS:
+                value = cell.get(metric)
+                if value is None:
+                    parts.append("-")
+                    continue
+                text = f"{value:.2%}" if metric == "error_rate" else f"{value:.1f}"
+                change = cell.get(f"{metric}_change")
+                if change is not None:
+                    text += f" ({change:+.0%})"
+                parts.append(text)
+            lines.append(f"| {name} | {' | '.join(parts)} | {'-' if name == baseline else _verdict(cell)} |")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.gateway_ab", description=__doc__.split("\n")[0])
+    parser.add_argument("--variant", action="append", default=None, help="variant name (repeatable; default: all)")
+    parser.add_argument("--list", action="store_true", help="list variants and exit")
+    parser.add_argument("--rounds", type=int, default=2, help="measurements per variant (order rotates per round)")
+    parser.add_argument("--script", default="load/k6/smoke.js", help="k6 workload (identical for every variant)")
+    parser.add_argument("--vus", type=int, default=10)
+    parser.add_argument("--duration", default="1m")
+    parser.add_argument("--warmup", default="15s", help="unmeasured k6 run after each switch ('0' disables)")
+    parser.add_argument("--k6-env", action="append", default=[], metavar="KEY=VALUE", help="extra k6 script env")
+    parser.add_argument("--keep", action="store_true", help="leave the last variant applied")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(available_variants()))
+        return 0
+    names = list(dict.fromkeys(args.variant or available_variants()))
+    if BASELINE not in names:
+        names.insert(0, BASELINE)
+    try:
+        variants = {name: Variant.load(name) for name in names}
+    except ValueError as exc:
+        parser.error(str(exc))
+    extra_env = dict(kv.split("=", 1) for kv in args.k6_env if "=" in kv)
+
+    run_dir = next_run_dir(artifacts_root() / "gateway-ab")
+    log = run_dir / "stack.log"
+    print(f"gateway A/B: {', '.join(names)} x {args.rounds} round(s) -> {run_dir}")
+
+    results: dict[str, list[RunRecord]] = {name: [] for name in names}
+    timings: list[dict[str, Any]] = []
+    try:
+        for round_no in range(1, args.rounds + 1):
+            for name in round_order(names, round_no):
+                started = time.monotonic()
+                if apply_variant(variants[name], run_dir, log) != 0:
+                    print(f"{name}: stack did not come up (see {log}); skipped")
+                    timings.append({"variant": name, "round": round_no, "error": "make up failed"})
+                    continue
+                if args.warmup not in ("", "0", "0s"):
+                    run_k6(args.script, args.warmup, args.vus, extra_env, None)
+                out = run_dir / name / f"round-{round_no}"
+                rc = run_k6(args.script, args.duration, args.vus, extra_env, out)
+                metrics = out / "metrics.json.gz"
+                if not metrics.is_file():
+                    print(f"{name} round {round_no}: no k6 output (exit {rc})")
+                    continue
+                record = summarize(metrics)
+                write_json(out / DEFAULT_OUTPUT_NAME, record.to_json())
+                results[name].append(record)
+                overall = record.metrics.get(ALL_ENDPOINTS, {})
+                print(
+                    f"{name} round {round_no}: rps={overall.get('rps', 0):.1f} "
+                    f"p95={overall.get('p95', 0):.1f}ms err={overall.get('error_rate', 0):.2%}"
+                )
+                timings.append({"variant": name, "round": round_no, "k6_exit": rc, "seconds": round(time.monotonic() - started, 1)})
+    finally:
+        if not args.keep:
+            apply_variant(variants[BASELINE], run_dir, log)
+
+    comparison = compare({k: v for k, v in results.items() if v})
+    comparison["runs"] = timings
+    comparison["workload"] = {"script": args.script, "vus": args.vus, "duration": args.duration, "env": extra_env}
+    write_json(run_dir / "comparison.json", comparison)
+    markdown = render_markdown(comparison)
+    (run_dir / "comparison.md").write_text(markdown, encoding="utf-8")
+    print(markdown)
+    return 0 if results[BASELINE] and all(results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
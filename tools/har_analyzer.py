@@ -0,0 +1,339 @@
+"""Streaming HAR analysis: critical path, redundant calls, compression, caching.
+
+Robot UI runs record one HAR per browser context when `RECORD_HAR=true` (see
+`Open Toolshop` in tests/ui/resources/keywords/common.robot). HAR files are a
+single JSON document that can get large (many product images), so entries are
+decoded one at a time from the `entries` array instead of loading the file.
+
+Per HAR (one context) the analyzer computes:
+
+- critical path: the chain of requests that ends last, where each step
+  started after the previous one finished (HAR has no initiator data, so
+  "started after" approximates "depended on"); steps taking at least
+  CRITICAL_SHARE of the path are reported,
+- duplicate / redundant calls: the same method + URL (query order ignored)
+  fetched more than once in one context; API calls (/products, /brands,
+  /categories, ...) are flagged separately,
+- uncompressed payloads: compressible responses (JSON, JS, CSS, HTML, SVG)
+  above COMPRESS_MIN_BYTES without Content-Encoding,
+- cacheability: static assets served without Cache-Control/Expires or
+  validators, or marked no-store.
+
+Findings are ranked by estimated impact (ms or bytes) and written to
+`<run dir>/har_report.json`, next to Robot's output.xml.
+
+Usage
+-----
+    python -m tools.har_analyzer artifacts/ui/regression/run-012
+    python -m tools.har_analyzer some.har other.har --out /tmp/report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import re
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from tools.artifacts import write_json
+
+REPORT_NAME = "har_report.json"
+
+CHUNK_SIZE = 1 << 16
+
+# Responses smaller than this are not worth compressing.
+COMPRESS_MIN_BYTES = 1024
+
+# Critical-path steps below this share of the path are not reported as findings.
+CRITICAL_SHARE = 0.05
+
+# Typical gzip ratio for text payloads (used for the bytes-saved estimate).
+COMPRESS_RATIO = 0.3
+
+_COMPRESSIBLE = re.compile(r"json|javascript|ecmascript|text/|css|html|xml|svg", re.IGNORECASE)
+_STATIC = re.compile(r"javascript|ecmascript|css|image/|font/|woff", re.IGNORECASE)
+_API_PATH = re.compile(r"/(products|brands|categories|carts|users|invoices|favorites|messages)\b")
+
+
+# -----------------------------------------------------------------------------
+# Streaming reader
+# -----------------------------------------------------------------------------
+def iter_har_entries(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield HAR `log.entries` items one by one without loading the file.
+
+    Scans for the `"entries"` key, then decodes consecutive objects of the
+    array with `json.JSONDecoder.raw_decode` over a sliding buffer.
+    """
+    decoder = json.JSONDecoder()
+    with path.open("r", encoding="utf-8") as f:
+        buf = ""
+        # 1) Find the opening bracket of the entries array.
+        while True:
+            idx = buf.find('"entries"')
+            if idx >= 0:
+                bracket = buf.find("[", idx)
+                if bracket >= 0:
+                    buf = buf[bracket + 1 :]
+                    break
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            buf = buf[-16:] + chunk if idx < 0 else buf + chunk
+
+        # 2) Decode entries until the closing bracket.
+        eof = False
+        while True:
+            stripped = buf.lstrip(" \t\r\n,")
+            if stripped.startswith("]"):
+                return
+            try:
+                obj, end = decoder.raw_decode(stripped)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(CHUNK_SIZE)
+                eof = not chunk
+                buf = stripped + chunk
+                continue
+            yield obj
+            buf = stripped[end:]
+
+
+# -----------------------------------------------------------------------------
+# Entry model
+# -----------------------------------------------------------------------------
+@dataclass
+class Request:
+    """The parts of a HAR entry the analysis needs."""
+
+    method: str
+    url: str
+    status: int
+    mime: str
+    start_ms: float
+    duration_ms: float
+    body_bytes: int
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def end_ms(self) -> float:
+        return self.start_ms + self.duration_ms
+
+    @property
+    def key(self) -> str:
+        """Method + URL with sorted query (duplicate detection)."""
+        p = urlsplit(self.url)
+        query = urlencode(sorted(parse_qsl(p.query, keep_blank_values=True)))
+        return f"{self.method} {urlunsplit((p.scheme, p.netloc, p.path, query, ''))}"
+
+    @property
+    def is_api(self) -> bool:
+        return "json" in self.mime.lower() or bool(_API_PATH.search(urlsplit(self.url).path))
+
+
+def _parse_time(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000.0
+
+
+def to_request(entry: dict[str, Any]) -> Optional[Request]:
+    """Convert a HAR entry; None for entries without timing (e.g. aborted)."""
+    try:
+        start = _parse_time(entry["startedDateTime"])
+    except (KeyError, ValueError):
+        return None
+    req, resp = entry.get("request", {}), entry.get("response", {})
+    content = resp.get("content", {}) or {}
+    body = resp.get("bodySize")
+    if not isinstance(body, (int, float)) or body < 0:
+        body = content.get("size", 0) or 0
+    return Request(
+        method=str(req.get("method", "GET")),
+        url=str(req.get("url", "")),
+        status=int(resp.get("status", 0) or 0),
+        mime=str(content.get("mimeType", "")),
+        start_ms=start,
+        duration_ms=max(0.0, float(entry.get("time", 0) or 0)),
+        body_bytes=int(body),
+        headers={str(h.get("name", "")).lower(): str(h.get("value", "")) for h in resp.get("headers", [])},
+    )
+
+
+# -----------------------------------------------------------------------------
+# Analysis
+# -----------------------------------------------------------------------------
+def critical_path(requests: list[Request]) -> list[Request]:
+    """Return the chain of requests ending with the last one to finish.
+
+    Walking back from the last finisher, the predecessor of a request is the
+    request that finished latest before it started.
+    """
+    if not requests:
+        return []
+    by_end = sorted(requests, key=lambda r: r.end_ms)
+    ends = [r.end_ms for r in by_end]
+    chain = [by_end[-1]]
+    while True:
+        idx = bisect.bisect_right(ends, chain[-1].start_ms) - 1
+        # Zero-duration entries can end exactly where they start; never revisit.
+        while idx >= 0 and by_end[idx] in chain:
+            idx -= 1
+        if idx < 0:
+            break
+        chain.append(by_end[idx])
+    chain.reverse()
+    return chain
+
+
+def _cache_problem(r: Request) -> Optional[str]:
+    if r.status != 200 or not _STATIC.search(r.mime):
+        return None
+    cc = r.headers.get("cache-control", "").lower()
+    if "no-store" in cc:
+        return "no-store"
+    has_lifetime = "max-age" in cc or "s-maxage" in cc or "expires" in r.headers
+    has_validator = "etag" in r.headers or "last-modified" in r.headers
+    if not has_lifetime and not has_validator:
+        return "no cache lifetime or validator"
+    if "max-age=0" in cc and not has_validator:
+        return "max-age=0 without validator"
+    return None
+
+
+def analyze_har(path: Path) -> dict[str, Any]:
+    """Analyze one HAR file (one browser context)."""
+    requests = [r for r in (to_request(e) for e in iter_har_entries(path)) if r is not None]
+    findings: list[dict[str, Any]] = []
+    if not requests:
+        return {"har": str(path), "requests": 0, "findings": findings, "critical_path": []}
+
+    t0 = min(r.start_ms for r in requests)
+    chain = critical_path(requests)
+    chain_ms = chain[-1].end_ms - chain[0].start_ms
+    for r in chain:
+        if r.duration_ms < CRITICAL_SHARE * chain_ms:
+            continue
+        findings.append(
+            {
+                "kind": "critical-path",
+                "url": r.url,
+                "impact_ms": round(r.duration_ms, 1),
+                "detail": f"{r.method} {r.status} started at +{r.start_ms - t0:.0f} ms",
+            }
+        )
+
+    groups: dict[str, list[Request]] = defaultdict(list)
+    for r in requests:
+        groups[r.key].append(r)
+    for key, rs in groups.items():
+        if len(rs) < 2:
+            continue
+        extra = rs[1:]
+        findings.append(
+            {
+                "kind": "redundant-api-call" if rs[0].is_api else "duplicate-request",
+                "url": rs[0].url,
+                "impact_ms": round(sum(r.duration_ms for r in extra), 1),
+                "impact_bytes": sum(r.body_bytes for r in extra),
+                "detail": f"{key} fetched {len(rs)}x",
+            }
+        )
+
+    for r in requests:
+        if (
+            r.body_bytes >= COMPRESS_MIN_BYTES
+            and _COMPRESSIBLE.search(r.mime)
+            and not r.headers.get("content-encoding")
+        ):
+            findings.append(
+                {
+                    "kind": "uncompressed",
+                    "url": r.url,
+                    "impact_bytes": int(r.body_bytes * (1 - COMPRESS_RATIO)),
+                    "detail": f"{r.mime} {r.body_bytes} bytes without Content-Encoding",
+                }
+            )
+        problem = _cache_problem(r)
+        if problem:
+            findings.append({"kind": "not-cacheable", "url": r.url, "impact_bytes": r.body_bytes, "detail": problem})
+
+    end = max(r.end_ms for r in requests)
+    return {
+        "har": str(path),
+        "requests": len(requests),
+        "api_requests": sum(1 for r in requests if r.is_api),
+        "bytes": sum(r.body_bytes for r in requests),
+        "wall_ms": round(end - t0, 1),
+        "critical_path_ms": round(chain_ms, 1),
+        "critical_path": [r.url for r in chain],
+        "findings": findings,
+    }
+
+
+def _rank_key(f: dict[str, Any]) -> tuple[float, float]:
+    # Time first (1 ms ~ 10 KB on a typical CI link), then bytes.
+    ms = float(f.get("impact_ms", 0.0))
+    kb = float(f.get("impact_bytes", 0)) / 1024.0
+    return (ms + kb / 10.0, kb)
+
+
+def build_report(hars: list[Path], top: int = 50) -> dict[str, Any]:
+    """Analyze several HARs and rank all findings by estimated impact."""
+    per_har = [analyze_har(p) for p in hars]
+    ranked: list[dict[str, Any]] = []
+    for h in per_har:
+        for f in h["findings"]:
+            ranked.append({**f, "har": Path(h["har"]).name})
+    ranked.sort(key=_rank_key, reverse=True)
+    totals: dict[str, int] = defaultdict(int)
+    for f in ranked:
+        totals[f["kind"]] += 1
+    return {
+        "hars": len(per_har),
+        "requests": sum(h["requests"] for h in per_har),
+        "findings_by_kind": dict(sorted(totals.items())),
+        "ranked": ranked[:top],
+        "contexts": [{k: v for k, v in h.items() if k != "findings"} for h in per_har],
+    }
+
+
+def find_hars(paths: list[Path]) -> list[Path]:
+    """Expand directories to the .har files below them."""
+    out: list[Path] = []
+    for p in paths:
+        out.extend(sorted(p.rglob("*.har")) if p.is_dir() else [p])
+    return out
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.har_analyzer", description=__doc__.split("\n")[0])
+    parser.add_argument("paths", nargs="+", type=Path, help="run directory or .har files")
+    parser.add_argument("--out", type=Path, default=None, help=f"default: <first dir>/{REPORT_NAME}")
+    parser.add_argument("--top", type=int, default=50, help="ranked findings to keep")
+    args = parser.parse_args(argv)
+
+    hars = find_hars(args.paths)
+    if not hars:
+        print("No HAR files found.")
+        return 0
+    report = build_report(hars, top=args.top)
+    out = args.out or (args.paths[0] if args.paths[0].is_dir() else args.paths[0].parent) / REPORT_NAME
+    write_json(out, report)
+
+    print(f"{report['hars']} HAR(s), {report['requests']} requests, findings: {report['findings_by_kind']}")
+    for f in report["ranked"][:15]:
+        impact = f"{f.get('impact_ms', 0):>8.1f} ms {f.get('impact_bytes', 0):>9} B"
+        print(f"{impact}  {f['kind']:<19} {f['url'][:90]}")
+    print(f"HAR report: {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,500 @@
+"""Streaming k6 NDJSON ingestion into compact Python-side summaries.
+
+`k6 run --out json=<file>` writes one JSON object per metric sample. On long
+runs (`soak.js`, 30m) the file grows to gigabytes, so this parser:
+
+- streams the file line by line (plain or `.gz`),
+- skips irrelevant metrics with a cheap substring check before `json.loads`,
+- aggregates latency into log-bucketed histograms (~1% relative error) and a
+  bounded reservoir sample per series, i.e. constant memory per series.
+
+Series are aggregated per request `name` tag (e.g. "GET /products") and per
+`group` tag (catalog, lists, product-detail, product-related, auth), plus a
+run-wide "*" series.
+
+The output is a `toolshop.trend-record/v1` JSON document (see tools/trends.py),
+so it can be ingested into the trend store directly:
+
+    python -m tools.k6_summary artifacts/k6/soak/run-004
+    python -m tools.trends ingest artifacts/k6/soak/run-004/k6_summary.json
+
+Keys in `metrics`:
+    "*"                 run-wide
+    "GET /products"     per `name` tag
+    "group:catalog"     per `group` tag (k6 "::catalog" -> "catalog")
+
+Coordinated omission
+--------------------
+A k6 VU is a closed loop: while a request stalls, the VU does not send the
+requests it would have sent in the meantime, so a 10s stall shows up as one
+slow sample instead of the ~10 slow ones users would have seen. The scripts in
+load/k6/ attach each request's VU and actual send time as sample metadata
+(`vu`, `sent_at`). From these the aggregator reconstructs the intended cadence
+of each VU and endpoint (`name` tag), i.e. the median interval between the
+VU's recent sends of that request. Intervals between different requests of one
+iteration are not used: those are back-to-back sends, and their spacing would
+turn every slow response into a stall. It then corrects like HdrHistogram's
+expected-interval method: a sample of latency L with an expected interval E
+adds the latencies L-E, L-2E, ... (while >= E) of the requests that were due
+during the stall. Corrected percentiles are reported next to the raw ones as
+co_p50 / co_p90 / co_p95 / co_p99, plus co_count (samples including the
+synthetic ones). The http_req_duration
+thresholds from summary.json (e.g. `p(99)<2500`) are evaluated against both and
+stored in `meta.co_thresholds`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import random
+import re
+import statistics
+import sys
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+from tools.artifacts import write_json
+from tools.trends import ALL_ENDPOINTS, RunRecord, infer_kind_and_scenario
+
+DEFAULT_INPUT_NAMES = ("metrics.json.gz", "metrics.json", "raw.json.gz", "raw.json")
+DEFAULT_OUTPUT_NAME = "k6_summary.json"
+
+# Only these metrics are aggregated; everything else is skipped before parsing.
+TRACKED_METRICS = ("http_req_duration", "http_req_failed", "http_reqs")
+_TRACKED_PATTERN = re.compile(r'"metric"\s*:\s*"(%s)"' % "|".join(TRACKED_METRICS))
+
+PERCENTILES = (50, 90, 95, 99)
+GROUP_PREFIX = "group:"
+
+# Coordinated-omission correction: recent send intervals kept per VU and name, intervals
+# needed before correcting, and a bound on synthetic samples per real one.
+CO_INTERVAL_WINDOW = 64
+CO_MIN_INTERVALS = 5
+CO_MAX_SYNTHETIC = 10_000
+_THRESHOLD = re.compile(r"^\s*p\((\d+(?:\.\d+)?)\)\s*<=?\s*(\d+(?:\.\d+)?)\s*$")
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+# -----------------------------------------------------------------------------
+# Constant-memory aggregation
+# -----------------------------------------------------------------------------
+class LogHistogram:
+    """Sparse log-bucketed histogram for positive latency values (ms).
+
+    Values are mapped to buckets of relative width `precision`, so quantile
+    estimates are within ~precision of the true value while memory stays
+    bounded by the dynamic range (about 1,100 buckets for 1ms..60s at 1%).
+    """
+
+    def __init__(self, precision: float = 0.01) -> None:
+        """Create an empty histogram.
+
+        Args:
+            precision: Relative bucket width (0.01 = 1%).
+        """
+        self._log_base = math.log1p(precision)
+        self._buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """Record a value (optionally with a repeat count)."""
+        if value < 0 or weight <= 0:
+            return
+        idx = int(math.log(value) / self._log_base) if value >= 1.0 else 0
+        self._buckets[idx] = self._buckets.get(idx, 0) + weight
+        self.count += weight
+        self.total += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LogHistogram") -> None:
+        """Merge another histogram with the same precision into this one."""
+        for idx, n in other._buckets.items():
+            self._buckets[idx] = self._buckets.get(idx, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile (0..1), clamped to the observed min/max."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx in sorted(self._buckets):
+            seen += self._buckets[idx]
+            if seen >= rank:
+                # Geometric bucket midpoint.
+                value = math.exp((idx + 0.5) * self._log_base) if idx > 0 else self.min
+                return max(self.min, min(self.max, value))
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Arithmetic mean of recorded values."""
+        return self.total / self.count if self.count else 0.0
+
+
+class Reservoir:
+    """Fixed-size uniform reservoir sample (Algorithm R)."""
+
+    def __init__(self, size: int, rng: random.Random) -> None:
+        """Create a reservoir holding at most `size` values."""
+        self.size = size
+        self.values: list[float] = []
+        self._seen = 0
+        self._rng = rng
+
+    def add(self, value: float) -> None:
+        """Offer a value to the reservoir."""
+        self._seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+            return
+        j = self._rng.randrange(self._seen)
+        if j < self.size:
+            self.values[j] = value
+
+
+class OmissionCorrector:
+    """Per-VU, per-request intended send cadence for coordinated-omission correction."""
+
+    def __init__(self, window: int = CO_INTERVAL_WINDOW, min_intervals: int = CO_MIN_INTERVALS) -> None:
+        """Create a corrector.
+
+        Args:
+            window: Recent send intervals kept per series (the median is the expected interval).
+            min_intervals: Intervals needed before a series' samples are corrected.
+        """
+        self.window = window
+        self.min_intervals = min_intervals
+        self._last_sent: dict[tuple[str, str], float] = {}
+        self._intervals: dict[tuple[str, str], deque[float]] = {}
+
+    def missed(self, vu: str, sent_at: float, latency: float, name: str = "") -> list[float]:
+        """Return the latencies of requests omitted while this one was in flight (ms).
+
+        The expected interval is the VU's usual spacing between sends of the same
+        request (`name` tag), i.e. its iteration cadence. Samples of one VU must
+        arrive in send order (k6 emits them on completion, and a VU sends
+        sequentially).
+        """
+        key = (vu, name)
+        intervals = self._intervals.setdefault(key, deque(maxlen=self.window))
+        extra: list[float] = []
+        if len(intervals) >= self.min_intervals:
+            expected = statistics.median(intervals)
+            missing = latency - expected
+            while expected > 0 and missing >= expected and len(extra) < CO_MAX_SYNTHETIC:
+                extra.append(missing)
+                missing -= expected
+        last = self._last_sent.get(key)
+        if last is not None and sent_at > last:
+            intervals.append(sent_at - last)
+        self._last_sent[key] = sent_at
+        return extra
+
+
+@dataclass
+class SeriesStats:
+    """Aggregated statistics for one series (name tag, group, or run-wide)."""
+
+    latency: LogHistogram
+    reservoir: Reservoir
+    corrected: Optional[LogHistogram] = None
+    requests: int = 0
+    failed: int = 0
+    failed_total: int = 0
+    first_time: Optional[str] = None
+    last_time: Optional[str] = None
+
+    def touch(self, ts: Optional[str]) -> None:
+        """Track first/last sample timestamps (raw strings, parsed lazily)."""
+        if ts is None:
+            return
+        if self.first_time is None:
+            self.first_time = ts
+        self.last_time = ts
+
+
+def _parse_time(ts: Optional[str]) -> Optional[float]:
+    """Parse a k6 RFC3339 timestamp (possibly with nanoseconds) to epoch seconds."""
+    if not ts:
+        return None
+    fixed = _FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), ts, count=1)
+    fixed = fixed.replace("Z", "+00:00")
+    try:
+        return datetime.fromisoformat(fixed).timestamp()
+    except ValueError:
+        return None
+
+
+class K6Aggregator:
+    """Aggregate k6 NDJSON samples per name tag and per group."""
+
+    def __init__(self, precision: float = 0.01, reservoir_size: int = 2000, seed: int = 0) -> None:
+        """Create an aggregator.
+
+        Args:
+            precision: Histogram relative precision.
+            reservoir_size: Latency samples kept per series (for trend statistics).
+            seed: Reservoir RNG seed (reproducible summaries).
+        """
+        self.precision = precision
+        self.reservoir_size = reservoir_size
+        self._rng = random.Random(seed)
+        self.series: dict[str, SeriesStats] = {}
+        self.corrector = OmissionCorrector()
+        self.lines = 0
+        self.points = 0
+        self.synthetic = 0
+
+    def _series(self, key: str) -> SeriesStats:
+        s = self.series.get(key)
+        if s is None:
+            s = SeriesStats(
+                latency=LogHistogram(self.precision),
+                reservoir=Reservoir(self.reservoir_size, self._rng),
+            )
+            self.series[key] = s
+        return s
+
+    @staticmethod
+    def series_keys(tags: dict[str, Any]) -> list[str]:
+        """Return the series keys a sample contributes to."""
+        keys = [ALL_ENDPOINTS]
+        name = tags.get("name")
+        if isinstance(name, str) and name:
+            keys.append(name)
+        group = tags.get("group")
+        if isinstance(group, str) and group.strip(":"):
+            # k6 nests groups as "::outer::inner"; keep the innermost name.
+            keys.append(GROUP_PREFIX + group.rsplit("::", 1)[-1])
+        return keys
+
+    def add_point(
+        self,
+        metric: str,
+        value: float,
+        tags: dict[str, Any],
+        ts: Optional[str],
+        metadata: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Add one k6 Point sample (metadata `vu` + `sent_at` enables CO correction)."""
+        self.points += 1
+        missed: Optional[list[float]] = None
+        if metric == "http_req_duration" and metadata and "vu" in metadata and "sent_at" in metadata:
+            try:
+                name = str(tags.get("name") or "")
+                missed = self.corrector.missed(str(metadata["vu"]), float(metadata["sent_at"]), value, name)
+            except (TypeError, ValueError):
+                missed = None
+            self.synthetic += len(missed or ())
+        for key in self.series_keys(tags):
+            s = self._series(key)
+            s.touch(ts)
+            if metric == "http_req_duration":
+                s.latency.add(value)
+                s.reservoir.add(value)
+                if missed is not None:
+                    if s.corrected is None:
+                        s.corrected = LogHistogram(self.precision)
+                    s.corrected.add(value)
+                    for v in missed:
+                        s.corrected.add(v)
+            elif metric == "http_reqs":
+                s.requests += int(value) or 1
+            elif metric == "http_req_failed":
+                s.failed_total += 1
+                s.failed += int(bool(value))
+
+    def feed(self, lines: Iterator[str]) -> None:
+        """Consume NDJSON lines."""
+        for line in lines:
+            self.lines += 1
+            if '"Point"' not in line or not _TRACKED_PATTERN.search(line):
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if obj.get("type") != "Point":
+                continue
+            data = obj.get("data") or {}
+            value = data.get("value")
+            if not isinstance(value, (int, float)):
+                continue
+            self.add_point(
+                str(obj.get("metric")), float(value), data.get("tags") or {}, data.get("time"), data.get("metadata")
+            )
+
+    def to_metrics(self) -> dict[str, dict[str, float]]:
+        """Return endpoint -> metric -> value in the trend-store metric naming."""
+        out: dict[str, dict[str, float]] = {}
+        for key, s in sorted(self.series.items()):
+            m: dict[str, float] = {}
+            if s.latency.count:
+                m["count"] = float(s.latency.count)
+                m["avg"] = s.latency.mean
+                m["min"] = s.latency.min
+                m["max"] = s.latency.max
+                for p in PERCENTILES:
+                    m[f"p{p}"] = s.latency.quantile(p / 100.0)
+            if s.corrected is not None and s.corrected.count:
+                m["co_count"] = float(s.corrected.count)
+                for p in PERCENTILES:
+                    m[f"co_p{p}"] = s.corrected.quantile(p / 100.0)
+            if s.failed_total:
+                m["error_rate"] = s.failed / s.failed_total
+            start, end = _parse_time(s.first_time), _parse_time(s.last_time)
+            requests = s.requests or s.latency.count
+            if requests and start is not None and end is not None and end > start:
+                m["rps"] = requests / (end - start)
+            if m:
+                out[key] = m
+        return out
+
+    def to_samples(self) -> dict[str, list[float]]:
+        """Return reservoir samples per series (ms)."""
+        return {k: list(s.reservoir.values) for k, s in sorted(self.series.items()) if s.reservoir.values}
+
+
+# -----------------------------------------------------------------------------
+# I/O
+# -----------------------------------------------------------------------------
+def open_ndjson(path: Path) -> IO[str]:
+    """Open a plain or gzip-compressed NDJSON file for text reading."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return path.open("r", encoding="utf-8", errors="replace")
+
+
+def find_input(path: Path) -> Optional[Path]:
+    """Resolve a run directory to its raw k6 JSON output file."""
+    if path.is_file():
+        return path
+    for name in DEFAULT_INPUT_NAMES:
+        candidate = path / name
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def duration_thresholds(summary_path: Path) -> list[tuple[str, float, float]]:
+    """Read `p(N)<X` http_req_duration thresholds from a k6 --summary-export file.
+
+    Returns:
+        [(expression, percentile 0..100, limit ms)], empty if unavailable.
+    """
+    try:
+        data = json.loads(summary_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    metric = ((data.get("metrics") or {}).get("http_req_duration") or {}) if isinstance(data, dict) else {}
+    out = []
+    for expr in metric.get("thresholds") or {}:
+        m = _THRESHOLD.match(str(expr))
+        if m:
+            out.append((str(expr), float(m.group(1)), float(m.group(2))))
+    return out
+
+
+def check_thresholds(agg: K6Aggregator, thresholds: list[tuple[str, float, float]]) -> list[dict[str, Any]]:
+    """Evaluate run-wide duration thresholds against raw and CO-corrected latency."""
+    s = agg.series.get(ALL_ENDPOINTS)
+    if s is None or s.corrected is None:
+        return []
+    results = []
+    for expr, pct, limit in thresholds:
+        raw, corrected = s.latency.quantile(pct / 100.0), s.corrected.quantile(pct / 100.0)
+        results.append(
+            {
+                "threshold": expr,
+                "raw": round(raw, 3),
+                "corrected": round(corrected, 3),
+                "raw_ok": raw < limit,
+                "corrected_ok": corrected < limit,
+            }
+        )
+    return results
+
+
+def summarize(path: Path, reservoir_size: int = 2000, precision: float = 0.01) -> RunRecord:
+    """Stream a k6 NDJSON file and build a trend record.
+
+    Args:
+        path: NDJSON file (plain or .gz).
+        reservoir_size: Latency samples kept per series.
+        precision: Histogram relative precision.
+
+    Returns:
+        RunRecord with per-name / per-group metrics and reservoir samples.
+    """
+    agg = K6Aggregator(precision=precision, reservoir_size=reservoir_size)
+    with open_ndjson(path) as fh:
+        agg.feed(fh)
+
+    kind, scenario = infer_kind_and_scenario(path)
+    start = _parse_time(agg.series[ALL_ENDPOINTS].first_time) if ALL_ENDPOINTS in agg.series else None
+    meta: dict[str, Any] = {"lines": agg.lines, "points": agg.points, "histogram_precision": precision}
+    if agg.synthetic or any(s.corrected is not None for s in agg.series.values()):
+        meta["co_synthetic_samples"] = agg.synthetic
+        meta["co_thresholds"] = check_thresholds(agg, duration_thresholds(path.parent / "summary.json"))
+    return RunRecord(
+        kind=kind,
+        scenario=scenario,
+        source=str(path.resolve()),
+        recorded_at=start if start is not None else path.stat().st_mtime,
+        metrics=agg.to_metrics(),
+        samples=agg.to_samples(),
+        meta=meta,
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.k6_summary",
+        description="Summarize k6 --out json NDJSON into a compact trend record.",
+    )
+    parser.add_argument("path", type=Path, help="NDJSON file or k6 run directory")
+    parser.add_argument("--output", type=Path, default=None, help=f"default: <run dir>/{DEFAULT_OUTPUT_NAME}")
+    parser.add_argument("--reservoir", type=int, default=2000, help="latency samples kept per series")
+    parser.add_argument("--precision", type=float, default=0.01, help="histogram relative precision")
+    args = parser.parse_args(argv)
+
+    src = find_input(args.path)
+    if src is None:
+        print(f"No k6 NDJSON output found at {args.path} (expected one of {DEFAULT_INPUT_NAMES}).")
+        return 2
+
+    record = summarize(src, reservoir_size=args.reservoir, precision=args.precision)
+    out = args.output or src.parent / DEFAULT_OUTPUT_NAME
+    write_json(out, record.to_json())
+
+    print(f"k6 summary: {out} ({record.meta['points']} points, {len(record.metrics)} series)")
+    for key, m in record.metrics.items():
+        if "p95" in m:
+            corrected = f" co_p99={m['co_p99']:8.1f}" if "co_p99" in m else ""
+            print(
+                f"  {key:<32} n={int(m.get('count', 0)):>7} p50={m['p50']:8.1f} "
+                f"p95={m['p95']:8.1f} p99={m['p99']:8.1f}{corrected} err={m.get('error_rate', 0.0):.2%}"
+            )
+    for t in record.meta.get("co_thresholds", []):
+        verdict = "ok" if t["corrected_ok"] else "FAILED"
+        print(f"  threshold {t['threshold']}: raw {t['raw']:.1f}, CO-corrected {t['corrected']:.1f} -> {verdict}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,369 @@
+"""Parallel multi-stack execution with automatic port allocation.
+
+The Makefile already isolates a stack through `COMPOSE_PROJECT_NAME`,
+`WEB_PORT` and `UI_PORT`. This orchestrator uses that to run a regression
+across N isolated compose projects on one machine:
+
+1. allocate free host ports per stack and `make up` all stacks concurrently,
+2. `make seed` them. If no DB snapshot exists yet, the first stack seeds and
+   snapshots it, and the others restore it,
+3. shard the API tests (by nodeid, balanced on .cache/test-history.json
+   durations) and the UI suites (balanced on the Robot duration history) over
+   the stacks, and run each stack's shards against its own ports,
+4. merge the results into `artifacts/multi/run-XXX/`:
+   api/junit.xml (all shards), ui/output.xml + log/report (rebot),
+   ui/frontend_metrics.json, stacks.json (ports and phase timings),
+5. `make clean` every stack (unless --keep).
+
+Usage
+-----
+    python -m tools.multi_stack --stacks 3
+    python -m tools.multi_stack --stacks 2 --ui-include smoke --api-files tests/api/smoke/test_api_smoke.py
+
+Environment variables
+---------------------
+- COMPOSE_PROJECT_NAME: prefix of the per-stack project names (default toolshop-e2e)
+- PYTHON / HEADLESS: forwarded to the per-stack commands
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional, TypeVar
+
+from tools.artifacts import artifacts_root, env, next_run_dir, write_json
+from tools.db_snapshot import Settings, snapshot_paths
+from tools.frontend_metrics import write_summary as write_frontend_summary
+from tools.pytest_cost_order import load_history as load_test_history
+from tools.robot_parallel import (
+    DURATIONS_FILE,
+    discover_suites,
+    merge_outputs,
+    suite_durations_from_output,
+    update_history,
+)
+from tools.robot_parallel import load_history as load_suite_history
+from tools.robot_parallel import shard as shard_suites
+
+T = TypeVar("T")
+
+DEFAULT_API_FILES = ("tests/api/smoke/test_api_smoke.py", "tests/api/regression/test_api_regression.py")
+DEFAULT_TEST_SECONDS = 1.0
+
+
+# -----------------------------------------------------------------------------
+# Stacks
+# -----------------------------------------------------------------------------
+def free_ports(count: int, exclude: frozenset[int] = frozenset()) -> list[int]:
+    """Return `count` distinct host ports that are free right now.
+
+    All sockets are held open until every port is chosen, so one call never
+    returns the same port twice. Another process can still grab a port before
+    compose binds it; `make up` then fails loudly rather than sharing a stack.
+    """
+    sockets: list[socket.socket] = []
+    ports: list[int] = []
+    try:
+        while len(ports) < count:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(("127.0.0.1", 0))
+            sockets.append(s)
+            port = s.getsockname()[1]
+            if port not in exclude:
+                ports.append(port)
+    finally:
+        for s in sockets:
+            s.close()
+    return ports
+
+
+@dataclass
+class Stack:
+    """One isolated compose project and its host ports."""
+
+    name: str
+    web_port: int
+    ui_port: int
+    timings: dict[str, float] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def api_host(self) -> str:
+        """API (nginx) URL on the host."""
+        return f"http://localhost:{self.web_port}"
+
+    @property
+    def base_url(self) -> str:
+        """Angular dev server URL on the host."""
+        return f"http://localhost:{self.ui_port}"
+
+    def env(self) -> dict[str, str]:
+        """Environment that points the Makefile, pytest and Robot at this stack.
+
+        MAKEFLAGS is dropped: command-line variables of a parent `make` would
+        otherwise override the per-stack project name and ports.
+        """
+        inherited = {k: v for k, v in os.environ.items() if k not in ("MAKEFLAGS", "MFLAGS", "MAKELEVEL")}
+        return {
+            **inherited,
+            "COMPOSE_PROJECT_NAME": self.name,
+            "WEB_PORT": str(self.web_port),
+            "UI_PORT": str(self.ui_port),
+            "API_HOST": self.api_host,
+            "API_DOCS_URL": f"{self.api_host}/api/documentation",
+            "BASE_URL": self.base_url,
+        }
+
+    def settings(self) -> Settings:
+        """tools.db_snapshot settings for this stack's compose project."""
+        base = Settings.from_env()
+        return Settings(
+            dc=["docker", "compose", "-p", self.name, "-f", str(base.compose_file)],
+            compose_file=base.compose_file,
+            api_service=base.api_service,
+            db_service=base.db_service,
+            db_name=base.db_name,
+            seed_cmd=base.seed_cmd,
+            snapshot_dir=base.snapshot_dir,
+        )
+
+    def make(self, *targets: str, log: Optional[Path] = None) -> int:
+        """Run make targets against this stack (output to `log` if given), timing each call."""
+        started = time.monotonic()
+        cmd = ["make", "--no-print-directory", *targets]
+        if log is None:
+            rc = subprocess.call(cmd, env=self.env())
+        else:
+            log.parent.mkdir(parents=True, exist_ok=True)
+            with log.open("ab") as out:
+                rc = subprocess.call(cmd, env=self.env(), stdout=out, stderr=subprocess.STDOUT)
+        self.timings["+".join(targets)] = round(time.monotonic() - started, 2)
+        if rc != 0:
+            self.errors.append(f"make {' '.join(targets)} exited {rc}")
+        return rc
+
+    def to_dict(self) -> dict[str, object]:
+        """JSON form for stacks.json."""
+        return {
+            "name": self.name,
+            "api_host": self.api_host,
+            "base_url": self.base_url,
+            "timings": self.timings,
+            "errors": self.errors,
+        }
+
+
+def allocate_stacks(count: int, prefix: str) -> list[Stack]:
+    """Create `count` stacks with distinct project names and free ports."""
+    ports = free_ports(2 * count)
+    return [Stack(f"{prefix}-{i:02d}", ports[2 * (i - 1)], ports[2 * (i - 1) + 1]) for i in range(1, count + 1)]
+
+
+def run_parallel(fn: Callable[[T], object], items: list[T]) -> None:
+    """Call fn(item) for every item in its own thread and wait for all."""
+    threads = [threading.Thread(target=fn, args=(item,), daemon=True) for item in items]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def bring_up(stacks: list[Stack], logs: Path) -> list[Stack]:
+    """`make up` + `make seed` every stack; returns the stacks that came up healthy.
+
+    When no snapshot exists for the current key, the first stack seeds (and
+    snapshots) on its own so the others restore instead of all seeding at once.
+    """
+    run_parallel(lambda s: s.make("up", log=logs / f"{s.name}.log"), stacks)
+    healthy = [s for s in stacks if not s.errors]
+    if not healthy:
+        return []
+    dump, _ = snapshot_paths(healthy[0].settings())
+    first, rest = ([], healthy) if dump.is_file() else ([healthy[0]], healthy[1:])
+    for s in first:
+        s.make("seed", log=logs / f"{s.name}.log")
+    run_parallel(lambda s: s.make("seed", log=logs / f"{s.name}.log"), rest)
+    return [s for s in healthy if not s.errors]
+
+
+def tear_down(stacks: list[Stack], logs: Path) -> None:
+    """`make clean` (down -v) every stack."""
+    run_parallel(lambda s: s.make("clean", log=logs / f"{s.name}.log"), stacks)
+
+
+# -----------------------------------------------------------------------------
+# Sharding
+# -----------------------------------------------------------------------------
+def collect_api_tests(files: list[str]) -> list[str]:
+    """Return the nodeids pytest collects from `files`."""
+    python = env("PYTHON", sys.executable)
+    res = subprocess.run(
+        [python, "-m", "pytest", "--collect-only", "-q", "--test-order=off", *files],
+        capture_output=True,
+        text=True,
+    )
+    return [line.strip() for line in res.stdout.splitlines() if "::" in line and not line.startswith(" ")]
+
+
+def balance(items: list[T], bins: int, estimate: Callable[[T], float]) -> list[list[T]]:
+    """Longest-processing-time-first greedy split into at most `bins` shards."""
+    shards: list[list[T]] = [[] for _ in range(max(1, bins))]
+    loads = [0.0] * len(shards)
+    for item in sorted(items, key=estimate, reverse=True):
+        idx = loads.index(min(loads))
+        shards[idx].append(item)
+        loads[idx] += estimate(item)
+    return shards
+
+
+def shard_api_tests(nodeids: list[str], bins: int) -> list[list[str]]:
+    """Split API tests over stacks by recorded duration (see tools/pytest_cost_order.py)."""
+    history = load_test_history(Path(env("TEST_HISTORY", ".cache/test-history.json")))
+
+    def estimate(nodeid: str) -> float:
+        return float(history.get(nodeid, {}).get("duration", DEFAULT_TEST_SECONDS))
+
+    return balance(nodeids, bins, estimate)
+
+
+# -----------------------------------------------------------------------------
+# Execution
+# -----------------------------------------------------------------------------
+def run_api_shard(stack: Stack, nodeids: list[str], out_dir: Path) -> int:
+    """Run one API shard against `stack`; junit goes to out_dir/api/junit-<stack>.xml."""
+    if not nodeids:
+        return 0
+    python = env("PYTHON", sys.executable)
+    junit = out_dir / "api" / f"junit-{stack.name}.xml"
+    junit.parent.mkdir(parents=True, exist_ok=True)
+    started = time.monotonic()
+    with (out_dir / "logs" / f"{stack.name}-api.log").open("wb") as log:
+        rc = subprocess.call(
+            [python, "-m", "pytest", "-q", f"--junitxml={junit}", *nodeids],
+            env=stack.env(),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    stack.timings["api"] = round(time.monotonic() - started, 2)
+    return rc
+
+
+def run_ui_shard(stack: Stack, suites: list[Path], include: Optional[str], out_dir: Path, worker: int) -> int:
+    """Run one UI shard against `stack` into out_dir/ui/workers/worker-XX (tools/robot_parallel layout)."""
+    if not suites:
+        return 0
+    wdir = out_dir / "ui" / "workers" / f"worker-{worker:02d}"
+    wdir.mkdir(parents=True, exist_ok=True)
+    cmd = [
+        "robot",
+        "--outputdir", str(wdir),
+        "--output", "output.xml",
+        "--log", "NONE",
+        "--report", "NONE",
+        "--name", stack.name,
+        *(["--include", include] if include else []),
+        *[str(s) for s in suites],
+    ]
+    started = time.monotonic()
+    with (wdir / "console.log").open("wb") as log:
+        rc = subprocess.call(cmd, env={**stack.env(), "REUSE_BROWSER": "true"}, stdout=log, stderr=subprocess.STDOUT)
+    stack.timings["ui"] = round(time.monotonic() - started, 2)
+    return rc
+
+
+def merge_junit(parts: list[Path], target: Path) -> Optional[Path]:
+    """Combine junit files into one <testsuites> document."""
+    root = ET.Element("testsuites")
+    for part in parts:
+        doc = ET.parse(part).getroot()
+        suites = [doc] if doc.tag == "testsuite" else list(doc.iter("testsuite"))
+        root.extend(suites)
+    if not len(root):
+        return None
+    for attr in ("tests", "failures", "errors", "skipped"):
+        root.set(attr, str(sum(int(s.get(attr, "0")) for s in root)))
+    ET.ElementTree(root).write(target, encoding="utf-8", xml_declaration=True)
+    return target
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.multi_stack", description=__doc__.split("\n")[0])
+    parser.add_argument("--stacks", type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)))
+    parser.add_argument("--prefix", default=env("COMPOSE_PROJECT_NAME", "toolshop-e2e") + "-ms")
+    parser.add_argument("--api-files", nargs="*", default=list(DEFAULT_API_FILES), help="pytest files ('' = none)")
+    parser.add_argument("--ui-root", type=Path, default=Path("tests/ui"))
+    parser.add_argument("--ui-include", default="regression", help="Robot tag ('' = no UI)")
+    parser.add_argument("--artifacts", type=Path, default=None, help="default: $ARTIFACTS/multi")
+    parser.add_argument("--keep", action="store_true", help="leave the stacks running")
+    args = parser.parse_args(argv)
+
+    for cmd in ("make", "docker"):
+        if shutil.which(cmd) is None:
+            print(f"Missing command: {cmd}")
+            return 127
+
+    out_dir = next_run_dir(args.artifacts or artifacts_root() / "multi")
+    logs = out_dir / "logs"
+    logs.mkdir(parents=True, exist_ok=True)
+    stacks = allocate_stacks(args.stacks, args.prefix)
+    for s in stacks:
+        print(f"{s.name}: API {s.api_host}  UI {s.base_url}")
+
+    started = time.monotonic()
+    try:
+        ready = bring_up(stacks, logs)
+        print(f"Stacks ready: {len(ready)}/{len(stacks)} after {time.monotonic() - started:.1f}s")
+        if not ready:
+            return 1
+
+        api_files = [f for f in args.api_files if f]
+        api_shards = shard_api_tests(collect_api_tests(api_files), len(ready)) if api_files else []
+        ui_history_path = artifacts_root() / "ui" / DURATIONS_FILE
+        ui_suites = discover_suites(args.ui_root, args.ui_include) if args.ui_include else []
+        ui_shards = shard_suites(ui_suites, len(ready), load_suite_history(ui_history_path)) if ui_suites else []
+
+        codes: list[int] = []
+
+        def run_stack(idx: int) -> None:
+            stack = ready[idx]
+            if idx < len(api_shards):
+                codes.append(run_api_shard(stack, api_shards[idx], out_dir))
+            if idx < len(ui_shards):
+                codes.append(run_ui_shard(stack, ui_shards[idx], args.ui_include or None, out_dir, idx + 1))
+
+        run_parallel(run_stack, list(range(len(ready))))
+
+        junit = merge_junit(sorted((out_dir / "api").glob("junit-*.xml")), out_dir / "api" / "junit.xml")
+        if junit is not None:
+            print(f"API junit: {junit}")
+        if ui_shards:
+            codes.append(merge_outputs(out_dir / "ui", name=f"Toolshop UI {args.ui_include} (multi-stack)"))
+            merged = out_dir / "ui" / "output.xml"
+            if merged.is_file():
+                update_history(ui_history_path, suite_durations_from_output(merged))
+            write_frontend_summary(out_dir / "ui")
+        rc = 1 if len(ready) < len(stacks) else max(codes, default=0)
+    finally:
+        if not args.keep:
+            tear_down(stacks, logs)
+        write_json(
+            out_dir / "stacks.json",
+            {"wall_seconds": round(time.monotonic() - started, 2), "stacks": [s.to_dict() for s in stacks]},
+        )
+    print(f"Multi-stack artifacts: {out_dir} ({time.monotonic() - started:.1f}s)")
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
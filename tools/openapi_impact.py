@@ -0,0 +1,374 @@
+"""Test impact selection based on OpenAPI spec diffs.
+
+When the pinned `laravel-api` image digest in docker/docker-compose.yml changes,
+the OpenAPI document served by the new image is diffed against the cached spec
+of the previous image. Changed operations/parameters are mapped to *topics*
+(products-list, products-details, param:sort, login, cart, ...). The pytest
+plugin in tools/pytest_impact.py then runs the tests touching those topics first.
+
+Workflow
+--------
+    python -m tools.openapi_impact diff          # writes artifacts/api/impact.json
+    python -m pytest --impact=artifacts/api/impact.json --impact-mode=only tests/api
+    python -m pytest --impact=artifacts/api/impact.json --impact-mode=rest tests/api
+    python -m tools.openapi_impact update-cache  # remember the spec for next time
+
+Modes written to impact.json
+----------------------------
+- "selective": a cached spec exists and differs -> run topics first
+- "none":      the spec is unchanged -> nothing is "affected"
+- "full":      no cached spec (first run) -> everything is affected
+
+Environment variables
+---------------------
+- API_HOST / API_DOCS_URL: same meaning as in tests/api/conftest.py
+- OPENAPI_CACHE_DIR: spec cache directory. Default: ".cache/openapi"
+- COMPOSE_FILE: compose file used to read the API image digest.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from tools.artifacts import artifacts_root, env, write_json
+
+HTTP_METHODS = ("get", "put", "post", "delete", "patch", "head", "options")
+OPENAPI_URL_PATTERN = re.compile(r'url:\s*"([^"]+)"')
+DEFAULT_TIMEOUT_SECONDS = 30
+
+# Top-level keys that describe the document rather than individual operations.
+META_KEYS = ("openapi", "swagger", "info", "servers")
+
+# Query parameter name fragments with dedicated topics.
+PARAM_TOPICS = ("sort", "page", "category", "brand")
+
+# Ordered (path fragment, topic) rules; first match wins.
+PATH_TOPICS = (
+    ("login", "login"),
+    ("invoice", "invoices"),
+    ("favorite", "favorites"),
+    ("cart", "cart"),
+    ("categor", "categories"),
+    ("brand", "brands"),
+)
+
+
+# -----------------------------------------------------------------------------
+# Spec fetching / caching
+# -----------------------------------------------------------------------------
+def _http_get(url: str) -> bytes:
+    req = urllib.request.Request(url, headers={"accept": "application/json, text/html"})
+    with urllib.request.urlopen(req, timeout=DEFAULT_TIMEOUT_SECONDS) as resp:
+        return resp.read()
+
+
+def fetch_spec(api_docs_url: str, api_host: str) -> dict[str, Any]:
+    """Download the OpenAPI document advertised by the Swagger UI page.
+
+    Mirrors the `openapi_spec_url` / `openapi_spec` fixtures in conftest.py.
+
+    Args:
+        api_docs_url: Swagger UI HTML URL.
+        api_host: API host (used for the fallback spec URL).
+
+    Returns:
+        Parsed OpenAPI document.
+
+    Raises:
+        RuntimeError: If the document does not look like OpenAPI.
+    """
+    html = _http_get(api_docs_url).decode("utf-8", errors="replace")
+    m = OPENAPI_URL_PATTERN.search(html)
+    spec_url = m.group(1) if m else f"{api_host}/docs?api-docs.json"
+    spec = json.loads(_http_get(spec_url))
+    if not isinstance(spec, dict) or "paths" not in spec:
+        raise RuntimeError("OpenAPI spec JSON did not look like an OpenAPI document (missing 'paths').")
+    return spec
+
+
+def api_image_digest(compose_file: Path, service: str = "laravel-api") -> Optional[str]:
+    """Read the pinned image reference of a compose service.
+
+    Args:
+        compose_file: docker-compose.yml path.
+        service: Service name.
+
+    Returns:
+        The digest ("sha256:...") if pinned, else the image reference, or None.
+    """
+    if not compose_file.is_file():
+        return None
+    in_service = False
+    indent = None
+    for line in compose_file.read_text(encoding="utf-8").splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        cur_indent = len(line) - len(line.lstrip())
+        if stripped == f"{service}:":
+            in_service, indent = True, cur_indent
+            continue
+        if in_service and indent is not None and cur_indent <= indent:
+            in_service = False
+        if in_service and stripped.startswith("image:"):
+            image = stripped.split(":", 1)[1].strip().strip("\"'")
+            return image.split("@", 1)[1] if "@" in image else image
+    return None
+
+
+def cache_dir() -> Path:
+    """Return the spec cache directory."""
+    return Path(env("OPENAPI_CACHE_DIR", ".cache/openapi"))
+
+
+def _digest_slug(digest: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", digest)[:120]
+
+
+def load_cached(directory: Path) -> tuple[Optional[str], Optional[dict[str, Any]]]:
+    """Return (digest, spec) of the most recently cached spec, if any."""
+    pointer = directory / "latest.json"
+    if not pointer.is_file():
+        return None, None
+    meta = json.loads(pointer.read_text(encoding="utf-8"))
+    spec_file = directory / str(meta.get("file", ""))
+    if not spec_file.is_file():
+        return meta.get("digest"), None
+    return meta.get("digest"), json.loads(spec_file.read_text(encoding="utf-8"))
+
+
+def save_cached(directory: Path, digest: str, spec: dict[str, Any]) -> Path:
+    """Cache a spec under its image digest and mark it as the latest."""
+    name = f"spec-{_digest_slug(digest)}.json"
+    write_json(directory / name, spec)
+    write_json(directory / "latest.json", {"digest": digest, "file": name})
+    return directory / name
+
+
+# -----------------------------------------------------------------------------
+# Diffing
+# -----------------------------------------------------------------------------
+def _hash(obj: Any) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def _inline_refs(spec: dict[str, Any], obj: Any, stack: tuple[str, ...] = ()) -> Any:
+    """Return `obj` with local `$ref`s inlined (recursion cut at cycles).
+
+    Inlining makes a change in `components.schemas.Product` show up as a change
+    of every operation that references it.
+    """
+    if isinstance(obj, dict):
+        ref = obj.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/"):
+            if ref in stack:
+                return {"$ref": ref}
+            node: Any = spec
+            for part in ref[2:].split("/"):
+                node = node.get(part.replace("~1", "/").replace("~0", "~"), {}) if isinstance(node, dict) else {}
+            return _inline_refs(spec, node, stack + (ref,))
+        return {k: _inline_refs(spec, v, stack) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_inline_refs(spec, v, stack) for v in obj]
+    return obj
+
+
+@dataclass
+class OperationPrint:
+    """Fingerprint of one operation."""
+
+    params: dict[str, str]
+    request_body: str
+    responses: str
+    security: str
+
+
+def fingerprints(spec: dict[str, Any]) -> dict[str, OperationPrint]:
+    """Fingerprint every operation as "METHOD /path" -> OperationPrint."""
+    out: dict[str, OperationPrint] = {}
+    for path, ops in (spec.get("paths") or {}).items():
+        if not isinstance(ops, dict):
+            continue
+        shared = ops.get("parameters") or []
+        for method in HTTP_METHODS:
+            op = ops.get(method)
+            if not isinstance(op, dict):
+                continue
+            params: dict[str, str] = {}
+            for p in _inline_refs(spec, list(shared) + list(op.get("parameters") or [])):
+                if isinstance(p, dict) and p.get("name"):
+                    params[f"{p.get('in', 'query')}:{p['name']}"] = _hash(p)
+            out[f"{method.upper()} {path}"] = OperationPrint(
+                params=params,
+                request_body=_hash(_inline_refs(spec, op.get("requestBody"))),
+                responses=_hash(_inline_refs(spec, op.get("responses"))),
+                security=_hash(op.get("security", spec.get("security"))),
+            )
+    return out
+
+
+@dataclass
+class SpecDiff:
+    """Operation-level differences between two specs."""
+
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: dict[str, list[str]] = field(default_factory=dict)
+    meta_changed: bool = False
+
+    @property
+    def empty(self) -> bool:
+        """True if nothing relevant changed."""
+        return not (self.added or self.removed or self.changed or self.meta_changed)
+
+
+def diff_specs(old: dict[str, Any], new: dict[str, Any]) -> SpecDiff:
+    """Diff two OpenAPI documents at operation / parameter granularity.
+
+    Change entries per operation look like:
+        "param:query:sort", "request_body", "responses", "security"
+    """
+    before, after = fingerprints(old), fingerprints(new)
+    diff = SpecDiff(
+        added=sorted(set(after) - set(before)),
+        removed=sorted(set(before) - set(after)),
+        meta_changed=any(old.get(k) != new.get(k) for k in META_KEYS),
+    )
+    for key in sorted(set(before) & set(after)):
+        a, b = before[key], after[key]
+        reasons = [
+            f"param:{name}"
+            for name in sorted(set(a.params) | set(b.params))
+            if a.params.get(name) != b.params.get(name)
+        ]
+        for attr in ("request_body", "responses", "security"):
+            if getattr(a, attr) != getattr(b, attr):
+                reasons.append(attr)
+        if reasons:
+            diff.changed[key] = reasons
+    return diff
+
+
+# -----------------------------------------------------------------------------
+# Topic mapping
+# -----------------------------------------------------------------------------
+def path_topic(path: str) -> str:
+    """Map an OpenAPI path to a topic name."""
+    low = path.lower()
+    segments = [s for s in low.split("/") if s]
+    if "me" in segments:
+        return "me"
+    for needle, topic in PATH_TOPICS:
+        if needle in low:
+            return topic
+    if "product" in low:
+        if "{" not in low:
+            return "products-list"
+        # "/products/{id}" vs "/products/{id}/related"
+        return "products-details" if segments[-1].startswith("{") else "products-related"
+    return f"other:{path}"
+
+
+def param_topic(param_key: str) -> str:
+    """Map a "in:name" parameter key to a topic name."""
+    name = param_key.split(":", 1)[-1].lower()
+    for frag in PARAM_TOPICS:
+        if frag in name:
+            return f"param:{frag}"
+    return f"param:{name}"
+
+
+def topics_for_diff(diff: SpecDiff) -> set[str]:
+    """Translate a spec diff into the set of affected topics.
+
+    Parameter-only changes map to `param:*` topics so that, e.g., a changed
+    `sort` parameter does not re-select every products-list test.
+    """
+    topics: set[str] = set()
+    if diff.meta_changed:
+        topics.add("openapi")
+    for key in diff.added + diff.removed:
+        topics.add(path_topic(key.split(" ", 1)[1]))
+    for key, reasons in diff.changed.items():
+        base = path_topic(key.split(" ", 1)[1])
+        for reason in reasons:
+            if reason.startswith("param:"):
+                topics.add(param_topic(reason[len("param:") :]))
+            else:
+                topics.add(base)
+    return topics
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _current(args: argparse.Namespace) -> tuple[str, dict[str, Any]]:
+    api_host = env("API_HOST", "http://localhost:8091").rstrip("/")
+    docs_url = env("API_DOCS_URL", f"{api_host}/api/documentation")
+    spec = json.loads(Path(args.spec).read_text(encoding="utf-8")) if args.spec else fetch_spec(docs_url, api_host)
+    digest = args.digest or api_image_digest(Path(env("COMPOSE_FILE", "docker/docker-compose.yml"))) or _hash(spec)
+    return digest, spec
+
+
+def _cmd_diff(args: argparse.Namespace) -> int:
+    digest, spec = _current(args)
+    old_digest, old_spec = load_cached(cache_dir())
+
+    if old_spec is None:
+        impact: dict[str, Any] = {"mode": "full", "topics": [], "reason": "no cached spec"}
+    else:
+        diff = diff_specs(old_spec, spec)
+        impact = {
+            "mode": "none" if diff.empty else "selective",
+            "topics": sorted(topics_for_diff(diff)),
+            "added": diff.added,
+            "removed": diff.removed,
+            "changed": diff.changed,
+            "meta_changed": diff.meta_changed,
+        }
+    impact.update({"old_digest": old_digest, "new_digest": digest})
+
+    out = Path(args.output)
+    write_json(out, impact)
+    print(f"OpenAPI impact ({old_digest} -> {digest}): mode={impact['mode']}")
+    for topic in impact["topics"]:
+        print(f"  - {topic}")
+    print(f"Impact written: {out}")
+    return 0
+
+
+def _cmd_update_cache(args: argparse.Namespace) -> int:
+    digest, spec = _current(args)
+    path = save_cached(cache_dir(), digest, spec)
+    print(f"Cached OpenAPI spec for {digest}: {path}")
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.openapi_impact", description=__doc__.split("\n")[0])
+    parser.add_argument("--spec", help="read the current spec from a file instead of the running API")
+    parser.add_argument("--digest", help="override the API image digest (default: from COMPOSE_FILE)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    d = sub.add_parser("diff", help="diff current spec against the cached one")
+    d.add_argument("--output", default=str(artifacts_root() / "api" / "impact.json"))
+    d.set_defaults(func=_cmd_diff)
+
+    u = sub.add_parser("update-cache", help="cache the current spec as the new baseline")
+    u.set_defaults(func=_cmd_update_cache)
+
+    args = parser.parse_args(argv)
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""pytest plugin: adaptive per-endpoint request timeouts.
+
+Every API call passes a global `DEFAULT_TIMEOUT_SECONDS = 30` (15 for base-URL
+probes), so a hung endpoint takes 30s to be detected even when it normally
+answers in 50ms. This plugin learns a latency distribution per endpoint
+(`GET /products/{id}`, query parameter *names* included), persisted across
+runs, and the shared `http` session (tests/api/conftest.py) uses
+
+    timeout = clamp(multiplier * p99, floor, caller's timeout)
+
+for idempotent requests once an endpoint has enough samples. The caller's
+timeout stays the ceiling. The first requests to each endpoint in a run are
+warm-up (cold opcache, first DB hit after a seed): they keep the caller's
+timeout and are only reported if they outlive the adaptive one. After that,
+when the adaptive timeout expires, the request is retried once with the same
+adaptive window if two windows fit under the ceiling (a transient stall is
+survived, a hung endpoint fails after at most 2 x adaptive), and fails right
+away otherwise. Each such case is reported in
+the terminal summary, so the distribution (or the endpoint) can be looked at.
+
+The store is shared by concurrent runs (tools/multi_stack.py shards): at the
+end of a run it is re-read under a file lock and only this run's samples are
+appended.
+
+Options
+-------
+--adaptive-timeouts / --no-adaptive-timeouts
+                         default: on unless $ADAPTIVE_TIMEOUTS=false
+--latency-store=PATH     default: $API_LATENCY_STORE or .cache/api-latency.json
+--timeout-multiplier=X   default: 3
+--timeout-floor=SECS     default: 2
+--timeout-min-samples=N  samples needed before adapting, default: 20
+--timeout-warmup=N       requests per endpoint and run not enforced, default: 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+FORMAT = "toolshop.api-latency/v1"
+
+# Most recent samples kept per endpoint (older runs age out).
+MAX_SAMPLES = 500
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty sample list."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class Exceeded:
+    """A request that outlived its adaptive timeout."""
+
+    endpoint: str
+    adaptive: float
+    seconds: Optional[float]  # latency of the retry, None if the request failed
+    warmup: bool = False  # a warm-up request: not enforced, `seconds` is its latency
+
+
+class AdaptiveTimeouts:
+    """Per-endpoint latency history and timeout policy."""
+
+    def __init__(
+        self,
+        history: Optional[dict[str, list[float]]] = None,
+        multiplier: float = 3.0,
+        floor: float = 2.0,
+        min_samples: int = 20,
+        enabled: bool = True,
+        warmup: int = 3,
+    ) -> None:
+        self.history = history or {}
+        self.multiplier = multiplier
+        self.floor = floor
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self.warmup = warmup
+        self.observed: dict[str, list[float]] = {}
+        self.exceeded: list[Exceeded] = []
+        self._p99: dict[str, float] = {}
+        self._adapted: dict[str, int] = {}
+
+    def timeout_for(self, method: str, endpoint: str, ceiling: Any) -> Optional[float]:
+        """Return the adaptive timeout for a request, or None to keep the caller's.
+
+        Only idempotent requests with a plain numeric caller timeout and
+        enough history are adapted.
+        """
+        if not self.enabled or method.upper() not in IDEMPOTENT_METHODS:
+            return None
+        if not isinstance(ceiling, (int, float)) or isinstance(ceiling, bool):
+            return None
+        samples = self.history.get(endpoint, [])
+        if len(samples) < self.min_samples:
+            return None
+        if endpoint not in self._p99:
+            self._p99[endpoint] = percentile(samples, 99)
+        timeout = max(self.floor, self.multiplier * self._p99[endpoint])
+        return timeout if timeout < ceiling else None
+
+    def warming_up(self, endpoint: str) -> bool:
+        """Count one adapted request; True for the endpoint's first `warmup` in this run."""
+        self._adapted[endpoint] = self._adapted.get(endpoint, 0) + 1
+        return self._adapted[endpoint] <= self.warmup
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        """Record the latency of a completed request."""
+        self.observed.setdefault(endpoint, []).append(round(seconds, 4))
+
+    def record_exceeded(
+        self, endpoint: str, adaptive: float, seconds: Optional[float], warmup: bool = False
+    ) -> None:
+        """Record that a request needed more than its adaptive timeout."""
+        self.exceeded.append(Exceeded(endpoint, adaptive, seconds, warmup))
+
+    @staticmethod
+    def retry_timeout(adaptive: float, ceiling: Any) -> Optional[float]:
+        """Timeout of the single retry after `adaptive` expired, or None to fail now.
+
+        The retry gets one more adaptive window, and only when both windows
+        together stay within the caller's timeout.
+        """
+        return adaptive if 2 * adaptive <= ceiling else None
+
+    def merged_history(self, history: Optional[dict[str, list[float]]] = None) -> dict[str, list[float]]:
+        """`history` (default: as loaded) plus this run's samples, trimmed to MAX_SAMPLES."""
+        base = self.history if history is None else history
+        merged = {k: list(v) for k, v in base.items()}
+        for endpoint, samples in self.observed.items():
+            merged[endpoint] = (merged.get(endpoint, []) + samples)[-MAX_SAMPLES:]
+        return merged
+
+
+def load_store(path: Path) -> dict[str, list[float]]:
+    """Load persisted latency samples (missing or foreign file -> empty)."""
+    if not path.is_file():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != FORMAT:
+        return {}
+    endpoints = data.get("endpoints") or {}
+    return {k: [float(x) for x in v] for k, v in endpoints.items() if isinstance(v, list)}
+
+
+def save_store(path: Path, history: dict[str, list[float]]) -> None:
+    """Persist latency samples (write-then-rename, readers never see a partial file)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"format": FORMAT, "endpoints": history}, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def update_store(path: Path, policy: AdaptiveTimeouts) -> None:
+    """Append this run's samples to the store as it is now, under an exclusive lock.
+
+    Concurrent runs each loaded the store at start; re-reading under the lock
+    keeps the samples other runs saved in the meantime.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.with_name(f".{path.name}.lock").open("w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        save_store(path, policy.merged_history(load_store(path)))
+
+
+_POLICY_KEY = pytest.StashKey[AdaptiveTimeouts]()
+
+
+def _env(name: str, default: str) -> str:
+    v = os.getenv(name)
+    return v.strip() if isinstance(v, str) and v.strip() else default
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register adaptive timeout options."""
+    group = parser.getgroup("adaptive-timeouts", "per-endpoint timeouts learned from observed latency")
+    group.addoption(
+        "--adaptive-timeouts",
+        action=argparse.BooleanOptionalAction,
+        default=_env("ADAPTIVE_TIMEOUTS", "true").lower() == "true",
+        help="derive request timeouts from per-endpoint p99 latency",
+    )
+    group.addoption(
+        "--latency-store",
+        default=_env("API_LATENCY_STORE", ".cache/api-latency.json"),
+        help="JSON file with per-endpoint latency samples (persisted across runs)",
+    )
+    group.addoption("--timeout-multiplier", type=float, default=3.0, help="timeout = multiplier * p99")
+    group.addoption("--timeout-floor", type=float, default=2.0, help="lower bound of adaptive timeouts (s)")
+    group.addoption("--timeout-min-samples", type=int, default=20, help="samples needed before adapting")
+    group.addoption(
+        "--timeout-warmup", type=int, default=3, help="first requests per endpoint and run that are not enforced"
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Load the latency store and build the session-wide policy."""
+    config.stash[_POLICY_KEY] = AdaptiveTimeouts(
+        history=load_store(Path(config.getoption("latency_store"))),
+        multiplier=config.getoption("timeout_multiplier"),
+        floor=config.getoption("timeout_floor"),
+        min_samples=config.getoption("timeout_min_samples"),
+        enabled=config.getoption("adaptive_timeouts"),
+        warmup=config.getoption("timeout_warmup"),
+    )
+
+
+@pytest.fixture(scope="session")
+def adaptive_timeouts(pytestconfig: pytest.Config) -> AdaptiveTimeouts:
+    """Return the session-wide adaptive timeout policy (used by the `http` session)."""
+    return pytestconfig.stash[_POLICY_KEY]
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """Persist this run's latency samples."""
+    policy = session.config.stash.get(_POLICY_KEY, None)
+    if policy is None or not policy.observed:
+        return
+    update_store(Path(session.config.getoption("latency_store")), policy)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config) -> None:
+    """Report requests that needed more than their adaptive timeout."""
+    policy = config.stash.get(_POLICY_KEY, None)
+    if policy is None or not policy.exceeded:
+        return
+    terminalreporter.write_sep("-", "adaptive timeouts exceeded")
+    for ex in policy.exceeded:
+        if ex.warmup:
+            outcome = f"warm-up request took {ex.seconds:.2f}s (not enforced)"
+        else:
+            outcome = f"retry took {ex.seconds:.2f}s" if ex.seconds is not None else "request failed"
+        terminalreporter.write_line(f"{ex.endpoint}: adaptive timeout {ex.adaptive:.2f}s exceeded, {outcome}")
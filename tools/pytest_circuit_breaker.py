@@ -0,0 +1,178 @@
+"""pytest plugin: fail fast when the AUT goes down mid-run.
+
+Without a breaker, a dead gateway makes every remaining API test wait for its
+full request timeout (30s) before failing. The shared `http` session
+(tests/api/conftest.py) reports each request outcome to a session-wide
+`CircuitBreaker`:
+
+- closed:    requests pass; N consecutive connection errors / timeouts /
+             gateway errors (502/503/504) trip the breaker,
+- open:      requests raise immediately and tests using `http` fail (or skip)
+             in setup with the reason of the last failure,
+- half-open: after the cooldown one request is let through; success closes
+             the breaker, failure re-opens it for another cooldown.
+
+Options
+-------
+--breaker-threshold=N     consecutive failures that trip the breaker (0 = off)
+                          default: $CIRCUIT_BREAKER_THRESHOLD or 3
+--breaker-cooldown=SECS   time before a half-open probe
+                          default: $CIRCUIT_BREAKER_COOLDOWN or 10
+--breaker-action=ACTION   "fail" (default) or "skip" tests while open
+                          default: $CIRCUIT_BREAKER_ACTION or fail
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Optional
+
+import pytest
+
+# Fixtures whose use marks a test as a network test.
+NETWORK_FIXTURES = ("http",)
+
+# HTTP statuses that mean "the gateway is up but the AUT behind it is not".
+GATEWAY_ERROR_STATUSES = frozenset({502, 503, 504})
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (single-threaded, clock injectable)."""
+
+    def __init__(self, threshold: int, cooldown: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_failure: Optional[str] = None
+        self.trips = 0
+        self.short_circuited = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the breaker is active (threshold > 0)."""
+        return self.threshold > 0
+
+    def open_reason(self) -> Optional[str]:
+        """Return why calls are blocked right now, or None if a call may proceed.
+
+        Does not change state, so it can be used to gate tests in setup.
+        """
+        if self.state != OPEN or self.clock() - self.opened_at >= self.cooldown:
+            return None
+        retry_in = self.cooldown - (self.clock() - self.opened_at)
+        return (
+            f"circuit breaker open after {self.failures} consecutive failure(s) "
+            f"(last: {self.last_failure}); next probe in {retry_in:.0f}s"
+        )
+
+    def before_call(self) -> Optional[str]:
+        """Gate one request: return a blocking reason, or None (half-opening if due)."""
+        if not self.enabled:
+            return None
+        reason = self.open_reason()
+        if reason is not None:
+            self.short_circuited += 1
+            return reason
+        if self.state == OPEN:
+            self.state = HALF_OPEN
+        return None
+
+    def record_success(self) -> None:
+        """A request reached the AUT: close the breaker."""
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self, description: str) -> None:
+        """A request failed at the transport/gateway level."""
+        if not self.enabled:
+            return
+        self.failures += 1
+        self.last_failure = description
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold):
+            if self.state == CLOSED:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = self.clock()
+
+
+_BREAKER_KEY = pytest.StashKey[CircuitBreaker]()
+_BLOCKED_KEY = pytest.StashKey[list[str]]()
+
+
+def _env(name: str, default: str) -> str:
+    v = os.getenv(name)
+    return v.strip() if isinstance(v, str) and v.strip() else default
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register circuit breaker options."""
+    group = parser.getgroup("breaker", "fail fast when the AUT becomes unreachable")
+    group.addoption(
+        "--breaker-threshold",
+        type=int,
+        default=int(_env("CIRCUIT_BREAKER_THRESHOLD", "3")),
+        help="consecutive connection errors/timeouts that trip the breaker (0 disables)",
+    )
+    group.addoption(
+        "--breaker-cooldown",
+        type=float,
+        default=float(_env("CIRCUIT_BREAKER_COOLDOWN", "10")),
+        help="seconds before the open breaker lets one probe request through",
+    )
+    group.addoption(
+        "--breaker-action",
+        default=_env("CIRCUIT_BREAKER_ACTION", "fail"),
+        choices=("fail", "skip"),
+        help="what to do with network tests while the breaker is open",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Create the session-wide breaker."""
+    config.stash[_BREAKER_KEY] = CircuitBreaker(
+        threshold=config.getoption("breaker_threshold"),
+        cooldown=config.getoption("breaker_cooldown"),
+    )
+    config.stash[_BLOCKED_KEY] = []
+
+
+@pytest.fixture(scope="session")
+def circuit_breaker(pytestconfig: pytest.Config) -> CircuitBreaker:
+    """Return the session-wide circuit breaker (shared with the `http` session)."""
+    return pytestconfig.stash[_BREAKER_KEY]
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item: pytest.Item) -> None:
+    """Fail/skip network tests immediately while the breaker is open."""
+    if not any(f in getattr(item, "fixturenames", ()) for f in NETWORK_FIXTURES):
+        return
+    reason = item.config.stash[_BREAKER_KEY].open_reason()
+    if reason is None:
+        return
+    item.config.stash[_BLOCKED_KEY].append(item.nodeid)
+    if item.config.getoption("breaker_action") == "skip":
+        pytest.skip(reason)
+    pytest.fail(reason, pytrace=False)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config) -> None:
+    """Report breaker trips and short-circuited tests."""
+    breaker = config.stash.get(_BREAKER_KEY, None)
+    if breaker is None or not breaker.trips:
+        return
+    blocked = config.stash[_BLOCKED_KEY]
+    terminalreporter.write_sep("-", "circuit breaker")
+    terminalreporter.write_line(
+        f"tripped {breaker.trips} time(s); {len(blocked)} test(s) and "
+        f"{breaker.short_circuited} request(s) short-circuited; state={breaker.state}"
+    )
+    terminalreporter.write_line(f"last failure: {breaker.last_failure}")
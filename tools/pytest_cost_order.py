@@ -0,0 +1,234 @@
+"""pytest plugin: cost-aware test ordering for fastest feedback.
+
+Records per-test duration (setup + call + teardown) and an exponentially
+weighted failure rate in a history file, and reorders collection so that
+likely-to-fail, cheap tests run first:
+
+    score = failure probability / expected duration
+
+Tests without history count as likely to fail (prior 0.5) with the median
+duration, so new tests run early.
+
+Fixture locality is respected. Tests sharing a module-, class- or
+package-scoped fixture (or a parametrized instance of a higher-scoped one)
+stay contiguous as one group, so reordering never tears a fixture down and
+rebuilds it. Groups are ordered by their best score and tests are sorted by
+score inside each group. Session-scoped fixtures are set up once per run
+regardless of order.
+
+Ordering runs before tools.pytest_impact, whose affected-first partition keeps
+this order within each partition.
+
+The history file is only read and written when ordering is on, so plain
+`pytest` runs leave it alone. It is shared by concurrent runs
+(tools/multi_stack.py shards): at the end of a run it is re-read under a file
+lock and this run's outcomes are blended into the current contents.
+
+Options
+-------
+--test-order=MODE      "off" (default unless $TEST_ORDER is set): file order
+                       "cost": score order
+                       "ff":   tests that failed last run first, then score order
+--test-history=PATH    default: $TEST_HISTORY or .cache/test-history.json
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import statistics
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+FORMAT = "toolshop.test-history/v1"
+
+# Weight of the newest outcome in the failure-rate EWMA.
+FAILURE_SMOOTHING = 0.3
+
+# Failure probability assumed for tests without history.
+UNKNOWN_FAILURE_PRIOR = 0.5
+
+# Floor for failure probability so that stable tests still order by duration.
+MIN_FAILURE_RATE = 0.01
+
+DEFAULT_DURATION_SECONDS = 0.5
+MIN_DURATION_SECONDS = 0.01
+
+_SHARED_SCOPES = ("package", "module", "class")
+
+
+def load_history(path: Path) -> dict[str, dict[str, Any]]:
+    """Load per-test history (missing or foreign file -> empty)."""
+    if not path.is_file():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != FORMAT:
+        return {}
+    tests = data.get("tests") or {}
+    return {k: v for k, v in tests.items() if isinstance(v, dict)}
+
+
+def save_history(path: Path, tests: dict[str, dict[str, Any]]) -> None:
+    """Persist per-test history (write-then-rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"format": FORMAT, "tests": tests}, indent=1, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def record_run(path: Path, run: dict[str, list[Any]]) -> None:
+    """Blend one run's {nodeid: [seconds, failed, skipped]} into the history file.
+
+    The file is re-read under an exclusive lock, so outcomes saved by
+    concurrent runs in the meantime are kept.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.with_name(f".{path.name}.lock").open("w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        history = load_history(path)
+        for nodeid, (seconds, failed, skipped) in run.items():
+            if skipped and not failed:
+                continue  # a skip says nothing about cost or failure likelihood
+            history[nodeid] = update_entry(history.get(nodeid), seconds, failed)
+        save_history(path, history)
+
+
+def update_entry(entry: Optional[dict[str, Any]], seconds: float, failed: bool) -> dict[str, Any]:
+    """Blend one observed outcome into a test's history entry."""
+    if entry is None:
+        return {"duration": round(seconds, 4), "failure_rate": 1.0 if failed else 0.0, "runs": 1, "last_failed": failed}
+    rate = FAILURE_SMOOTHING * (1.0 if failed else 0.0) + (1 - FAILURE_SMOOTHING) * float(entry.get("failure_rate", 0))
+    duration = 0.5 * seconds + 0.5 * float(entry.get("duration", seconds))
+    return {
+        "duration": round(duration, 4),
+        "failure_rate": round(rate, 4),
+        "runs": int(entry.get("runs", 0)) + 1,
+        "last_failed": failed,
+    }
+
+
+def score(entry: Optional[dict[str, Any]], default_duration: float) -> float:
+    """Expected failures detected per second of running the test."""
+    if entry is None:
+        return UNKNOWN_FAILURE_PRIOR / max(default_duration, MIN_DURATION_SECONDS)
+    rate = max(float(entry.get("failure_rate", 0)), MIN_FAILURE_RATE)
+    return rate / max(float(entry.get("duration", default_duration)), MIN_DURATION_SECONDS)
+
+
+def locality_key(item: pytest.Item) -> str:
+    """Return the group an item must stay contiguous with (its own nodeid if none)."""
+    info = getattr(item, "_fixtureinfo", None)
+    callspec = getattr(item, "callspec", None)
+    if info is None:
+        return item.nodeid
+    keys: list[str] = []
+    for name, defs in info.name2fixturedefs.items():
+        if not defs:
+            continue
+        scope = str(defs[-1].scope)
+        if scope == "function":
+            continue
+        if scope in _SHARED_SCOPES:
+            node = item.getparent(pytest.Class if scope == "class" else pytest.Module) if scope != "package" else None
+            keys.append(f"{scope}:{node.nodeid if node is not None else item.path.parent}")
+        if callspec is not None and name in getattr(callspec, "params", {}):
+            keys.append(f"param:{name}={callspec.indices.get(name)}")
+    # The broadest locality wins: package > module > class; parametrized instances refine it.
+    keys.sort(key=lambda k: (not k.startswith("package:"), not k.startswith("module:"), k))
+    return "|".join(keys) if keys else item.nodeid
+
+
+def order_items(items: list[pytest.Item], history: dict[str, dict[str, Any]], mode: str) -> list[pytest.Item]:
+    """Return items in cost order (see module docstring)."""
+    known = [float(e["duration"]) for e in history.values() if isinstance(e.get("duration"), (int, float))]
+    default_duration = statistics.median(known) if known else DEFAULT_DURATION_SECONDS
+
+    def item_rank(item: pytest.Item) -> tuple[bool, float]:
+        entry = history.get(item.nodeid)
+        last_failed = mode == "ff" and bool(entry and entry.get("last_failed"))
+        return (last_failed, score(entry, default_duration))
+
+    groups: dict[str, list[tuple[int, pytest.Item]]] = {}
+    for idx, item in enumerate(items):
+        groups.setdefault(locality_key(item), []).append((idx, item))
+
+    ranked: list[tuple[tuple[bool, float], int, list[pytest.Item]]] = []
+    for members in groups.values():
+        members.sort(key=lambda m: (item_rank(m[1]), -m[0]), reverse=True)
+        best = max(item_rank(item) for _, item in members)
+        ranked.append((best, min(idx for idx, _ in members), [item for _, item in members]))
+    ranked.sort(key=lambda g: (g[0], -g[1]), reverse=True)
+    return [item for _, _, members in ranked for item in members]
+
+
+_HISTORY_KEY = pytest.StashKey[dict[str, dict[str, Any]]]()
+_RUN_KEY = pytest.StashKey[dict[str, list[Any]]]()
+
+
+def _env(name: str, default: str) -> str:
+    v = os.getenv(name)
+    return v.strip() if isinstance(v, str) and v.strip() else default
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register ordering options."""
+    group = parser.getgroup("cost-order", "order tests by historical failure rate and duration")
+    group.addoption(
+        "--test-order",
+        default=_env("TEST_ORDER", "off"),
+        choices=("off", "cost", "ff"),
+        help="off: file order; cost: likely-to-fail and cheap first; ff: last failures first, then cost",
+    )
+    group.addoption(
+        "--test-history",
+        default=_env("TEST_HISTORY", ".cache/test-history.json"),
+        help="per-test duration/failure history (updated after every ordered run)",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Load the history file (not needed in file order)."""
+    ordered = config.getoption("test_order") != "off"
+    config.stash[_HISTORY_KEY] = load_history(Path(config.getoption("test_history"))) if ordered else {}
+    config.stash[_RUN_KEY] = {}
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Reorder collected tests by score, keeping fixture-sharing groups together."""
+    mode = config.getoption("test_order")
+    if mode == "off" or len(items) < 2:
+        return
+    items[:] = order_items(items, config.stash[_HISTORY_KEY], mode)
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is not None:
+        history = config.stash[_HISTORY_KEY]
+        unknown = sum(1 for it in items if it.nodeid not in history)
+        reporter.write_line(f"test-order: mode={mode} tests={len(items)} without history={unknown}")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo[None]):
+    """Accumulate duration and outcome per test over setup/call/teardown."""
+    outcome = yield
+    report: pytest.TestReport = outcome.get_result()
+    entry = item.config.stash[_RUN_KEY].setdefault(item.nodeid, [0.0, False, False])
+    entry[0] += report.duration
+    if report.failed and not hasattr(report, "wasxfail"):
+        entry[1] = True
+    if report.skipped:
+        entry[2] = True
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """Blend this run's outcomes into the history file (ordered runs only)."""
+    run = session.config.stash.get(_RUN_KEY, {})
+    if not run or session.config.getoption("collectonly") or session.config.getoption("test_order") == "off":
+        return
+    record_run(Path(session.config.getoption("test_history")), run)
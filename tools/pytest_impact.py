@@ -0,0 +1,141 @@
+"""pytest plugin: run tests affected by an OpenAPI diff first (or only).
+
+Consumes the impact file written by `python -m tools.openapi_impact diff` and
+maps each collected test to topics using:
+
+- the fixtures the test function itself requests (e.g. `products_list_path`
+  -> products-list, `auth_token` -> login); fixtures only reached through
+  other fixtures (`http` -> `api_base_url` -> `products_list_path`) are
+  plumbing shared by nearly every test and do not count,
+- keywords in its name for OpenAPI lookups done inside the test
+  (`sort`, `page`/`pagination`, `category`, `brand`, `me`, `invoice`, ...).
+
+Options
+-------
+--impact=PATH          impact.json to use (no-op when omitted)
+--impact-mode=MODE     "first" (default): affected tests first, then the rest
+                       "only": deselect unaffected tests
+                       "rest": deselect affected tests (second pass)
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+# Fixture name -> topics.
+FIXTURE_TOPICS: dict[str, tuple[str, ...]] = {
+    "products_list_path": ("products-list",),
+    "sample_product": ("products-list",),
+    "product_details_path": ("products-details",),
+    "sample_product_identifier": ("products-details",),
+    "sample_product_details_url": ("products-details",),
+    "sample_product_id": ("products-details",),
+    "categories_list_path": ("categories",),
+    "sample_category_id": ("categories",),
+    "brands_list_path": ("brands",),
+    "sample_brand_id": ("brands",),
+    "auth_token": ("login",),
+    "openapi_spec": ("openapi",),
+    "openapi": ("openapi",),
+}
+
+# Test-name token -> topics (lookups done inside the test body).
+NAME_TOPICS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("sort", ("param:sort",)),
+    ("pagina", ("param:page",)),
+    ("page", ("param:page",)),
+    ("category", ("param:category",)),
+    ("brand", ("param:brand",)),
+    ("login", ("login",)),
+    ("me", ("me",)),
+    ("invoice", ("invoices",)),
+    ("favorite", ("favorites",)),
+    ("cart", ("cart",)),
+    ("related", ("products-related",)),
+    ("openapi", ("openapi",)),
+    ("swagger", ("openapi",)),
+)
+
+_TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+def item_topics(item: pytest.Item) -> set[str]:
+    """Return the topics a collected test touches."""
+    topics: set[str] = set()
+    fixtureinfo = getattr(item, "_fixtureinfo", None)
+    for fixture in getattr(fixtureinfo, "argnames", ()):
+        topics.update(FIXTURE_TOPICS.get(fixture, ()))
+    name = getattr(item, "originalname", item.name).lower()
+    tokens = set(_TOKEN_SPLIT.split(name))
+    for needle, mapped in NAME_TOPICS:
+        # Short needles ("me") must match a whole token; longer ones any substring.
+        if needle in tokens or (len(needle) > 3 and needle in name):
+            topics.update(mapped)
+    return topics
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register impact selection options."""
+    group = parser.getgroup("impact", "OpenAPI diff based test impact selection")
+    group.addoption("--impact", default=None, help="impact.json written by tools.openapi_impact")
+    group.addoption(
+        "--impact-mode",
+        default="first",
+        choices=("first", "only", "rest"),
+        help="first: affected tests first; only: affected tests only; rest: unaffected only",
+    )
+
+
+def _load_impact(path: str) -> dict[str, Any]:
+    p = Path(path)
+    if not p.is_file():
+        return {"mode": "full", "topics": []}
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """Reorder / deselect tests according to the impact file."""
+    path = config.getoption("impact")
+    if not path:
+        return
+
+    impact = _load_impact(path)
+    mode = impact.get("mode", "full")
+    wanted = set(impact.get("topics") or [])
+
+    if mode == "full":
+        affected = list(items)
+    elif mode == "none":
+        affected = []
+    else:
+        affected = [it for it in items if item_topics(it) & wanted]
+    covered = set().union(*(item_topics(it) for it in items)) if items else set()
+    uncovered = sorted(wanted - covered)
+    affected_ids = {id(it) for it in affected}
+    unaffected = [it for it in items if id(it) not in affected_ids]
+
+    option = config.getoption("impact_mode")
+    if option == "only":
+        keep, drop = affected, unaffected
+    elif option == "rest":
+        keep, drop = unaffected, affected
+    else:
+        keep, drop = affected + unaffected, []
+
+    if drop:
+        config.hook.pytest_deselected(items=drop)
+    items[:] = keep
+
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is not None:
+        reporter.write_line(
+            f"impact: mode={mode} topics={sorted(wanted)} "
+            f"affected={len(affected)} unaffected={len(unaffected)} ({option})"
+        )
+        if uncovered:
+            reporter.write_line(f"impact: changed topics without tests: {uncovered}")
@@ -0,0 +1,277 @@
+"""pytest plugin: content-addressed result cache for unchanged test inputs.
+
+Opt-in, for quick local iteration: re-running `make api-smoke` against an
+unchanged stack skips tests that already passed with exactly the same inputs.
+A test's key is the hash of
+
+- the full source of the test's module and of every module defining a fixture
+  in its closure (module-level helpers are part of what a test runs),
+- the values of the fixtures it requests (JSON-able values; other objects
+  contribute their type),
+- the OpenAPI spec served by the stack,
+- the pinned API image digest (docker/docker-compose.yml),
+- a seeded-DB fingerprint (CHECKSUM TABLE of every table except ones the
+  tests themselves write to).
+
+A test whose key passed within the TTL is reported as skipped with a
+`[cached]` reason and counted in the terminal summary. Only passes are cached.
+Failures, errors and xfails always re-run. Tests marked `no_result_cache`
+(timing guardrails, which measure the live stack rather than its inputs)
+always run. If any environment component cannot be determined (stack down,
+docker unavailable), caching is off for that run.
+
+Options
+-------
+--result-cache          enable (default: $RESULT_CACHE == "true")
+--result-cache-ttl=S    default: $RESULT_CACHE_TTL or 3600
+--result-cache-file=P   default: $RESULT_CACHE_FILE or .cache/result-cache.json
+
+Environment variables
+---------------------
+- API_HOST / API_DOCS_URL:  spec download (as in tests/api/conftest.py)
+- DC / COMPOSE_FILE / API_SERVICE / DB_SERVICE / DB_NAME: see tools/db_snapshot.py
+- RESULT_CACHE_DB_EXCLUDE:  comma-separated tables left out of the DB fingerprint
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+FORMAT = "toolshop.result-cache/v1"
+
+# Tables written by the test suites themselves (carts from UI tests, framework
+# bookkeeping); including them would change the fingerprint on every run.
+DEFAULT_DB_EXCLUDE = "carts,cart_items,jobs,failed_jobs,sessions,cache,personal_access_tokens"
+
+
+def _env(name: str, default: str) -> str:
+    v = os.getenv(name)
+    return v.strip() if isinstance(v, str) and v.strip() else default
+
+
+def _sha(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _canonical(value: Any) -> str:
+    """Stable text form of a fixture value (type name for non-JSON objects)."""
+    return json.dumps(value, sort_keys=True, default=lambda o: f"<{type(o).__module__}.{type(o).__qualname__}>")
+
+
+def environment_fingerprint() -> tuple[Optional[dict[str, str]], Optional[str]]:
+    """Return ({component: hash}, None), or (None, reason) if a component is unknown."""
+    from tools.db_snapshot import Settings, table_checksums
+    from tools.openapi_impact import api_image_digest, fetch_spec
+
+    settings = Settings.from_env()
+    api_host = _env("API_HOST", "http://localhost:8091").rstrip("/")
+    docs_url = _env("API_DOCS_URL", f"{api_host}/api/documentation")
+
+    digest = api_image_digest(settings.compose_file, settings.api_service)
+    if not digest:
+        return None, f"no image for {settings.api_service} in {settings.compose_file}"
+    try:
+        spec = fetch_spec(docs_url, api_host)
+    except (OSError, ValueError, RuntimeError) as exc:
+        return None, f"cannot fetch OpenAPI spec: {exc}"
+    exclude = tuple(t.strip() for t in _env("RESULT_CACHE_DB_EXCLUDE", DEFAULT_DB_EXCLUDE).split(",") if t.strip())
+    try:
+        checksums = table_checksums(settings, exclude)
+    except (OSError, subprocess.CalledProcessError) as exc:
+        return None, f"cannot fingerprint {settings.db_name}: {getattr(exc, 'stderr', '') or exc}"
+    if not checksums:
+        return None, f"no tables in {settings.db_name}"
+    return {
+        "image": digest,
+        "openapi": _sha(_canonical(spec)),
+        "db": _sha(_canonical(checksums)),
+    }, None
+
+
+class ResultCache:
+    """Persistent {key: last pass} store plus per-run bookkeeping."""
+
+    def __init__(self, path: Path, ttl: float, fingerprint: dict[str, str]) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.fingerprint = _sha(_canonical(fingerprint))
+        self.entries = self._load()
+        self.hits: list[tuple[str, float]] = []
+        self.stored = 0
+        self._value_hashes: dict[int, tuple[Any, str]] = {}
+        self._source_hashes: dict[Any, str] = {}
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if not self.path.is_file():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("format") != FORMAT:
+            return {}
+        now = time.time()
+        return {k: v for k, v in (data.get("entries") or {}).items() if now - v.get("passed_at", 0) < self.ttl}
+
+    def save(self) -> None:
+        """Persist entries (write-then-rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"format": FORMAT, "entries": self.entries}, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def _source(self, func: Any) -> str:
+        """Hash of the whole file defining `func` (its qualname if there is none)."""
+        try:
+            path = inspect.getsourcefile(func)
+        except TypeError:
+            path = None
+        key = path or getattr(func, "__qualname__", repr(func))
+        if key not in self._source_hashes:
+            try:
+                text = Path(path).read_text(encoding="utf-8") if path else key
+            except OSError:
+                text = key
+            self._source_hashes[key] = _sha(text)
+        return self._source_hashes[key]
+
+    def _value(self, value: Any) -> str:
+        # Session fixtures (e.g. the OpenAPI spec) are the same object for every test.
+        # The value is kept alive next to its hash so its id cannot be reused.
+        key = id(value)
+        if key not in self._value_hashes:
+            self._value_hashes[key] = (value, _sha(_canonical(value)))
+        return self._value_hashes[key][1]
+
+    def key_for(self, item: pytest.Function) -> str:
+        """Content address of a test's inputs (call after fixture setup)."""
+        parts = [self.fingerprint, item.nodeid, self._source(item.function)]
+        info = getattr(item, "_fixtureinfo", None)
+        for name in sorted(info.name2fixturedefs if info is not None else ()):
+            defs = info.name2fixturedefs[name]
+            if defs:
+                parts.append(f"{name}:{self._source(defs[-1].func)}")
+        for name in sorted(item.funcargs):
+            if name != "request":
+                parts.append(f"{name}={self._value(item.funcargs[name])}")
+        return _sha("\n".join(parts))
+
+    def lookup(self, key: str) -> Optional[dict[str, Any]]:
+        """Return the cached pass for a key, if still within the TTL."""
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry.get("passed_at", 0) >= self.ttl:
+            return None
+        return entry
+
+    def store(self, key: str, nodeid: str, duration: float) -> None:
+        """Remember a pass."""
+        self.entries[key] = {"nodeid": nodeid, "passed_at": time.time(), "duration": round(duration, 4)}
+        self.stored += 1
+
+
+_CACHE_KEY = pytest.StashKey[Optional[ResultCache]]()
+_REASON_KEY = pytest.StashKey[Optional[str]]()
+_ITEM_KEY = pytest.StashKey[str]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register result cache options."""
+    group = parser.getgroup("result-cache", "skip tests whose inputs are unchanged since they last passed")
+    group.addoption(
+        "--result-cache",
+        action="store_true",
+        default=_env("RESULT_CACHE", "false").lower() == "true",
+        help="skip tests that passed with identical inputs within the TTL",
+    )
+    group.addoption(
+        "--result-cache-ttl",
+        type=float,
+        default=float(_env("RESULT_CACHE_TTL", "3600")),
+        help="seconds a cached pass stays valid",
+    )
+    group.addoption(
+        "--result-cache-file",
+        default=_env("RESULT_CACHE_FILE", ".cache/result-cache.json"),
+        help="cache file",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Reserve the stash slots; the environment is fingerprinted at session start."""
+    config.addinivalue_line("markers", "no_result_cache: always run, never reuse a cached pass (timing checks)")
+    config.stash[_CACHE_KEY] = None
+    config.stash[_REASON_KEY] = None
+
+
+def pytest_sessionstart(session: pytest.Session) -> None:
+    """Fingerprint the stack once (only when enabled)."""
+    config = session.config
+    if not config.getoption("result_cache") or config.getoption("collectonly"):
+        return
+    fingerprint, reason = environment_fingerprint()
+    if fingerprint is None:
+        config.stash[_REASON_KEY] = reason
+        return
+    config.stash[_CACHE_KEY] = ResultCache(
+        Path(config.getoption("result_cache_file")), config.getoption("result_cache_ttl"), fingerprint
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_call(item: pytest.Item) -> None:
+    """Skip a test whose inputs match a cached pass."""
+    cache = item.config.stash[_CACHE_KEY]
+    if cache is None or not isinstance(item, pytest.Function) or item.get_closest_marker("no_result_cache"):
+        return
+    key = cache.key_for(item)
+    item.stash[_ITEM_KEY] = key
+    entry = cache.lookup(key)
+    if entry is not None:
+        cache.hits.append((item.nodeid, float(entry.get("duration", 0.0))))
+        age = time.time() - entry["passed_at"]
+        pytest.skip(f"[cached] passed {age:.0f}s ago with identical inputs ({entry['duration']:.2f}s saved)")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo[None]):
+    """Cache passes of the call phase."""
+    outcome = yield
+    report: pytest.TestReport = outcome.get_result()
+    cache = item.config.stash[_CACHE_KEY]
+    key = item.stash.get(_ITEM_KEY, None)
+    if cache is None or key is None or report.when != "call":
+        return
+    if report.passed and not hasattr(report, "wasxfail"):
+        cache.store(key, item.nodeid, report.duration)
+
+
+def pytest_sessionfinish(session: pytest.Session, exitstatus: int) -> None:
+    """Persist new passes."""
+    cache = session.config.stash.get(_CACHE_KEY, None)
+    if cache is not None and cache.stored:
+        cache.save()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config) -> None:
+    """Report cached outcomes (or why caching was off)."""
+    if not config.getoption("result_cache"):
+        return
+    reason = config.stash.get(_REASON_KEY, None)
+    cache = config.stash.get(_CACHE_KEY, None)
+    terminalreporter.write_sep("-", "result cache")
+    if cache is None:
+        terminalreporter.write_line(f"disabled for this run: {reason or 'not initialised'}")
+        return
+    saved = sum(duration for _, duration in cache.hits)
+    terminalreporter.write_line(
+        f"{len(cache.hits)} test(s) reused cached passes (~{saved:.1f}s saved); {cache.stored} new pass(es) cached"
+    )
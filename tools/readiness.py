@@ -0,0 +1,244 @@
+"""Concurrent readiness orchestration for the compose stack.
+
+`make wait-db`, `wait-api` and `wait-ui` poll one service after another with
+fixed 2s sleeps. This orchestrator polls all of them at the same time with
+exponential backoff (plus jitter), reports time-to-ready per service, and can
+start commands as soon as *their* dependencies are ready. For example, the API
+suite starts once DB and API answer, while the Angular dev server is still
+compiling.
+
+Probes
+------
+- db:  `mysqladmin ping` inside the DB container (same as `make wait-db`)
+- api: GET $API_HOST/products returns 200 with a JSON body (needs a working DB
+       connection, unlike the docs page)
+- ui:  GET $BASE_URL returns 200
+
+Usage
+-----
+    python -m tools.readiness --services db,api,ui
+    python -m tools.readiness --services db,api,ui \\
+        --then "db+api=make api-smoke" --then "ui=make ui-smoke"
+
+The time-to-ready report is written to $ARTIFACTS/readiness.json.
+
+Environment variables
+---------------------
+- DC / DB_SERVICE:  compose command and DB service (defaults as in the Makefile)
+- API_HOST / BASE_URL
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+from tools.artifacts import artifacts_root, env, write_json
+
+INITIAL_DELAY_SECONDS = 0.25
+BACKOFF_FACTOR = 1.6
+MAX_DELAY_SECONDS = 5.0
+PROBE_TIMEOUT_SECONDS = 5.0
+DEFAULT_TIMEOUT_SECONDS = 360.0
+
+
+# -----------------------------------------------------------------------------
+# Probes
+# -----------------------------------------------------------------------------
+def http_probe(url: str, expect_json: bool = False) -> Callable[[], Optional[str]]:
+    """Probe returning None when `url` answers 200 (and JSON if requested), else a reason."""
+
+    def probe() -> Optional[str]:
+        req = urllib.request.Request(url, headers={"accept": "application/json" if expect_json else "*/*"})
+        try:
+            with urllib.request.urlopen(req, timeout=PROBE_TIMEOUT_SECONDS) as resp:
+                body = resp.read()
+                if resp.status != 200:
+                    return f"status {resp.status}"
+                if expect_json:
+                    json.loads(body)
+                return None
+        except urllib.error.HTTPError as exc:
+            return f"status {exc.code}"
+        except (urllib.error.URLError, OSError) as exc:
+            return str(getattr(exc, "reason", exc))
+        except ValueError:
+            return "response is not JSON"
+
+    return probe
+
+
+def command_probe(argv: list[str]) -> Callable[[], Optional[str]]:
+    """Probe returning None when the command exits 0."""
+
+    def probe() -> Optional[str]:
+        try:
+            res = subprocess.run(argv, capture_output=True, timeout=PROBE_TIMEOUT_SECONDS * 2)
+        except subprocess.TimeoutExpired:
+            return "probe command timed out"
+        except OSError as exc:
+            return str(exc)
+        return None if res.returncode == 0 else f"exit {res.returncode}"
+
+    return probe
+
+
+def default_probes() -> dict[str, Callable[[], Optional[str]]]:
+    """Probes for the compose stack, configured like the Makefile."""
+    dc = shlex.split(env("DC", "docker compose"))
+    db_service = env("DB_SERVICE", "mariadb")
+    api_host = env("API_HOST", "http://localhost:8091").rstrip("/")
+    base_url = env("BASE_URL", "http://localhost:4200")
+    ping = 'mysqladmin ping -h 127.0.0.1 -uroot -p"$MYSQL_ROOT_PASSWORD" --silent'
+    return {
+        "db": command_probe([*dc, "exec", "-T", db_service, "sh", "-lc", ping]),
+        "api": http_probe(f"{api_host}/products", expect_json=True),
+        "ui": http_probe(base_url),
+    }
+
+
+# -----------------------------------------------------------------------------
+# Orchestration
+# -----------------------------------------------------------------------------
+def split_services(spec: str) -> list[str]:
+    """Split "db,api" or "db+api" into service names."""
+    return [n.strip() for n in re.split(r"[,+]", spec) if n.strip()]
+
+
+@dataclass
+class ServiceWait:
+    """Polling state of one service."""
+
+    name: str
+    probe: Callable[[], Optional[str]]
+    timeout: float
+    ready: threading.Event = field(default_factory=threading.Event)
+    done: threading.Event = field(default_factory=threading.Event)
+    seconds: Optional[float] = None
+    attempts: int = 0
+    last_error: Optional[str] = None
+
+    def run(self, started: float) -> None:
+        delay = INITIAL_DELAY_SECONDS
+        try:
+            while True:
+                self.attempts += 1
+                self.last_error = self.probe()
+                elapsed = time.monotonic() - started
+                if self.last_error is None:
+                    self.seconds = elapsed
+                    print(f"[ready] {self.name} after {elapsed:.1f}s ({self.attempts} probes)", flush=True)
+                    self.ready.set()
+                    return
+                if elapsed >= self.timeout:
+                    print(f"[fail]  {self.name} not ready after {elapsed:.1f}s: {self.last_error}", flush=True)
+                    return
+                time.sleep(min(delay, self.timeout - elapsed) * random.uniform(0.8, 1.2))
+                delay = min(delay * BACKOFF_FACTOR, MAX_DELAY_SECONDS)
+        finally:
+            self.done.set()
+
+
+@dataclass
+class Follower:
+    """A command started once all of `needs` are ready."""
+
+    needs: list[str]
+    command: str
+    returncode: Optional[int] = None
+    started_at: Optional[float] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "Follower":
+        needs, sep, command = spec.partition("=")
+        if not sep or not command.strip():
+            raise argparse.ArgumentTypeError(f"expected SERVICES=COMMAND, got {spec!r}")
+        return cls(split_services(needs), command.strip())
+
+    def run(self, waits: dict[str, ServiceWait], started: float) -> None:
+        for name in self.needs:
+            waits[name].done.wait()
+            if not waits[name].ready.is_set():
+                print(f"[skip]  {self.command!r}: {name} never became ready", flush=True)
+                self.returncode = 1
+                return
+        self.started_at = time.monotonic() - started
+        print(f"[start] {self.command!r} at {self.started_at:.1f}s ({'+'.join(self.needs)} ready)", flush=True)
+        self.returncode = subprocess.call(self.command, shell=True)
+
+
+def orchestrate(
+    probes: dict[str, Callable[[], Optional[str]]],
+    services: list[str],
+    followers: list[Follower],
+    timeout: float = DEFAULT_TIMEOUT_SECONDS,
+) -> tuple[dict[str, ServiceWait], list[Follower]]:
+    """Wait for `services` concurrently and run `followers` as their dependencies get ready."""
+    unknown = sorted(({s for f in followers for s in f.needs} | set(services)) - set(probes))
+    if unknown:
+        raise ValueError(f"Unknown service(s): {', '.join(unknown)} (known: {', '.join(sorted(probes))})")
+    needed = list(dict.fromkeys([*services, *[s for f in followers for s in f.needs]]))
+    waits = {name: ServiceWait(name, probes[name], timeout) for name in needed}
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=w.run, args=(started,), daemon=True) for w in waits.values()]
+    threads += [threading.Thread(target=f.run, args=(waits, started), daemon=True) for f in followers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return waits, followers
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.readiness", description=__doc__.split("\n")[0])
+    parser.add_argument("--services", default="db,api,ui", help='services to wait for, "db,api,ui" or "db+api+ui"')
+    parser.add_argument(
+        "--then", dest="followers", action="append", type=Follower.parse, default=[],
+        help='"svc1+svc2=COMMAND": run COMMAND once those services are ready (repeatable)',
+    )
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS, help="per-service timeout (s)")
+    parser.add_argument("--report", type=Path, default=None, help="default: $ARTIFACTS/readiness.json")
+    args = parser.parse_args(argv)
+
+    services = split_services(args.services)
+    waits, followers = orchestrate(default_probes(), services, args.followers, args.timeout)
+
+    report = {
+        "services": {
+            w.name: {"ready": w.ready.is_set(), "seconds": w.seconds, "attempts": w.attempts, "last_error": w.last_error}
+            for w in waits.values()
+        },
+        "commands": [
+            {"command": f.command, "needs": f.needs, "started_at": f.started_at, "returncode": f.returncode}
+            for f in followers
+        ],
+    }
+    write_json(args.report or artifacts_root() / "readiness.json", report)
+    for w in waits.values():
+        status = f"{w.seconds:.1f}s" if w.seconds is not None else f"NOT READY ({w.last_error})"
+        print(f"time-to-ready {w.name:<4} {status}")
+
+    if not all(w.ready.is_set() for w in waits.values()):
+        dc = env("DC", "")
+        if dc:
+            subprocess.call([*shlex.split(dc), "logs", "--no-color", "--tail=350"])
+        return 1
+    return max((f.returncode or 0 for f in followers), default=0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""Attribute request latency to gateway (nginx) vs. backend (PHP-FPM) per endpoint.
+
+Every request from the `http` fixture (tests/api/conftest.py) and the k6
+scripts (load/k6/*.js) carries a unique `X-Request-ID`. nginx logs that ID
+together with its own timings in the `timing` JSON log format
+(docker/nginx/timing.conf). This tool joins the client-side samples with the
+nginx log by request ID and splits each request's latency into
+
+    backend   $upstream_response_time   PHP-FPM connect + processing + response
+    gateway   $request_time - backend   nginx itself (buffering, routing, writing)
+    network   client - $request_time    outside nginx (sockets, network, client)
+
+Per endpoint it reports p50/p95/p99 and the mean share of each component.
+
+Client samples are read from either
+- a k6 run directory / `--out json` NDJSON (http_req_duration points whose
+  metadata carries `request_id`), or
+- the JSONL written by the API tests when API_CLIENT_TIMINGS is set.
+
+Client samples are held in memory (one small entry per request); the nginx log
+is streamed, so it can come straight from `docker compose logs`:
+
+    docker compose -p toolshop-e2e -f docker/docker-compose.yml logs --no-color --no-log-prefix web \\
+      | python -m tools.request_timing artifacts/k6/soak/run-004 --nginx-log -
+
+The report is written to `<run>/request_timing.json` (next to the client file
+when a file is given).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Iterable, Optional
+
+from tools.artifacts import write_json
+from tools.k6_summary import ALL_ENDPOINTS, LogHistogram, find_input, open_ndjson
+
+FORMAT = "toolshop.request-timing/v1"
+DEFAULT_OUTPUT_NAME = "request_timing.json"
+CLIENT_TIMINGS_NAME = "client_timings.jsonl"
+
+COMPONENTS = ("client", "nginx", "backend", "gateway", "network")
+PERCENTILES = (50, 95, 99)
+
+# nginx separates upstream attempts with ", " and internal redirects with " : ".
+_UPSTREAM_SPLIT = re.compile(r"\s*[,:]\s*")
+
+
+def _seconds(value: Any) -> Optional[float]:
+    """Parse an nginx time field ("0.012", "-", "0.010, 0.004") into seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    total, seen = 0.0, False
+    for part in _UPSTREAM_SPLIT.split(value.strip()):
+        try:
+            total += float(part)
+            seen = True
+        except ValueError:
+            continue
+    return total if seen else None
+
+
+# -----------------------------------------------------------------------------
+# Inputs
+# -----------------------------------------------------------------------------
+def read_client_samples(lines: Iterable[str]) -> dict[str, tuple[str, float]]:
+    """Return {request_id: (endpoint, client ms)} from k6 NDJSON or API-test JSONL."""
+    samples: dict[str, tuple[str, float]] = {}
+    for line in lines:
+        if '"request_id"' not in line:
+            continue
+        if '"Point"' in line and '"http_req_duration"' not in line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if obj.get("type") == "Point":
+            data = obj.get("data") or {}
+            rid = (data.get("metadata") or {}).get("request_id")
+            value = data.get("value")
+            endpoint = (data.get("tags") or {}).get("name") or "untagged"
+            ms = float(value) if isinstance(value, (int, float)) else None
+        else:
+            rid = obj.get("request_id")
+            seconds = obj.get("seconds")
+            endpoint = obj.get("endpoint") or "untagged"
+            ms = float(seconds) * 1000.0 if isinstance(seconds, (int, float)) else None
+        if isinstance(rid, str) and rid and ms is not None:
+            samples[rid] = (str(endpoint), ms)
+    return samples
+
+
+def parse_nginx_line(line: str) -> Optional[dict[str, Any]]:
+    """Parse one `timing` log line (tolerates `docker compose logs` prefixes)."""
+    start = line.find("{")
+    if start < 0 or '"request_time"' not in line:
+        return None
+    try:
+        obj = json.loads(line[start:])
+    except json.JSONDecodeError:
+        return None
+    return obj if isinstance(obj, dict) and obj.get("request_id") else None
+
+
+def resolve_client_file(path: Path) -> Optional[Path]:
+    """Resolve a run directory to its k6 NDJSON or API-test client timings."""
+    if path.is_file():
+        return path
+    if (path / CLIENT_TIMINGS_NAME).is_file():
+        return path / CLIENT_TIMINGS_NAME
+    return find_input(path)
+
+
+# -----------------------------------------------------------------------------
+# Join + aggregation
+# -----------------------------------------------------------------------------
+@dataclass
+class Breakdown:
+    """Latency components of one endpoint (histograms in microseconds)."""
+
+    precision: float
+    histograms: dict[str, LogHistogram] = field(default_factory=dict)
+    static: int = 0
+
+    def add(self, component: str, ms: float) -> None:
+        """Record one component value (ms)."""
+        h = self.histograms.get(component)
+        if h is None:
+            h = self.histograms[component] = LogHistogram(self.precision)
+        h.add(max(ms, 0.0) * 1000.0)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Percentiles (ms) and mean share of the client latency per component."""
+        client_mean = self.histograms["client"].mean if "client" in self.histograms else 0.0
+        out: dict[str, Any] = {"count": self.histograms["client"].count if "client" in self.histograms else 0}
+        if self.static:
+            out["without_upstream"] = self.static
+        for name in COMPONENTS:
+            h = self.histograms.get(name)
+            if h is None or not h.count:
+                continue
+            stats = {f"p{p}": round(h.quantile(p / 100.0) / 1000.0, 3) for p in PERCENTILES}
+            stats["mean"] = round(h.mean / 1000.0, 3)
+            if name in ("backend", "gateway", "network") and client_mean:
+                stats["share"] = round(h.mean / client_mean, 3)
+            out[name] = stats
+        return out
+
+
+class TimingJoin:
+    """Join client samples with streamed nginx entries by request ID."""
+
+    def __init__(self, clients: dict[str, tuple[str, float]], precision: float = 0.01) -> None:
+        self.clients = clients
+        self.precision = precision
+        self.endpoints: dict[str, Breakdown] = {}
+        self.matched = 0
+        self.server_only = 0
+        self.server_lines = 0
+
+    def _breakdown(self, endpoint: str) -> Breakdown:
+        b = self.endpoints.get(endpoint)
+        if b is None:
+            b = self.endpoints[endpoint] = Breakdown(self.precision)
+        return b
+
+    def add_server(self, entry: dict[str, Any]) -> None:
+        """Attribute one nginx entry to its client sample (if it has one)."""
+        self.server_lines += 1
+        client = self.clients.pop(str(entry.get("request_id")), None)
+        request_time = _seconds(entry.get("request_time"))
+        if client is None or request_time is None:
+            self.server_only += 1
+            return
+        self.matched += 1
+        endpoint, client_ms = client
+        nginx_ms = request_time * 1000.0
+        upstream = _seconds(entry.get("upstream_response_time"))
+        for b in (self._breakdown(endpoint), self._breakdown(ALL_ENDPOINTS)):
+            b.add("client", client_ms)
+            b.add("nginx", nginx_ms)
+            b.add("network", client_ms - nginx_ms)
+            if upstream is None:
+                b.static += 1
+                continue
+            b.add("backend", upstream * 1000.0)
+            b.add("gateway", nginx_ms - upstream * 1000.0)
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Consume nginx log lines (non-`timing` lines are ignored)."""
+        for line in lines:
+            entry = parse_nginx_line(line)
+            if entry is not None:
+                self.add_server(entry)
+
+    def report(self, source: str) -> dict[str, Any]:
+        """Return the request-timing document."""
+        return {
+            "format": FORMAT,
+            "source": source,
+            "matched": self.matched,
+            "client_only": len(self.clients),
+            "server_only": self.server_only,
+            "endpoints": {k: b.to_dict() for k, b in sorted(self.endpoints.items())},
+        }
+
+
+def _fmt(stats: Optional[dict[str, Any]], key: str) -> str:
+    return f"{stats[key]:.1f}" if stats and key in stats else "-"
+
+
+def print_report(report: dict[str, Any], out: IO[str] = sys.stdout) -> None:
+    """Print a per-endpoint table (ms; share = mean fraction of client latency)."""
+    print(
+        f"matched {report['matched']} request(s); "
+        f"{report['client_only']} without nginx entry, {report['server_only']} nginx-only",
+        file=out,
+    )
+    header = f"{'endpoint':<32} {'n':>6}  {'client p95':>10}  {'backend p50/p95':>15}  {'gateway p50/p95':>15}  {'network p95':>11}  {'backend share':>13}"
+    print(header, file=out)
+    rows = sorted(report["endpoints"].items(), key=lambda kv: (kv[0] != ALL_ENDPOINTS, -kv[1]["count"]))
+    for endpoint, b in rows:
+        backend, gateway = b.get("backend"), b.get("gateway")
+        share = f"{backend['share'] * 100:.0f}%" if backend and "share" in backend else "-"
+        print(
+            f"{endpoint[:32]:<32} {b['count']:>6}  {_fmt(b.get('client'), 'p95'):>10}  "
+            f"{_fmt(backend, 'p50') + '/' + _fmt(backend, 'p95'):>15}  "
+            f"{_fmt(gateway, 'p50') + '/' + _fmt(gateway, 'p95'):>15}  "
+            f"{_fmt(b.get('network'), 'p95'):>11}  {share:>13}",
+            file=out,
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.request_timing",
+        description="Join client and nginx timings by X-Request-ID and attribute latency per endpoint.",
+    )
+    parser.add_argument("client", type=Path, help="k6 run directory / NDJSON, or API-test client_timings.jsonl")
+    parser.add_argument("--nginx-log", required=True, help="nginx `timing` log file, or - for stdin")
+    parser.add_argument("--output", type=Path, default=None, help=f"default: <run>/{DEFAULT_OUTPUT_NAME}")
+    args = parser.parse_args(argv)
+
+    client_file = resolve_client_file(args.client)
+    if client_file is None:
+        print(f"No client samples found in {args.client}", file=sys.stderr)
+        return 2
+    with open_ndjson(client_file) as fh:
+        clients = read_client_samples(fh)
+    if not clients:
+        print(f"No request IDs in {client_file} (k6 older than v0.45, or IDs not enabled)", file=sys.stderr)
+        return 2
+
+    join = TimingJoin(clients)
+    if args.nginx_log == "-":
+        join.feed(sys.stdin)
+    else:
+        with open_ndjson(Path(args.nginx_log)) as fh:
+            join.feed(fh)
+
+    report = join.report(str(client_file))
+    output = args.output or (args.client if args.client.is_dir() else client_file.parent) / DEFAULT_OUTPUT_NAME
+    write_json(output, report)
+    print_report(report)
+    print(f"Wrote {output}")
+    return 0 if join.matched else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
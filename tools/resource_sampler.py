@@ -0,0 +1,469 @@
+"""Per-container resource telemetry during load runs, with growth detection.
+
+k6 only reports the client side, so a slow memory leak in PHP-FPM or growing
+MariaDB connections during a 30 minute soak goes unnoticed. This sampler wraps
+a load command (or runs until interrupted) and every `--interval` seconds
+records, for each container of the compose project:
+
+- cpu_pct, mem_mb (RSS + page cache as reported by `docker stats`), pids,
+- rss_mb (anonymous memory from the container's cgroup memory.stat),
+- block_read_mb / block_write_mb and net_rx_mb / net_tx_mb (cumulative),
+- tcp_established / tcp_time_wait (from /proc/net/tcp* inside the container).
+
+Samples go to `<run>/resources.jsonl` next to the k6 artifacts. At the end they
+are summarised into `<run>/resources_summary.json` (peak / mean per service).
+Runs of at least `--min-trend-seconds` (default 10 min, i.e. soak runs) also get
+a trend check per service and metric. A series is flagged as growing when it is
+monotonic (Mann-Kendall p < 0.01, tau >= 0.5) and its Theil-Sen slope projects
+a material increase over the run. The first 10% of samples are warm-up and are
+ignored.
+
+`docker stats` is used rather than host cgroup files so that it also works with
+Docker Desktop, where the cgroup hierarchy is inside a VM. Memory growth is
+checked on rss_mb, not mem_mb: MariaDB reads fill the page cache, which grows
+steadily during a soak without being a leak. memory.stat is read through
+`docker exec` (the container's own cgroup), so it works there as well.
+
+If docker (or the compose project) cannot be reached when `record` starts, the
+command still runs, without sampling, and a warning is printed.
+
+`make k6-soak` samples by default; other k6 targets need K6_RESOURCES=true.
+Python load runs (or anything else) are wrapped through the generic
+`record <run> -- <cmd>` form; there is no Make target for them.
+
+Usage
+-----
+    python -m tools.resource_sampler record artifacts/k6/soak/run-004 -- k6 run load/k6/soak.js
+    python -m tools.resource_sampler record artifacts/k6/soak/run-004      # until Ctrl-C
+    python -m tools.resource_sampler analyze artifacts/k6/soak/run-004
+
+Environment variables
+---------------------
+- COMPOSE_PROJECT_NAME: project whose containers are sampled (default toolshop-e2e)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from tools.artifacts import env, write_json
+
+SAMPLES_NAME = "resources.jsonl"
+SUMMARY_NAME = "resources_summary.json"
+
+METRICS = (
+    "cpu_pct",
+    "mem_mb",
+    "rss_mb",
+    "pids",
+    "block_read_mb",
+    "block_write_mb",
+    "net_rx_mb",
+    "net_tx_mb",
+    "tcp_established",
+    "tcp_time_wait",
+)
+
+# Metrics checked for monotonic growth, with the minimum projected growth over
+# the run that counts as material (absolute floor; 10% of the start level also
+# has to be exceeded). Memory is judged on rss_mb: mem_mb includes page cache.
+GROWTH_METRICS = {"rss_mb": 20.0, "pids": 5.0, "tcp_established": 20.0, "tcp_time_wait": 50.0}
+GROWTH_RELATIVE = 0.10
+TREND_P_VALUE = 0.01
+TREND_MIN_TAU = 0.5
+WARMUP_FRACTION = 0.10
+MAX_TREND_POINTS = 400
+
+_SIZE = re.compile(r"^\s*([\d.]+)\s*([a-zA-Z]*)\s*$")
+_UNITS = {
+    "": 1,
+    "b": 1,
+    "kb": 1e3,
+    "mb": 1e6,
+    "gb": 1e9,
+    "tb": 1e12,
+    "kib": 2**10,
+    "mib": 2**20,
+    "gib": 2**30,
+    "tib": 2**40,
+}
+
+# /proc/net/tcp "st" column.
+_TCP_ESTABLISHED = "01"
+_TCP_TIME_WAIT = "06"
+
+# memory.stat of the container's cgroup: v2 first, then v1 ("total_rss" for the
+# whole hierarchy, "rss" otherwise).
+_MEMORY_STAT_FILES = ("/sys/fs/cgroup/memory.stat", "/sys/fs/cgroup/memory/memory.stat")
+_RSS_KEYS = ("anon", "total_rss", "rss")
+
+
+def parse_size(text: str) -> Optional[float]:
+    """Parse a docker stats size ("1.5MiB", "12kB", "0B") into bytes."""
+    m = _SIZE.match(text or "")
+    if not m:
+        return None
+    factor = _UNITS.get(m.group(2).lower())
+    return float(m.group(1)) * factor if factor is not None else None
+
+
+def _pair_mb(text: str) -> tuple[Optional[float], Optional[float]]:
+    left, _, right = (text or "").partition("/")
+    a, b = parse_size(left), parse_size(right)
+    return (a / 1e6 if a is not None else None, b / 1e6 if b is not None else None)
+
+
+# -----------------------------------------------------------------------------
+# Sampling
+# -----------------------------------------------------------------------------
+def project_containers(project: str) -> dict[str, str]:
+    """Return {container id: compose service} for running containers of `project`."""
+    out = subprocess.run(
+        [
+            "docker",
+            "ps",
+            "--filter",
+            f"label=com.docker.compose.project={project}",
+            "--format",
+            '{{.ID}} {{.Label "com.docker.compose.service"}}',
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return dict(line.split(" ", 1) for line in out.splitlines() if " " in line)
+
+
+def tcp_states(container: str) -> Optional[dict[str, int]]:
+    """Count ESTABLISHED / TIME_WAIT sockets in the container's network namespace."""
+    proc = subprocess.run(
+        ["docker", "exec", container, "cat", "/proc/net/tcp", "/proc/net/tcp6"],
+        capture_output=True,
+        text=True,
+        timeout=10,
+    )
+    if proc.returncode != 0 and not proc.stdout:
+        return None
+    counts = {"tcp_established": 0, "tcp_time_wait": 0}
+    for line in proc.stdout.splitlines():
+        cols = line.split()
+        if len(cols) < 4 or cols[0] == "sl":
+            continue
+        if cols[3] == _TCP_ESTABLISHED:
+            counts["tcp_established"] += 1
+        elif cols[3] == _TCP_TIME_WAIT:
+            counts["tcp_time_wait"] += 1
+    return counts
+
+
+def rss_mb(container: str) -> Optional[float]:
+    """Anonymous (RSS) memory of the container in MB, None if memory.stat is unreadable."""
+    proc = subprocess.run(
+        ["docker", "exec", container, "cat", *_MEMORY_STAT_FILES],
+        capture_output=True,
+        text=True,
+        timeout=10,
+    )
+    stats: dict[str, int] = {}
+    for line in proc.stdout.splitlines():
+        key, _, value = line.partition(" ")
+        if value.strip().isdigit():
+            stats.setdefault(key, int(value))
+    for key in _RSS_KEYS:
+        if key in stats:
+            return stats[key] / 1e6
+    return None
+
+
+def sample(containers: dict[str, str]) -> list[dict[str, Any]]:
+    """Take one sample of every container (docker stats, memory.stat, socket counts)."""
+    ts = time.time()
+    out = subprocess.run(
+        ["docker", "stats", "--no-stream", "--format", "{{json .}}", *containers],
+        capture_output=True,
+        text=True,
+        timeout=30,
+    ).stdout
+    rows: list[dict[str, Any]] = []
+    for line in out.splitlines():
+        try:
+            stats = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        cid = str(stats.get("ID", ""))[:12]
+        if cid not in containers:
+            continue
+        mem, _ = _pair_mb(stats.get("MemUsage", ""))
+        block_read, block_write = _pair_mb(stats.get("BlockIO", ""))
+        net_rx, net_tx = _pair_mb(stats.get("NetIO", ""))
+        row: dict[str, Any] = {
+            "ts": round(ts, 3),
+            "service": containers[cid],
+            "cpu_pct": float(str(stats.get("CPUPerc", "0")).rstrip("%") or 0),
+            "mem_mb": mem,
+            "pids": int(stats["PIDs"]) if str(stats.get("PIDs", "")).isdigit() else None,
+            "block_read_mb": block_read,
+            "block_write_mb": block_write,
+            "net_rx_mb": net_rx,
+            "net_tx_mb": net_tx,
+        }
+        try:
+            row["rss_mb"] = rss_mb(cid)
+        except subprocess.TimeoutExpired:
+            pass
+        try:
+            row.update(tcp_states(cid) or {})
+        except subprocess.TimeoutExpired:
+            pass
+        rows.append({k: (round(v, 3) if isinstance(v, float) else v) for k, v in row.items() if v is not None})
+    return rows
+
+
+def probe_docker(project: str) -> Optional[str]:
+    """Return why containers of `project` cannot be sampled, or None if they can."""
+    try:
+        containers = project_containers(project)
+    except (OSError, subprocess.SubprocessError) as exc:
+        detail = getattr(exc, "stderr", None) or exc
+        return f"docker not reachable ({str(detail).strip()})"
+    return None if containers else f"no running containers in compose project {project!r}"
+
+
+class Sampler:
+    """Background thread appending samples to a JSONL file."""
+
+    def __init__(self, path: Path, project: str, interval: float) -> None:
+        self.path = path
+        self.project = project
+        self.interval = interval
+        self.samples = 0
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the in-flight sample."""
+        self._stop.set()
+        self._thread.join(timeout=60)
+
+    def _run(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                try:
+                    # Re-resolved every round: containers may be recreated during a run.
+                    containers = project_containers(self.project)
+                    rows = sample(containers) if containers else []
+                except (OSError, subprocess.SubprocessError) as exc:
+                    self.error = f"{type(exc).__name__}: {exc}"
+                    rows = []
+                for row in rows:
+                    fh.write(json.dumps(row) + "\n")
+                fh.flush()
+                self.samples += len(rows)
+                self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+# -----------------------------------------------------------------------------
+# Analysis
+# -----------------------------------------------------------------------------
+def mann_kendall(values: list[float]) -> tuple[float, float]:
+    """Mann-Kendall trend test. Returns (tau, two-sided p-value) with tie correction."""
+    n = len(values)
+    if n < 3:
+        return 0.0, 1.0
+    s = 0
+    for i in range(n - 1):
+        vi = values[i]
+        for j in range(i + 1, n):
+            d = values[j] - vi
+            s += (d > 0) - (d < 0)
+    ties: dict[float, int] = {}
+    for v in values:
+        ties[v] = ties.get(v, 0) + 1
+    var_s = (n * (n - 1) * (2 * n + 5) - sum(t * (t - 1) * (2 * t + 5) for t in ties.values())) / 18.0
+    if var_s <= 0:
+        return 0.0, 1.0
+    z = (s - (s > 0) + (s < 0)) / math.sqrt(var_s)
+    tau = s / (n * (n - 1) / 2.0)
+    return tau, math.erfc(abs(z) / math.sqrt(2.0))
+
+
+def theil_sen(xs: list[float], ys: list[float]) -> float:
+    """Median of pairwise slopes (robust to outliers)."""
+    slopes = [
+        (ys[j] - ys[i]) / (xs[j] - xs[i]) for i in range(len(xs) - 1) for j in range(i + 1, len(xs)) if xs[j] != xs[i]
+    ]
+    return statistics.median(slopes) if slopes else 0.0
+
+
+def _thin(points: list[tuple[float, float]], limit: int) -> list[tuple[float, float]]:
+    step = math.ceil(len(points) / limit)
+    return points[::step] if step > 1 else points
+
+
+def growth(points: list[tuple[float, float]], metric: str) -> Optional[dict[str, Any]]:
+    """Trend of one (service, metric) series after warm-up; None if too short."""
+    points = points[int(len(points) * WARMUP_FRACTION) :]
+    if len(points) < 10:
+        return None
+    points = _thin(points, MAX_TREND_POINTS)
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    tau, p_value = mann_kendall(ys)
+    slope = theil_sen(xs, ys)
+    duration = xs[-1] - xs[0]
+    start = statistics.median(ys[: max(3, len(ys) // 10)])
+    projected = slope * duration
+    material = projected >= max(GROWTH_METRICS[metric], GROWTH_RELATIVE * abs(start))
+    return {
+        "tau": round(tau, 3),
+        "p_value": round(p_value, 6),
+        "slope_per_hour": round(slope * 3600, 3),
+        "start": round(start, 3),
+        "projected_growth": round(projected, 3),
+        "growing": bool(p_value < TREND_P_VALUE and tau >= TREND_MIN_TAU and material),
+    }
+
+
+def load_samples(path: Path) -> list[dict[str, Any]]:
+    """Read resources.jsonl (unparseable lines are skipped)."""
+    rows = []
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return rows
+
+
+def analyze(rows: list[dict[str, Any]], min_trend_seconds: float) -> dict[str, Any]:
+    """Per-service peak/mean and (for long enough runs) growth trends."""
+    by_service: dict[str, list[dict[str, Any]]] = {}
+    for row in sorted(rows, key=lambda r: r.get("ts", 0)):
+        by_service.setdefault(str(row.get("service")), []).append(row)
+    times = [r["ts"] for r in rows if "ts" in r]
+    duration = (max(times) - min(times)) if times else 0.0
+    services: dict[str, Any] = {}
+    flagged: list[str] = []
+    for service, series in sorted(by_service.items()):
+        entry: dict[str, Any] = {"samples": len(series)}
+        for metric in METRICS:
+            values = [float(r[metric]) for r in series if isinstance(r.get(metric), (int, float))]
+            if values:
+                entry[metric] = {"mean": round(statistics.fmean(values), 3), "max": round(max(values), 3), "last": values[-1]}
+        if duration >= min_trend_seconds:
+            for metric in GROWTH_METRICS:
+                points = [(float(r["ts"]), float(r[metric])) for r in series if isinstance(r.get(metric), (int, float))]
+                trend = growth(points, metric)
+                if trend is None:
+                    continue
+                entry.setdefault("trends", {})[metric] = trend
+                if trend["growing"]:
+                    flagged.append(f"{service}: {metric} +{trend['slope_per_hour']:g}/h ({trend['start']:g} -> +{trend['projected_growth']:g})")
+        services[service] = entry
+    return {
+        "duration_seconds": round(duration, 1),
+        "trend_checked": duration >= min_trend_seconds,
+        "services": services,
+        "growing": flagged,
+    }
+
+
+def write_summary(run_dir: Path, min_trend_seconds: float) -> Optional[dict[str, Any]]:
+    """Analyse `<run>/resources.jsonl` into `<run>/resources_summary.json` and print it."""
+    path = run_dir / SAMPLES_NAME
+    if not path.is_file():
+        print(f"No {SAMPLES_NAME} in {run_dir}")
+        return None
+    summary = analyze(load_samples(path), min_trend_seconds)
+    write_json(run_dir / SUMMARY_NAME, summary)
+    print(f"resources ({summary['duration_seconds']:.0f}s): {run_dir / SUMMARY_NAME}")
+    for service, entry in summary["services"].items():
+        cpu, mem, rss = entry.get("cpu_pct", {}), entry.get("mem_mb", {}), entry.get("rss_mb", {})
+        conns = entry.get("tcp_established", {})
+        print(
+            f"  {service:<14} cpu mean {cpu.get('mean', 0):6.1f}% max {cpu.get('max', 0):6.1f}%  "
+            f"mem max {mem.get('max', 0):8.1f}MB (rss {rss.get('max', '-')})  tcp est. max {conns.get('max', '-')}"
+        )
+    if not summary["trend_checked"]:
+        print(f"  (trend check needs >= {min_trend_seconds:.0f}s of samples)")
+    for line in summary["growing"]:
+        print(f"  WARNING: monotonic growth: {line}")
+    return summary
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.resource_sampler", description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_record = sub.add_parser("record", help="sample while COMMAND runs (or until interrupted), then analyse")
+    p_record.add_argument("run_dir", type=Path)
+    p_record.add_argument("--interval", type=float, default=5.0, help="seconds between samples")
+    p_record.add_argument("--project", default=env("COMPOSE_PROJECT_NAME", "toolshop-e2e"))
+    p_record.add_argument("--min-trend-seconds", type=float, default=600.0)
+    p_record.add_argument("--fail-on-growth", action="store_true", help="exit 3 when growth is flagged (command succeeded)")
+
+    p_analyze = sub.add_parser("analyze", help="summarise an existing resources.jsonl")
+    p_analyze.add_argument("run_dir", type=Path)
+    p_analyze.add_argument("--min-trend-seconds", type=float, default=600.0)
+    p_analyze.add_argument("--fail-on-growth", action="store_true", help="exit 3 when growth is flagged")
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Everything after "--" is the wrapped command (argparse would mix it with options).
+    split = argv.index("--") if "--" in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    cmd = argv[split + 1 :]
+
+    rc = 0
+    if args.command == "record":
+        problem = probe_docker(args.project)
+        if problem is not None:
+            print(f"WARN: resource sampling skipped: {problem}", file=sys.stderr)
+            return subprocess.call(cmd) if cmd else 0
+        sampler = Sampler(args.run_dir / SAMPLES_NAME, args.project, args.interval)
+        sampler.start()
+        try:
+            if cmd:
+                proc = subprocess.Popen(cmd)
+                while True:
+                    try:
+                        rc = proc.wait()
+                        break
+                    except KeyboardInterrupt:
+                        continue  # the command got the SIGINT too; let it finish its summary
+            else:
+                signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+                threading.Event().wait()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            sampler.stop()
+        if sampler.error and not sampler.samples:
+            print(f"WARN: no resource samples ({sampler.error})", file=sys.stderr)
+            return rc
+
+    summary = write_summary(args.run_dir, args.min_trend_seconds)
+    if rc == 0 and args.fail_on_growth and summary and summary["growing"]:
+        return 3
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
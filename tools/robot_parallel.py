@@ -0,0 +1,316 @@
+"""Sharded parallel Robot Framework UI execution.
+
+`make ui-smoke` / `make ui-regression` run `robot` serially over every `.robot`
+file and each suite launches a fresh Chromium. This runner:
+
+- selects the suites that contain tests with the requested tag,
+- shards them over N workers by historical duration (longest-first greedy),
+- runs one `robot` process per worker with `REUSE_BROWSER=true`, so
+  `Open Toolshop` keeps one warm browser per worker and only opens a fresh
+  `New Context` per suite (see tests/ui/resources/keywords/common.robot),
+- merges the worker `output.xml` files with `rebot` into the usual
+  `artifacts/ui/<suite>/run-XXX/` layout (output.xml, log.html, report.html),
+- updates the per-suite duration history used for the next sharding,
+- aggregates the workers' frontend metrics into `run-XXX/frontend_metrics.json`
+  and analyzes their HAR files (RECORD_HAR=true) into `run-XXX/har_report.json`.
+
+Usage
+-----
+    python -m tools.robot_parallel --include smoke --workers 4 --artifacts artifacts/ui/smoke
+
+Environment variables
+---------------------
+- BASE_URL / HEADLESS: forwarded to every worker (same as the Makefile).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Optional
+
+from tools.artifacts import next_run_dir, write_json
+from tools.frontend_metrics import write_summary as write_frontend_summary
+from tools.har_analyzer import REPORT_NAME as HAR_REPORT_NAME
+from tools.har_analyzer import build_report as build_har_report
+from tools.har_analyzer import find_hars
+
+DEFAULT_SUITE_SECONDS = 30.0
+DURATIONS_FILE = "suite_durations.json"
+
+# Weight of the newest observation in the duration history (EWMA).
+DURATION_SMOOTHING = 0.5
+
+_SECTION = re.compile(r"^\*{3}\s*(?P<name>[A-Za-z ]+?)\s*\*{3}", re.IGNORECASE)
+_SETTING_TAGS = re.compile(r"^(Test Tags|Force Tags|Default Tags)\s{2,}(?P<tags>.+)$", re.IGNORECASE)
+_TEST_TAGS = re.compile(r"^\s+\[Tags\]\s{2,}(?P<tags>.+)$", re.IGNORECASE)
+
+
+# -----------------------------------------------------------------------------
+# Suite discovery
+# -----------------------------------------------------------------------------
+def suite_tags(path: Path) -> set[str]:
+    """Return all tags used by tests in a .robot file (cheap text scan).
+
+    Args:
+        path: Robot suite file.
+
+    Returns:
+        Lower-cased tags from `[Tags]` and suite-level tag settings.
+    """
+    tags: set[str] = set()
+    section = ""
+    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        m = _SECTION.match(line)
+        if m:
+            section = m.group("name").strip().lower()
+            continue
+        if section == "settings":
+            sm = _SETTING_TAGS.match(line)
+            if sm:
+                tags.update(t.strip().lower() for t in re.split(r"\s{2,}|\t", sm.group("tags")) if t.strip())
+        elif section in ("test cases", "tasks"):
+            tm = _TEST_TAGS.match(line)
+            if tm:
+                tags.update(t.strip().lower() for t in re.split(r"\s{2,}|\t", tm.group("tags")) if t.strip())
+    return tags
+
+
+def discover_suites(root: Path, include: Optional[str]) -> list[Path]:
+    """List suite files under `root` containing tests tagged `include`.
+
+    `resources/` is skipped (keyword files, no tests).
+    """
+    suites: list[Path] = []
+    for path in sorted(root.rglob("*.robot")):
+        if "resources" in path.relative_to(root).parts:
+            continue
+        if include and include.lower() not in suite_tags(path):
+            continue
+        suites.append(path)
+    return suites
+
+
+# -----------------------------------------------------------------------------
+# Duration history + sharding
+# -----------------------------------------------------------------------------
+def _elapsed_seconds(status: ET.Element) -> Optional[float]:
+    """Read a suite duration from a Robot <status> element (RF 7 and RF 6 formats)."""
+    elapsed = status.attrib.get("elapsed")
+    if elapsed is not None:
+        try:
+            return float(elapsed)
+        except ValueError:
+            return None
+    start, end = status.attrib.get("starttime"), status.attrib.get("endtime")
+    if not start or not end or "N/A" in (start, end):
+        return None
+    fmt = "%Y%m%d %H:%M:%S.%f"
+    try:
+        return (datetime.strptime(end, fmt) - datetime.strptime(start, fmt)).total_seconds()
+    except ValueError:
+        return None
+
+
+def suite_durations_from_output(output_xml: Path) -> dict[str, float]:
+    """Return {suite source path: seconds} for file-level suites in an output.xml."""
+    out: dict[str, float] = {}
+    for suite in ET.parse(output_xml).getroot().iter("suite"):
+        source = suite.attrib.get("source", "")
+        if not source.endswith(".robot"):
+            continue
+        status = suite.find("status")
+        secs = _elapsed_seconds(status) if status is not None else None
+        if secs is not None:
+            out[str(Path(source).resolve())] = secs
+    return out
+
+
+def load_history(path: Path) -> dict[str, float]:
+    """Load the per-suite duration history (missing file -> empty)."""
+    if not path.is_file():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {k: float(v) for k, v in data.items() if isinstance(v, (int, float))}
+
+
+def update_history(path: Path, observed: dict[str, float]) -> dict[str, float]:
+    """Blend newly observed durations into the history file (EWMA)."""
+    history = load_history(path)
+    for suite, secs in observed.items():
+        prev = history.get(suite)
+        history[suite] = secs if prev is None else DURATION_SMOOTHING * secs + (1 - DURATION_SMOOTHING) * prev
+    write_json(path, history)
+    return history
+
+
+def shard(suites: list[Path], workers: int, history: dict[str, float]) -> list[list[Path]]:
+    """Assign suites to workers, balancing estimated duration.
+
+    Longest-processing-time-first greedy: sort by estimated duration (unknown
+    suites use the median of known ones) and always give the next suite to the
+    least-loaded worker.
+
+    Args:
+        suites: Suite files.
+        workers: Number of shards.
+        history: {resolved suite path: seconds}.
+
+    Returns:
+        Non-empty shards (at most `workers`).
+    """
+    known = [history[str(s.resolve())] for s in suites if str(s.resolve()) in history]
+    default = statistics.median(known) if known else DEFAULT_SUITE_SECONDS
+
+    def estimate(s: Path) -> float:
+        return history.get(str(s.resolve()), default)
+
+    shards: list[list[Path]] = [[] for _ in range(max(1, workers))]
+    loads = [0.0] * len(shards)
+    for suite in sorted(suites, key=estimate, reverse=True):
+        idx = loads.index(min(loads))
+        shards[idx].append(suite)
+        loads[idx] += estimate(suite)
+    return [s for s in shards if s]
+
+
+# -----------------------------------------------------------------------------
+# Execution
+# -----------------------------------------------------------------------------
+def run_workers(
+    shards: list[list[Path]],
+    out_dir: Path,
+    include: Optional[str],
+    extra_args: list[str],
+) -> list[int]:
+    """Run one robot process per shard concurrently.
+
+    Returns:
+        Robot return codes per worker.
+    """
+    env = dict(os.environ)
+    env["REUSE_BROWSER"] = "true"
+    procs: list[tuple[subprocess.Popen[bytes], IO[bytes]]] = []
+    for idx, suites in enumerate(shards, start=1):
+        wdir = out_dir / "workers" / f"worker-{idx:02d}"
+        wdir.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            "robot",
+            "--outputdir", str(wdir),
+            "--output", "output.xml",
+            "--log", "NONE",
+            "--report", "NONE",
+            "--name", f"Worker {idx:02d}",
+            *(["--include", include] if include else []),
+            *extra_args,
+            *[str(s) for s in suites],
+        ]
+        log = (wdir / "console.log").open("wb")
+        print(f"worker-{idx:02d}: {len(suites)} suite(s)")
+        procs.append((subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, env=env), log))
+
+    codes: list[int] = []
+    for proc, log in procs:
+        codes.append(proc.wait())
+        log.close()
+    return codes
+
+
+def broken_workers(codes: list[int], out_dir: Path) -> dict[str, int]:
+    """Workers whose results are missing from the merge: {worker: return code}.
+
+    Robot uses 250+ for errors other than failed tests (invalid data, interrupt,
+    internal error); a negative code means the process was killed by a signal.
+    """
+    broken: dict[str, int] = {}
+    for idx, code in enumerate(codes, start=1):
+        name = f"worker-{idx:02d}"
+        if code >= 250 or code < 0 or not (out_dir / "workers" / name / "output.xml").is_file():
+            broken[name] = code
+    return broken
+
+
+def merge_outputs(out_dir: Path, name: str) -> int:
+    """Combine worker outputs into out_dir/output.xml, log.html, report.html.
+
+    Returns:
+        rebot return code (number of failed tests, capped by Robot).
+    """
+    outputs = sorted((out_dir / "workers").glob("worker-*/output.xml"))
+    if not outputs:
+        print("No worker output.xml produced.")
+        return 252
+    cmd = [
+        "rebot",
+        "--outputdir", str(out_dir),
+        "--output", "output.xml",
+        "--name", name,
+        *[str(p) for p in outputs],
+    ]
+    return subprocess.call(cmd)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.robot_parallel", description=__doc__.split("\n")[0])
+    parser.add_argument("--root", type=Path, default=Path("tests/ui"), help="UI test root")
+    parser.add_argument("--include", default=None, help="tag to include (smoke/regression)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--artifacts", type=Path, required=True, help="e.g. artifacts/ui/smoke")
+    parser.add_argument("--history", type=Path, default=None, help=f"default: <artifacts>/../{DURATIONS_FILE}")
+    parser.add_argument("robot_args", nargs=argparse.REMAINDER, help="extra args passed to robot after --")
+    args = parser.parse_args(argv)
+
+    for cmd in ("robot", "rebot"):
+        if shutil.which(cmd) is None:
+            print(f"Missing command: {cmd}")
+            return 127
+
+    suites = discover_suites(args.root, args.include)
+    if not suites:
+        print(f"No suites under {args.root} with tag {args.include!r}.")
+        return 252
+
+    history_path = args.history or args.artifacts.parent / DURATIONS_FILE
+    shards = shard(suites, args.workers, load_history(history_path))
+
+    out_dir = next_run_dir(args.artifacts)
+    print(f"UI parallel artifacts: {out_dir} ({len(suites)} suites, {len(shards)} workers)")
+    write_json(out_dir / "shards.json", {f"worker-{i:02d}": [str(s) for s in sh] for i, sh in enumerate(shards, 1)})
+
+    extra = [a for a in args.robot_args if a != "--"]
+    started = time.monotonic()
+    codes = run_workers(shards, out_dir, args.include, extra)
+    rc = merge_outputs(out_dir, name=f"Toolshop UI {args.include or 'all'}".strip())
+    broken = broken_workers(codes, out_dir)
+    for worker, code in broken.items():
+        print(f"{worker}: robot exited with {code} (see {out_dir / 'workers' / worker / 'console.log'})")
+    if broken:
+        rc = max(rc, *(c if c >= 250 else 255 for c in broken.values()))
+    print(f"UI parallel wall time: {time.monotonic() - started:.1f}s")
+
+    merged = out_dir / "output.xml"
+    if merged.is_file():
+        update_history(history_path, suite_durations_from_output(merged))
+    frontend = write_frontend_summary(out_dir)
+    if frontend is not None:
+        print(f"Frontend metrics: {frontend}")
+    hars = find_hars([out_dir / "workers"])
+    if hars:
+        write_json(out_dir / HAR_REPORT_NAME, build_har_report(hars))
+        print(f"HAR report: {out_dir / HAR_REPORT_NAME}")
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,570 @@
+"""Compiled, cached JSON Schema validation for API responses.
+
+Validating every response body against `components.schemas` by walking the raw
+schema dict is slow: `$ref`s are resolved again on every call and each keyword
+is re-interpreted per value. This module instead:
+
+- resolves `$ref`s once per spec (memoized, recursion-safe),
+- compiles each schema into a tree of small closures (one per keyword group),
+- caches the compiled validator per (method, path, status, content type),
+- can validate only the first K items (or a random sample) of large list pages.
+
+Supported keywords (OpenAPI 3.0 / 3.1 subset):
+    type (incl. `nullable` and 3.1 type lists), enum, const,
+    properties, required, additionalProperties,
+    items, minItems, maxItems,
+    minLength, maxLength, pattern,
+    minimum, maximum, exclusiveMinimum, exclusiveMaximum,
+    allOf, anyOf, oneOf
+
+Unknown keywords (format, description, example, ...) are ignored on purpose:
+the goal is a fast contract guardrail, not a full JSON Schema implementation.
+
+Environment variables
+---------------------
+- SCHEMA_MAX_ITEMS:
+    Max list items validated per array (0 = all). Default: 5
+- SCHEMA_SAMPLING:
+    "first" (first K items) or "random" (K random items). Default: "first"
+- SCHEMA_SAMPLING_SEED:
+    Seed for random sampling (reproducible runs). Default: 0
+"""
+
+from __future__ import annotations
+
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+# A compiled validator appends human-readable errors for `value` at `where`.
+Validator = Callable[[Any, str, "_Context"], None]
+
+_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    # bool is a subclass of int -> exclude it explicitly
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool))
+    or (isinstance(v, float) and v.is_integer()),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+# -----------------------------------------------------------------------------
+# Sampling / runtime context
+# -----------------------------------------------------------------------------
+@dataclass
+class _Context:
+    """Per-call state shared by all compiled validators.
+
+    Attributes:
+        errors: Collected error messages.
+        max_items: Max array items to validate (0 = all).
+        rng: Random generator when sampling randomly; None means "first K".
+        max_errors: Stop collecting after this many errors.
+    """
+
+    errors: list[str] = field(default_factory=list)
+    max_items: int = 0
+    rng: Optional[random.Random] = None
+    max_errors: int = 20
+
+    def fail(self, where: str, message: str) -> None:
+        """Record an error (bounded by max_errors)."""
+        if len(self.errors) < self.max_errors:
+            self.errors.append(f"{where or '$'}: {message}")
+
+    def indices(self, length: int) -> range | list[int]:
+        """Return the array indices that should be validated."""
+        if not self.max_items or length <= self.max_items:
+            return range(length)
+        if self.rng is None:
+            return range(self.max_items)
+        return sorted(self.rng.sample(range(length), self.max_items))
+
+
+# -----------------------------------------------------------------------------
+# Compiler
+# -----------------------------------------------------------------------------
+class SchemaCompiler:
+    """Compile OpenAPI schema objects into validator closures.
+
+    `$ref` targets are compiled once and shared; recursive schemas are supported
+    through an indirection cell that is filled after compilation finishes.
+    """
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        """Create a compiler bound to one OpenAPI document.
+
+        Args:
+            spec: Parsed OpenAPI document (used to resolve local `$ref`s).
+        """
+        self._spec = spec
+        self._ref_cache: dict[str, Validator] = {}
+
+    def resolve(self, ref: str) -> Any:
+        """Resolve a local JSON pointer like "#/components/schemas/Product".
+
+        Args:
+            ref: Local `$ref` string.
+
+        Returns:
+            The referenced object.
+
+        Raises:
+            KeyError: If the reference is not local or cannot be resolved.
+        """
+        if not ref.startswith("#/"):
+            raise KeyError(f"Only local $refs are supported: {ref}")
+        node: Any = self._spec
+        try:
+            for raw in ref[2:].split("/"):
+                part = raw.replace("~1", "/").replace("~0", "~")
+                if isinstance(node, list):
+                    node = node[int(part)]
+                else:
+                    node = node[part]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise KeyError(f"Unresolvable $ref: {ref}") from None
+        return node
+
+    def resolve_deep(self, obj: Any) -> Any:
+        """Follow `$ref` chains until a non-reference object is reached."""
+        seen: set[str] = set()
+        while isinstance(obj, dict) and "$ref" in obj:
+            ref = obj["$ref"]
+            if ref in seen:
+                raise KeyError(f"Circular $ref chain: {ref}")
+            seen.add(ref)
+            obj = self.resolve(ref)
+        return obj
+
+    def compile(self, schema: Any) -> Validator:
+        """Compile a schema (or `$ref`) into a validator function.
+
+        Args:
+            schema: OpenAPI schema object.
+
+        Returns:
+            Validator callable `(value, where, ctx) -> None`.
+        """
+        if not isinstance(schema, dict) or not schema:
+            return _accept_all
+
+        ref = schema.get("$ref")
+        if isinstance(ref, str):
+            return self._compile_ref(ref)
+
+        checks: list[Validator] = []
+        checks.extend(self._compile_type(schema))
+        checks.extend(self._compile_enum(schema))
+        checks.extend(self._compile_string(schema))
+        checks.extend(self._compile_number(schema))
+        checks.extend(self._compile_object(schema))
+        checks.extend(self._compile_array(schema))
+        checks.extend(self._compile_combinators(schema))
+
+        if not checks:
+            return _accept_all
+
+        # OpenAPI 3.0: `nullable: true` admits null regardless of other keywords.
+        nullable = schema.get("nullable") is True
+        if len(checks) == 1 and not nullable:
+            return checks[0]
+
+        def run_all(value: Any, where: str, ctx: _Context) -> None:
+            if nullable and value is None:
+                return
+            for check in checks:
+                check(value, where, ctx)
+
+        return run_all
+
+    # -- $ref ----------------------------------------------------------------
+    def _compile_ref(self, ref: str) -> Validator:
+        cached = self._ref_cache.get(ref)
+        if cached is not None:
+            return cached
+
+        # Placeholder for recursive references; patched once compiled.
+        cell: list[Validator] = [_accept_all]
+
+        def indirect(value: Any, where: str, ctx: _Context) -> None:
+            cell[0](value, where, ctx)
+
+        self._ref_cache[ref] = indirect
+        try:
+            # resolve_deep rejects pure $ref cycles, which would never terminate.
+            cell[0] = self.compile(self.resolve_deep({"$ref": ref}))
+        except Exception:
+            # Never leave the accept-all placeholder behind for a broken ref.
+            self._ref_cache.pop(ref, None)
+            raise
+        return indirect
+
+    # -- keyword groups ------------------------------------------------------
+    @staticmethod
+    def _compile_type(schema: dict[str, Any]) -> list[Validator]:
+        declared = schema.get("type")
+        if declared is None:
+            return []
+        types = list(declared) if isinstance(declared, list) else [declared]
+        if schema.get("nullable") is True and "null" not in types:
+            types.append("null")
+        preds = [_TYPE_CHECKS[t] for t in types if t in _TYPE_CHECKS]
+        if not preds:
+            return []
+        label = "|".join(types)
+
+        def check_type(value: Any, where: str, ctx: _Context) -> None:
+            for pred in preds:
+                if pred(value):
+                    return
+            ctx.fail(where, f"expected type {label}, got {type(value).__name__}")
+
+        return [check_type]
+
+    @staticmethod
+    def _compile_enum(schema: dict[str, Any]) -> list[Validator]:
+        out: list[Validator] = []
+        enum = schema.get("enum")
+        if isinstance(enum, list):
+            allowed = list(enum)
+            if schema.get("nullable") is True and None not in allowed:
+                allowed.append(None)
+
+            def check_enum(value: Any, where: str, ctx: _Context) -> None:
+                if value not in allowed:
+                    ctx.fail(where, f"value {value!r} not in enum {allowed!r}")
+
+            out.append(check_enum)
+
+        if "const" in schema:
+            const = schema["const"]
+
+            def check_const(value: Any, where: str, ctx: _Context) -> None:
+                if value != const:
+                    ctx.fail(where, f"value {value!r} != const {const!r}")
+
+            out.append(check_const)
+        return out
+
+    @staticmethod
+    def _compile_string(schema: dict[str, Any]) -> list[Validator]:
+        min_len = schema.get("minLength")
+        max_len = schema.get("maxLength")
+        pattern = schema.get("pattern")
+        if min_len is None and max_len is None and not pattern:
+            return []
+        regex = re.compile(pattern) if isinstance(pattern, str) else None
+
+        def check_string(value: Any, where: str, ctx: _Context) -> None:
+            if not isinstance(value, str):
+                return
+            if min_len is not None and len(value) < min_len:
+                ctx.fail(where, f"string shorter than minLength={min_len}")
+            if max_len is not None and len(value) > max_len:
+                ctx.fail(where, f"string longer than maxLength={max_len}")
+            if regex is not None and not regex.search(value):
+                ctx.fail(where, f"string does not match pattern {pattern!r}")
+
+        return [check_string]
+
+    @staticmethod
+    def _compile_number(schema: dict[str, Any]) -> list[Validator]:
+        minimum = schema.get("minimum")
+        maximum = schema.get("maximum")
+        ex_min = schema.get("exclusiveMinimum")
+        ex_max = schema.get("exclusiveMaximum")
+
+        # OpenAPI 3.0 uses booleans that modify minimum/maximum.
+        if ex_min is True:
+            ex_min, minimum = minimum, None
+        elif ex_min is False:
+            ex_min = None
+        if ex_max is True:
+            ex_max, maximum = maximum, None
+        elif ex_max is False:
+            ex_max = None
+
+        if minimum is None and maximum is None and ex_min is None and ex_max is None:
+            return []
+
+        def check_number(value: Any, where: str, ctx: _Context) -> None:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return
+            if minimum is not None and value < minimum:
+                ctx.fail(where, f"{value} < minimum {minimum}")
+            if maximum is not None and value > maximum:
+                ctx.fail(where, f"{value} > maximum {maximum}")
+            if ex_min is not None and value <= ex_min:
+                ctx.fail(where, f"{value} <= exclusiveMinimum {ex_min}")
+            if ex_max is not None and value >= ex_max:
+                ctx.fail(where, f"{value} >= exclusiveMaximum {ex_max}")
+
+        return [check_number]
+
+    def _compile_object(self, schema: dict[str, Any]) -> list[Validator]:
+        props = schema.get("properties")
+        required = schema.get("required")
+        additional = schema.get("additionalProperties", True)
+        if not isinstance(props, dict) and not required and additional is True:
+            return []
+
+        prop_validators = {
+            name: self.compile(sub) for name, sub in (props or {}).items()
+        }
+        required_names = tuple(required) if isinstance(required, list) else ()
+        extra_validator: Optional[Validator] = None
+        forbid_extra = additional is False
+        if isinstance(additional, dict):
+            extra_validator = self.compile(additional)
+
+        def check_object(value: Any, where: str, ctx: _Context) -> None:
+            if not isinstance(value, dict):
+                return
+            for name in required_names:
+                if name not in value:
+                    ctx.fail(where, f"missing required property {name!r}")
+            for name, item in value.items():
+                sub = prop_validators.get(name)
+                if sub is not None:
+                    sub(item, f"{where}.{name}", ctx)
+                elif forbid_extra:
+                    ctx.fail(where, f"unexpected property {name!r}")
+                elif extra_validator is not None:
+                    extra_validator(item, f"{where}.{name}", ctx)
+
+        return [check_object]
+
+    def _compile_array(self, schema: dict[str, Any]) -> list[Validator]:
+        items = schema.get("items")
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+        if items is None and min_items is None and max_items is None:
+            return []
+        item_validator = self.compile(items) if isinstance(items, dict) else None
+
+        def check_array(value: Any, where: str, ctx: _Context) -> None:
+            if not isinstance(value, list):
+                return
+            n = len(value)
+            if min_items is not None and n < min_items:
+                ctx.fail(where, f"array has {n} items < minItems {min_items}")
+            if max_items is not None and n > max_items:
+                ctx.fail(where, f"array has {n} items > maxItems {max_items}")
+            if item_validator is None:
+                return
+            for i in ctx.indices(n):
+                item_validator(value[i], f"{where}[{i}]", ctx)
+
+        return [check_array]
+
+    def _compile_combinators(self, schema: dict[str, Any]) -> list[Validator]:
+        out: list[Validator] = []
+
+        all_of = schema.get("allOf")
+        if isinstance(all_of, list) and all_of:
+            subs = [self.compile(s) for s in all_of]
+
+            def check_all_of(value: Any, where: str, ctx: _Context) -> None:
+                for sub in subs:
+                    sub(value, where, ctx)
+
+            out.append(check_all_of)
+
+        for key in ("anyOf", "oneOf"):
+            alts = schema.get(key)
+            if not isinstance(alts, list) or not alts:
+                continue
+            alt_validators = [self.compile(s) for s in alts]
+            out.append(_make_alternatives(key, alt_validators))
+
+        return out
+
+
+def _accept_all(value: Any, where: str, ctx: _Context) -> None:
+    """Validator for empty / unsupported schemas."""
+
+
+def _make_alternatives(keyword: str, alternatives: list[Validator]) -> Validator:
+    """Build an anyOf / oneOf validator from compiled alternatives."""
+    exactly_one = keyword == "oneOf"
+
+    def check_alternatives(value: Any, where: str, ctx: _Context) -> None:
+        matches = 0
+        for alt in alternatives:
+            probe = _Context(max_items=ctx.max_items, rng=ctx.rng, max_errors=1)
+            alt(value, where, probe)
+            if not probe.errors:
+                matches += 1
+                if not exactly_one:
+                    return
+        if matches == 0:
+            ctx.fail(where, f"value does not match any {keyword} alternative")
+        elif exactly_one and matches > 1:
+            ctx.fail(where, f"value matches {matches} oneOf alternatives (expected 1)")
+
+    return check_alternatives
+
+
+# -----------------------------------------------------------------------------
+# Registry (per operation / status)
+# -----------------------------------------------------------------------------
+class ValidatorRegistry:
+    """Cache of compiled response validators for one OpenAPI document.
+
+    Typical usage (see `schema_validator` fixture in tests/api/conftest.py):
+
+        errors = registry.validate("get", "/products", 200, payload)
+        assert not errors, "\\n".join(errors)
+    """
+
+    def __init__(
+        self,
+        spec: dict[str, Any],
+        max_items: int = 5,
+        sampling: str = "first",
+        seed: int = 0,
+    ) -> None:
+        """Create a registry.
+
+        Args:
+            spec: Parsed OpenAPI document.
+            max_items: Default max list items validated per array (0 = all).
+            sampling: "first" or "random".
+            seed: Seed for random sampling.
+        """
+        self._compiler = SchemaCompiler(spec)
+        self._paths: dict[str, Any] = spec.get("paths", {}) or {}
+        self._cache: dict[tuple[str, str, str, str], Optional[Validator]] = {}
+        self._problems: dict[tuple[str, str, str, str], str] = {}
+        self.max_items = max_items
+        self.sampling = sampling
+        self.seed = seed
+
+    def response_schema(
+        self,
+        method: str,
+        path: str,
+        status: int | str,
+        content_type: str = "application/json",
+    ) -> Optional[dict[str, Any]]:
+        """Return the raw response schema for an operation, if described.
+
+        Status lookup order: exact code, "2XX"-style range, "default".
+
+        Args:
+            method: HTTP method (case-insensitive).
+            path: OpenAPI path key, e.g. "/products/{productId}".
+            status: HTTP status code.
+            content_type: Media type to look up (falls back to any JSON type).
+
+        Returns:
+            Schema dict, or None if the spec does not describe one.
+        """
+        ops = self._paths.get(path)
+        if not isinstance(ops, dict):
+            return None
+        op = ops.get(method.lower())
+        if not isinstance(op, dict):
+            return None
+        responses = op.get("responses") or {}
+
+        code = str(status)
+        resp = responses.get(code)
+        if resp is None:
+            resp = responses.get(code[:1] + "XX") or responses.get(code[:1] + "xx")
+        if resp is None:
+            resp = responses.get("default")
+        resp = self._compiler.resolve_deep(resp)
+        if not isinstance(resp, dict):
+            return None
+
+        content = resp.get("content") or {}
+        media = content.get(content_type)
+        if media is None:
+            media = next(
+                (m for ct, m in content.items() if "json" in ct.lower()),
+                None,
+            )
+        if not isinstance(media, dict):
+            return None
+        schema = media.get("schema")
+        return schema if isinstance(schema, dict) and schema else None
+
+    def validator_for(
+        self,
+        method: str,
+        path: str,
+        status: int | str,
+        content_type: str = "application/json",
+    ) -> Optional[Validator]:
+        """Return the cached compiled validator for an operation/status.
+
+        A schema with a non-local, dangling or circular `$ref` counts as not
+        described; `schema_problem` tells why.
+
+        Returns:
+            Validator, or None if no usable schema is described.
+        """
+        key = (method.lower(), path, str(status), content_type)
+        if key not in self._cache:
+            try:
+                schema = self.response_schema(method, path, status, content_type)
+                self._cache[key] = self._compiler.compile(schema) if schema else None
+            except KeyError as exc:
+                self._cache[key] = None
+                self._problems[key] = str(exc.args[0]) if exc.args else repr(exc)
+        return self._cache[key]
+
+    def has_schema(self, method: str, path: str, status: int | str) -> bool:
+        """Return True if the spec describes a usable response schema for the operation."""
+        return self.validator_for(method, path, status) is not None
+
+    def schema_problem(
+        self,
+        method: str,
+        path: str,
+        status: int | str,
+        content_type: str = "application/json",
+    ) -> Optional[str]:
+        """Return why the operation's schema could not be compiled (None if it could)."""
+        self.validator_for(method, path, status, content_type)
+        return self._problems.get((method.lower(), path, str(status), content_type))
+
+    def validate(
+        self,
+        method: str,
+        path: str,
+        status: int | str,
+        payload: Any,
+        max_items: Optional[int] = None,
+        sampling: Optional[str] = None,
+    ) -> list[str]:
+        """Validate a decoded response body.
+
+        Args:
+            method: HTTP method.
+            path: OpenAPI path key.
+            status: HTTP status code of the response.
+            payload: JSON-decoded body.
+            max_items: Override for max list items validated (0 = all).
+            sampling: Override for the sampling mode ("first" / "random").
+
+        Returns:
+            List of error strings (empty if valid or if no schema is described).
+        """
+        validator = self.validator_for(method, path, status)
+        if validator is None:
+            return []
+        mode = sampling or self.sampling
+        ctx = _Context(
+            max_items=self.max_items if max_items is None else max_items,
+            rng=random.Random(self.seed) if mode == "random" else None,
+        )
+        validator(payload, "$", ctx)
+        return ctx.errors
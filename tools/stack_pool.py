@@ -0,0 +1,295 @@
+"""Warm pool of pre-seeded compose stacks.
+
+Every functional CI job pays `make up` + `make seed` before its first test.
+On a long-lived (self-hosted) runner, this pool keeps K seeded stacks running
+(see tools/multi_stack.py for the per-stack project names and ports) and
+leases one per test run. On release the stack's DB is reset from the snapshot
+(tools/db_snapshot.py) and verified, so the next lease starts from the seeded
+state within seconds.
+
+State lives in `.cache/stack-pool/` (override: STACK_POOL_DIR):
+- pool.json:     stacks and their state (free / leased / broken), guarded by a file lock
+- events.jsonl:  lease wait and reset durations (summarised by `status`)
+
+A lease held by a process that no longer exists is reclaimed (reset first).
+A stack whose reset fails verification is marked broken and rebuilt by the
+next `warm`.
+
+Usage
+-----
+    python -m tools.stack_pool warm --size 3
+    python -m tools.stack_pool run -- make smoke     # lease -> run -> reset + release
+    eval "$(python -m tools.stack_pool lease)"      # exports COMPOSE_PROJECT_NAME, WEB_PORT, ... + STACK_POOL_LEASE
+    python -m tools.stack_pool release "$STACK_POOL_LEASE"
+    python -m tools.stack_pool status
+    python -m tools.stack_pool drain
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import fcntl
+import json
+import os
+import random
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from tools.artifacts import env, write_json
+from tools.db_snapshot import restore_snapshot, snapshot_key, verify
+from tools.multi_stack import Stack, free_ports
+
+FREE = "free"
+LEASED = "leased"
+BROKEN = "broken"
+
+POLL_INITIAL_SECONDS = 0.5
+POLL_MAX_SECONDS = 5.0
+
+
+def pool_dir() -> Path:
+    """Return the pool state directory."""
+    return Path(env("STACK_POOL_DIR", ".cache/stack-pool"))
+
+
+@contextlib.contextmanager
+def locked_state() -> Iterator[dict[str, Any]]:
+    """Yield the pool state under an exclusive lock and write it back afterwards."""
+    directory = pool_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    with (directory / "pool.lock").open("w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        path = directory / "pool.json"
+        state = json.loads(path.read_text(encoding="utf-8")) if path.is_file() else {"stacks": {}}
+        yield state
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(path)
+
+
+def record_event(event: str, stack: str, seconds: float, **extra: Any) -> None:
+    """Append a timing event to events.jsonl."""
+    line = {"ts": time.time(), "event": event, "stack": stack, "seconds": round(seconds, 3), **extra}
+    with (pool_dir() / "events.jsonl").open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(line) + "\n")
+
+
+def stack_of(entry: dict[str, Any]) -> Stack:
+    """Rebuild a Stack from its pool entry."""
+    return Stack(entry["name"], int(entry["web_port"]), int(entry["ui_port"]))
+
+
+def _alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# -----------------------------------------------------------------------------
+# Operations
+# -----------------------------------------------------------------------------
+def reset(entry: dict[str, Any]) -> bool:
+    """Restore the stack's DB from the snapshot and verify it; records the reset time."""
+    stack = stack_of(entry)
+    started = time.monotonic()
+    try:
+        expected = restore_snapshot(stack.settings())
+        problems = verify(stack.settings(), expected)
+    except (OSError, RuntimeError, subprocess.CalledProcessError) as exc:
+        problems = [str(exc)]
+    seconds = time.monotonic() - started
+    record_event("reset", stack.name, seconds, ok=not problems)
+    for p in problems:
+        print(f"{stack.name}: reset problem: {p}", file=sys.stderr)
+    print(f"{stack.name}: reset in {seconds:.1f}s", file=sys.stderr)
+    return not problems
+
+
+def warm(size: int, prefix: str) -> int:
+    """Bring the pool to `size` healthy, seeded, free stacks (broken/stale ones are rebuilt)."""
+    with locked_state() as state:
+        stacks = state["stacks"]
+        taken = frozenset(p for e in stacks.values() for p in (e["web_port"], e["ui_port"]))
+        missing = [f"{prefix}-{i:02d}" for i in range(1, size + 1) if f"{prefix}-{i:02d}" not in stacks]
+        ports = free_ports(2 * len(missing), exclude=taken)
+        for i, name in enumerate(missing):
+            stacks[name] = {"name": name, "web_port": ports[2 * i], "ui_port": ports[2 * i + 1], "state": BROKEN}
+        todo = [
+            dict(e)
+            for e in stacks.values()
+            if e["state"] == BROKEN or (e["state"] == FREE and e.get("key") != snapshot_key(stack_of(e).settings()))
+        ]
+        for e in todo:
+            stacks[e["name"]]["state"] = LEASED  # keep them out of lease() while (re)building
+            stacks[e["name"]]["leased_by"] = os.getpid()
+
+    rc = 0
+    for e in todo:
+        stack = stack_of(e)
+        print(f"{stack.name}: up + seed (API {stack.api_host}, UI {stack.base_url})")
+        ok = stack.make("up", "seed") == 0
+        with locked_state() as state:
+            entry = state["stacks"][stack.name]
+            entry.update(state=FREE if ok else BROKEN, leased_by=None, key=snapshot_key(stack.settings()))
+        print(f"{stack.name}: {'ready' if ok else 'FAILED'} ({stack.timings})")
+        rc = rc or (0 if ok else 1)
+    return rc
+
+
+def lease(timeout: float, holder: int) -> Optional[dict[str, Any]]:
+    """Lease a free stack for process `holder`, waiting (with backoff) up to `timeout` seconds."""
+    started = time.monotonic()
+    delay = POLL_INITIAL_SECONDS
+    while True:
+        stale: Optional[dict[str, Any]] = None
+        with locked_state() as state:
+            entries = sorted(state["stacks"].values(), key=lambda e: e["name"])
+            chosen = next((e for e in entries if e["state"] == FREE), None)
+            if chosen is None:
+                stale = next((e for e in entries if e["state"] == LEASED and not _alive(e.get("leased_by"))), None)
+                chosen = stale
+            if chosen is not None:
+                chosen.update(state=LEASED, leased_by=holder, leased_at=time.time())
+        if stale is not None:
+            print(f"{stale['name']}: reclaiming lease of dead process", file=sys.stderr)
+            if not reset(stale):
+                release(stale["name"], reset_db=False, broken=True)
+                continue
+        if chosen is not None:
+            waited = time.monotonic() - started
+            record_event("lease", chosen["name"], waited)
+            print(f"{chosen['name']}: leased after {waited:.1f}s", file=sys.stderr)
+            return chosen
+        if time.monotonic() - started >= timeout:
+            return None
+        time.sleep(delay * random.uniform(0.8, 1.2))
+        delay = min(delay * 1.6, POLL_MAX_SECONDS)
+
+
+def release(name: str, reset_db: bool = True, broken: bool = False) -> bool:
+    """Reset (optional) and return a stack to the pool."""
+    with locked_state() as state:
+        entry = dict(state["stacks"].get(name) or {})
+    if not entry:
+        print(f"Unknown stack: {name}")
+        return False
+    ok = not broken and (reset(entry) if reset_db else True)
+    with locked_state() as state:
+        state["stacks"][name].update(state=FREE if ok else BROKEN, leased_by=None, leased_at=None)
+    return ok
+
+
+def status() -> dict[str, Any]:
+    """Pool stacks plus lease-wait / reset-time statistics."""
+    with locked_state() as state:
+        stacks = list(state["stacks"].values())
+    events_file = pool_dir() / "events.jsonl"
+    events = [json.loads(line) for line in events_file.read_text(encoding="utf-8").splitlines()] if events_file.is_file() else []
+
+    def summary(kind: str) -> dict[str, Any]:
+        values = sorted(e["seconds"] for e in events if e["event"] == kind)
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "p50": round(statistics.median(values), 2),
+            "p95": round(values[min(len(values) - 1, int(0.95 * len(values)))], 2),
+            "max": round(values[-1], 2),
+        }
+
+    return {"stacks": stacks, "lease_wait_seconds": summary("lease"), "reset_seconds": summary("reset")}
+
+
+def drain() -> int:
+    """Remove every stack (`make clean`) and forget the pool."""
+    with locked_state() as state:
+        entries = list(state["stacks"].values())
+        state["stacks"] = {}
+    for e in entries:
+        stack_of(e).make("clean")
+    return 0
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _exports(entry: dict[str, Any]) -> str:
+    stack = stack_of(entry)
+    keys = ("COMPOSE_PROJECT_NAME", "WEB_PORT", "UI_PORT", "API_HOST", "API_DOCS_URL", "BASE_URL")
+    lines = [f"export {k}={shlex.quote(stack.env()[k])}" for k in keys]
+    return "\n".join([*lines, f"export STACK_POOL_LEASE={shlex.quote(stack.name)}"])
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(prog="python -m tools.stack_pool", description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_warm = sub.add_parser("warm", help="bring the pool to SIZE seeded stacks")
+    p_warm.add_argument("--size", type=int, default=int(env("STACK_POOL_SIZE", "2")))
+    p_warm.add_argument("--prefix", default=env("COMPOSE_PROJECT_NAME", "toolshop-e2e") + "-pool")
+
+    p_lease = sub.add_parser("lease", help="lease a stack and print shell exports")
+    p_lease.add_argument("--timeout", type=float, default=600.0)
+    p_lease.add_argument("--json", action="store_true")
+    p_lease.add_argument("--holder", type=int, default=os.getppid(), help="pid owning the lease (default: the calling shell)")
+
+    p_release = sub.add_parser("release", help="reset a stack's DB and return it to the pool")
+    p_release.add_argument("name")
+    p_release.add_argument("--no-reset", action="store_true", help="the run did not write to the DB")
+
+    p_run = sub.add_parser("run", help="lease, run COMMAND against the stack, release")
+    p_run.add_argument("--timeout", type=float, default=600.0)
+    p_run.add_argument("cmd", nargs=argparse.REMAINDER)
+
+    sub.add_parser("status", help="show stacks and lease/reset timings")
+    sub.add_parser("drain", help="remove all stacks")
+    args = parser.parse_args(argv)
+
+    if args.command == "warm":
+        return warm(args.size, args.prefix)
+    if args.command == "status":
+        report = status()
+        write_json(pool_dir() / "status.json", report)
+        for e in report["stacks"]:
+            print(f"{e['name']:<28} {e['state']:<7} API :{e['web_port']}  UI :{e['ui_port']}")
+        print(f"lease wait: {report['lease_wait_seconds']}")
+        print(f"reset:      {report['reset_seconds']}")
+        return 0
+    if args.command == "drain":
+        return drain()
+    if args.command == "release":
+        return 0 if release(args.name, reset_db=not args.no_reset) else 1
+
+    entry = lease(args.timeout, args.holder if args.command == "lease" else os.getpid())
+    if entry is None:
+        print(f"No stack became free within {args.timeout:.0f}s (python -m tools.stack_pool status).", file=sys.stderr)
+        return 1
+    if args.command == "lease":
+        print(json.dumps(entry) if args.json else _exports(entry))
+        return 0
+
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    if not cmd:
+        release(entry["name"], reset_db=False)
+        parser.error("run needs a command after --")
+    try:
+        return subprocess.call(cmd, env=stack_of(entry).env())
+    finally:
+        release(entry["name"])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
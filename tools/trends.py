@@ -0,0 +1,745 @@
+"""Persisted performance trend store with regression detection.
+
+Each `make api-*` / `make k6-*` run leaves artifacts behind, but nothing compares
+runs. This module keeps a small SQLite time-series store of per-endpoint metrics
+and compares the latest run against a rolling baseline of previous runs.
+
+Ingested sources
+----------------
+- k6 `--summary-export` files (`artifacts/k6/<scenario>/run-XXX/summary.json`):
+    overall `http_req_duration` / `http_reqs` / `http_req_failed`, plus tagged
+    sub-metrics such as `http_req_duration{name:GET /products}` when present.
+- pytest JUnit XML (`artifacts/api/<suite>/junit.xml`):
+    per-test durations and failure flags. Every run overwrites that file, so
+    its source is the path plus a content hash (one stored run per version).
+- Trend records (JSON, `"format": "toolshop.trend-record/v1"`):
+    the generic shape produced by other tools (see `RunRecord`).
+
+Regression detection
+--------------------
+For every (endpoint, metric) of the candidate run:
+- baseline = the previous N runs of the same kind/scenario,
+- noise band = max(k * 1.4826 * MAD, rel_tol * median, abs_tol),
+- flagged if the value is worse than the baseline median by more than the band.
+When raw latency samples are stored for both sides, a one-sided Mann-Whitney U
+test is run as well; a significant shift (p < alpha) whose median moved by at
+least the minimum effect (--min-effect, relative) also flags a regression.
+
+Usage
+-----
+    python -m tools.trends ingest artifacts/k6/smoke/run-003
+    python -m tools.trends compare --kind k6 --scenario smoke --fail-on-regression
+
+Environment variables
+---------------------
+- TREND_DB: SQLite file path. Default: "<ARTIFACTS>/trends/trends.db"
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import statistics
+import sys
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from tools.artifacts import artifacts_root, env
+
+RECORD_FORMAT = "toolshop.trend-record/v1"
+
+# Endpoint key used for run-wide aggregates.
+ALL_ENDPOINTS = "*"
+
+# Metrics where a higher value is better (everything else: lower is better).
+HIGHER_IS_BETTER = frozenset({"rps"})
+
+# Absolute tolerances per metric (avoid flagging tiny absolute changes).
+ABS_TOLERANCE = {"error_rate": 0.005, "rps": 0.5}
+DEFAULT_ABS_TOLERANCE_MS = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT NOT NULL,
+    scenario    TEXT NOT NULL,
+    source      TEXT NOT NULL UNIQUE,
+    recorded_at REAL NOT NULL,
+    meta        TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id   INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    metric   TEXT NOT NULL,
+    value    REAL NOT NULL,
+    PRIMARY KEY (run_id, endpoint, metric)
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id   INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    value    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_series ON runs(kind, scenario, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_samples_run ON samples(run_id, endpoint);
+"""
+
+_K6_TAGGED_METRIC = re.compile(r"^(?P<metric>[a-z_]+)\{(?P<tags>.*)\}$")
+_K6_PERCENTILE = re.compile(r"^p\((?P<p>[\d.]+)\)$")
+
+
+# -----------------------------------------------------------------------------
+# Run records
+# -----------------------------------------------------------------------------
+@dataclass
+class RunRecord:
+    """One run's metrics, ready to be stored.
+
+    Attributes:
+        kind: Run family ("k6", "api", "ui", ...).
+        scenario: Scenario/suite name ("smoke", "regression", "soak", ...).
+        source: Unique source identifier (usually the artifact path).
+        recorded_at: Unix timestamp of the run.
+        metrics: endpoint -> metric -> value. Latency metrics are in ms
+            (avg, min, max, p50, p90, p95, p99), plus count, rps, error_rate.
+        samples: endpoint -> latency samples in ms (optional, may be a reservoir).
+        meta: Free-form metadata (image digest, git sha, ...).
+    """
+
+    kind: str
+    scenario: str
+    source: str
+    recorded_at: float
+    metrics: dict[str, dict[str, float]] = field(default_factory=dict)
+    samples: dict[str, list[float]] = field(default_factory=dict)
+    meta: dict[str, Any] = field(default_factory=dict)
+
+    def to_json(self) -> dict[str, Any]:
+        """Serialize to the `toolshop.trend-record/v1` JSON shape."""
+        return {
+            "format": RECORD_FORMAT,
+            "kind": self.kind,
+            "scenario": self.scenario,
+            "source": self.source,
+            "recorded_at": self.recorded_at,
+            "metrics": self.metrics,
+            "samples": self.samples,
+            "meta": self.meta,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any], source: str) -> "RunRecord":
+        """Build a record from the `toolshop.trend-record/v1` JSON shape."""
+        return cls(
+            kind=str(data.get("kind") or "unknown"),
+            scenario=str(data.get("scenario") or "unknown"),
+            source=str(data.get("source") or source),
+            recorded_at=float(data.get("recorded_at") or time.time()),
+            metrics={
+                ep: {m: float(v) for m, v in (vals or {}).items() if _is_number(v)}
+                for ep, vals in (data.get("metrics") or {}).items()
+            },
+            samples={
+                ep: [float(v) for v in (vals or []) if _is_number(v)]
+                for ep, vals in (data.get("samples") or {}).items()
+            },
+            meta=dict(data.get("meta") or {}),
+        )
+
+
+def _is_number(v: Any) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)
+
+
+def infer_kind_and_scenario(path: Path) -> tuple[str, str]:
+    """Infer (kind, scenario) from an artifacts path.
+
+    Examples:
+        artifacts/k6/smoke/run-003/summary.json -> ("k6", "smoke")
+        artifacts/api/regression/junit.xml      -> ("api", "regression")
+    """
+    parts = [p for p in path.resolve().parts]
+    for kind in ("k6", "api", "ui"):
+        if kind in parts:
+            idx = len(parts) - 1 - parts[::-1].index(kind)
+            if idx + 1 < len(parts):
+                return kind, parts[idx + 1]
+    return "unknown", "unknown"
+
+
+def _normalize_k6_stat(stat: str) -> Optional[str]:
+    """Map k6 trend stat names to store metric names."""
+    if stat in ("avg", "min", "max"):
+        return stat
+    if stat == "med":
+        return "p50"
+    m = _K6_PERCENTILE.match(stat)
+    if m:
+        p = float(m.group("p"))
+        return f"p{int(p)}" if p.is_integer() else f"p{p:g}"
+    return None
+
+
+def _k6_endpoint(tags: str) -> Optional[str]:
+    """Extract an endpoint key from k6 sub-metric tags ("name:GET /products")."""
+    for part in tags.split(","):
+        key, _, value = part.partition(":")
+        if key.strip() == "name" and value.strip():
+            return value.strip()
+    return None
+
+
+def record_from_k6_summary(path: Path) -> RunRecord:
+    """Parse a k6 `--summary-export` JSON file.
+
+    Args:
+        path: Path to summary.json.
+
+    Returns:
+        RunRecord with run-wide and (when exported) per-name metrics.
+    """
+    data = json.loads(path.read_text(encoding="utf-8"))
+    kind, scenario = infer_kind_and_scenario(path)
+    metrics: dict[str, dict[str, float]] = {}
+
+    for raw_name, values in (data.get("metrics") or {}).items():
+        if not isinstance(values, dict):
+            continue
+        endpoint = ALL_ENDPOINTS
+        name = raw_name
+        m = _K6_TAGGED_METRIC.match(raw_name)
+        if m:
+            endpoint = _k6_endpoint(m.group("tags")) or ""
+            name = m.group("metric")
+            if not endpoint:
+                continue
+        bucket = metrics.setdefault(endpoint, {})
+
+        if name == "http_req_duration":
+            for stat, v in values.items():
+                key = _normalize_k6_stat(stat)
+                if key and _is_number(v):
+                    bucket[key] = float(v)
+        elif name == "http_reqs":
+            if _is_number(values.get("count")):
+                bucket["count"] = float(values["count"])
+            if _is_number(values.get("rate")):
+                bucket["rps"] = float(values["rate"])
+        elif name == "http_req_failed":
+            rate = values.get("value", values.get("rate"))
+            if _is_number(rate):
+                bucket["error_rate"] = float(rate)
+
+    metrics = {ep: vals for ep, vals in metrics.items() if vals}
+    return RunRecord(
+        kind=kind,
+        scenario=scenario,
+        source=str(path.resolve()),
+        recorded_at=path.stat().st_mtime,
+        metrics=metrics,
+    )
+
+
+def content_source(path: Path) -> str:
+    """Source id for an artifact rewritten in place: "<path>#<sha256 prefix>"."""
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+    return f"{path.resolve()}#{digest}"
+
+
+def record_from_junit(path: Path) -> RunRecord:
+    """Parse a pytest JUnit XML file into per-test duration metrics.
+
+    Each test case becomes an "endpoint" keyed by `<classname>::<name>` with
+    `avg` (duration in ms) and `error_rate` (1.0 if failed/errored).
+
+    Args:
+        path: Path to junit.xml.
+
+    Returns:
+        RunRecord for the pytest run.
+    """
+    root = ET.parse(path).getroot()
+    kind, scenario = infer_kind_and_scenario(path)
+    metrics: dict[str, dict[str, float]] = {}
+    durations: list[float] = []
+    failed = 0
+
+    for case in root.iter("testcase"):
+        if case.find("skipped") is not None:
+            continue
+        key = f"{case.attrib.get('classname', '')}::{case.attrib.get('name', '')}"
+        ms = float(case.attrib.get("time") or 0.0) * 1000.0
+        is_failed = case.find("failure") is not None or case.find("error") is not None
+        metrics[key] = {"avg": ms, "error_rate": 1.0 if is_failed else 0.0}
+        durations.append(ms)
+        failed += int(is_failed)
+
+    if durations:
+        metrics[ALL_ENDPOINTS] = {
+            "count": float(len(durations)),
+            "avg": statistics.fmean(durations),
+            "max": max(durations),
+            "error_rate": failed / len(durations),
+        }
+
+    return RunRecord(
+        kind=kind,
+        scenario=scenario,
+        source=content_source(path),
+        recorded_at=path.stat().st_mtime,
+        metrics=metrics,
+    )
+
+
+def _is_trend_record(path: Path) -> bool:
+    """Return True if `path` holds a `toolshop.trend-record/v1` document."""
+    if path.suffix != ".json":
+        return False
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            head = fh.read(4096)
+    except OSError:
+        return False
+    return RECORD_FORMAT in head
+
+
+def load_records(path: Path) -> list[RunRecord]:
+    """Load run records from an artifact file or run directory.
+
+    Args:
+        path: A summary.json / junit.xml / trend record file, or a directory
+            containing any of them (e.g. a run-XXX folder).
+
+    Returns:
+        Parsed records (possibly empty).
+    """
+    if path.is_dir():
+        records: list[tuple[Path, RunRecord]] = []
+        for child in sorted(path.iterdir()):
+            if child.is_file() and child.suffix in (".json", ".xml"):
+                records.extend((child, r) for r in load_records(child))
+        # A run dir with a k6 NDJSON summary (tools/k6_summary.py) also holds
+        # k6's own summary.json; keep only the richer record to avoid double runs.
+        if any(_is_trend_record(p) for p, _ in records):
+            records = [(p, r) for p, r in records if _is_trend_record(p)]
+        return [r for _, r in records]
+
+    if path.suffix == ".xml":
+        if path.name.startswith("junit"):
+            return [record_from_junit(path)]
+        return []
+
+    if path.suffix != ".json":
+        return []
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return []
+    if not isinstance(data, dict):
+        return []
+    if data.get("format") == RECORD_FORMAT:
+        return [RunRecord.from_json(data, str(path.resolve()))]
+    if "metrics" in data and "http_req_duration" in (data.get("metrics") or {}):
+        return [record_from_k6_summary(path)]
+    return []
+
+
+# -----------------------------------------------------------------------------
+# Store
+# -----------------------------------------------------------------------------
+def default_db_path() -> Path:
+    """Return the default trend DB path (TREND_DB env or artifacts/trends/trends.db)."""
+    return Path(env("TREND_DB", str(artifacts_root() / "trends" / "trends.db")))
+
+
+class TrendStore:
+    """SQLite-backed store of run metrics and latency samples."""
+
+    def __init__(self, db_path: Path) -> None:
+        """Open (and initialize) the store.
+
+        Args:
+            db_path: SQLite file path (parent directory is created).
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "TrendStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def ingest(self, record: RunRecord, replace: bool = False) -> Optional[int]:
+        """Store a run record.
+
+        Args:
+            record: Run record to store.
+            replace: Replace an existing run with the same source.
+
+        Returns:
+            The run id, or None if the source was already ingested.
+        """
+        with self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM runs WHERE source = ?", (record.source,)
+            ).fetchone()
+            if row:
+                if not replace:
+                    return None
+                self._conn.execute("DELETE FROM runs WHERE id = ?", (row[0],))
+
+            cur = self._conn.execute(
+                "INSERT INTO runs (kind, scenario, source, recorded_at, meta) VALUES (?, ?, ?, ?, ?)",
+                (
+                    record.kind,
+                    record.scenario,
+                    record.source,
+                    record.recorded_at,
+                    json.dumps(record.meta, sort_keys=True),
+                ),
+            )
+            run_id = int(cur.lastrowid or 0)
+            self._conn.executemany(
+                "INSERT INTO metrics (run_id, endpoint, metric, value) VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, ep, metric, value)
+                    for ep, vals in record.metrics.items()
+                    for metric, value in vals.items()
+                ],
+            )
+            self._conn.executemany(
+                "INSERT INTO samples (run_id, endpoint, value) VALUES (?, ?, ?)",
+                [(run_id, ep, v) for ep, vals in record.samples.items() for v in vals],
+            )
+        return run_id
+
+    def runs(self, kind: str, scenario: str) -> list[tuple[int, float, str]]:
+        """Return (id, recorded_at, source) for a series, oldest first."""
+        return list(
+            self._conn.execute(
+                "SELECT id, recorded_at, source FROM runs "
+                "WHERE kind = ? AND scenario = ? ORDER BY recorded_at, id",
+                (kind, scenario),
+            )
+        )
+
+    def metrics(self, run_id: int) -> dict[tuple[str, str], float]:
+        """Return {(endpoint, metric): value} for a run."""
+        return {
+            (ep, metric): value
+            for ep, metric, value in self._conn.execute(
+                "SELECT endpoint, metric, value FROM metrics WHERE run_id = ?", (run_id,)
+            )
+        }
+
+    def samples(self, run_ids: Iterable[int], endpoint: str) -> list[float]:
+        """Return pooled latency samples for an endpoint across runs."""
+        ids = list(run_ids)
+        if not ids:
+            return []
+        marks = ",".join("?" for _ in ids)
+        return [
+            v
+            for (v,) in self._conn.execute(
+                f"SELECT value FROM samples WHERE endpoint = ? AND run_id IN ({marks})",
+                (endpoint, *ids),
+            )
+        ]
+
+
+# -----------------------------------------------------------------------------
+# Statistics
+# -----------------------------------------------------------------------------
+def mann_whitney_greater(candidate: list[float], baseline: list[float]) -> float:
+    """One-sided Mann-Whitney U test: P(candidate tends to be larger) p-value.
+
+    Uses the normal approximation with tie correction and continuity
+    correction (adequate for the sample sizes produced by load runs).
+
+    Args:
+        candidate: Samples from the run under test.
+        baseline: Pooled samples from baseline runs.
+
+    Returns:
+        p-value for H1 "candidate is stochastically greater than baseline".
+        Returns 1.0 when there is not enough data.
+    """
+    n1, n2 = len(candidate), len(baseline)
+    if n1 < 2 or n2 < 2:
+        return 1.0
+
+    combined = sorted(
+        [(v, 0) for v in candidate] + [(v, 1) for v in baseline], key=lambda t: t[0]
+    )
+    n = n1 + n2
+    rank_sum_candidate = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        avg_rank = (i + j) / 2.0 + 1.0
+        t = j - i + 1
+        if t > 1:
+            tie_term += t**3 - t
+        for k in range(i, j + 1):
+            if combined[k][1] == 0:
+                rank_sum_candidate += avg_rank
+        i = j + 1
+
+    u1 = rank_sum_candidate - n1 * (n1 + 1) / 2.0
+    mean_u = n1 * n2 / 2.0
+    var_u = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if var_u <= 0:
+        return 1.0
+    z = (u1 - mean_u - 0.5) / math.sqrt(var_u)
+    return 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+@dataclass
+class Finding:
+    """Comparison result for one (endpoint, metric) series."""
+
+    endpoint: str
+    metric: str
+    value: float
+    baseline_median: float
+    noise_band: float
+    baseline_runs: int
+    regression: bool
+    p_value: Optional[float] = None
+    reason: str = ""
+
+    @property
+    def delta_pct(self) -> float:
+        """Relative change vs baseline median in percent."""
+        if self.baseline_median == 0:
+            return 0.0
+        return (self.value - self.baseline_median) / self.baseline_median * 100.0
+
+
+def compare_run(
+    store: TrendStore,
+    kind: str,
+    scenario: str,
+    run_id: Optional[int] = None,
+    baseline_runs: int = 10,
+    min_baseline: int = 3,
+    mad_k: float = 3.0,
+    rel_tol: float = 0.10,
+    alpha: float = 0.01,
+    min_effect: float = 0.05,
+) -> tuple[Optional[int], list[Finding]]:
+    """Compare a run against a rolling baseline of earlier runs.
+
+    Args:
+        store: Open trend store.
+        kind: Run family.
+        scenario: Scenario/suite name.
+        run_id: Candidate run id (default: latest run of the series).
+        baseline_runs: Max number of earlier runs used as baseline.
+        min_baseline: Minimum baseline runs required per series.
+        mad_k: Noise band width in robust standard deviations (MAD * 1.4826).
+        rel_tol: Minimum relative band around the baseline median.
+        alpha: Significance level for the Mann-Whitney test.
+        min_effect: Minimum relative median shift for a significant MW result.
+
+    Returns:
+        (candidate run id, findings). The run id is None if the series is empty.
+    """
+    series = store.runs(kind, scenario)
+    if not series:
+        return None, []
+
+    ids = [rid for rid, _, _ in series]
+    if run_id is None:
+        run_id = ids[-1]
+    if run_id not in ids:
+        raise ValueError(f"Run {run_id} does not belong to series {kind}/{scenario}")
+
+    pos = ids.index(run_id)
+    baseline_ids = ids[max(0, pos - baseline_runs) : pos]
+    candidate = store.metrics(run_id)
+    history = [store.metrics(rid) for rid in baseline_ids]
+
+    findings: list[Finding] = []
+    for (endpoint, metric), value in sorted(candidate.items()):
+        if metric in ("count", "co_count"):
+            continue
+        base_vals = [h[(endpoint, metric)] for h in history if (endpoint, metric) in h]
+        if len(base_vals) < min_baseline:
+            continue
+
+        median = statistics.median(base_vals)
+        mad = statistics.median(abs(v - median) for v in base_vals)
+        abs_tol = ABS_TOLERANCE.get(metric, DEFAULT_ABS_TOLERANCE_MS)
+        band = max(mad_k * 1.4826 * mad, rel_tol * abs(median), abs_tol)
+
+        higher_better = metric in HIGHER_IS_BETTER
+        worse_by = (median - value) if higher_better else (value - median)
+        regression = worse_by > band
+        reason = f"outside noise band (+{worse_by:.3g} > {band:.3g})" if regression else ""
+
+        findings.append(
+            Finding(
+                endpoint=endpoint,
+                metric=metric,
+                value=value,
+                baseline_median=median,
+                noise_band=band,
+                baseline_runs=len(base_vals),
+                regression=regression,
+                reason=reason,
+            )
+        )
+
+    # Distribution-level check on raw samples (one finding per endpoint).
+    endpoints = {ep for ep, _ in candidate}
+    for endpoint in sorted(endpoints):
+        cand_samples = store.samples([run_id], endpoint)
+        base_samples = store.samples(baseline_ids, endpoint)
+        if len(cand_samples) < 20 or len(base_samples) < 20:
+            continue
+        p = mann_whitney_greater(cand_samples, base_samples)
+        cand_med = statistics.median(cand_samples)
+        base_med = statistics.median(base_samples)
+        shifted = base_med > 0 and (cand_med - base_med) / base_med > min_effect
+        regression = p < alpha and shifted
+        findings.append(
+            Finding(
+                endpoint=endpoint,
+                metric="samples_median",
+                value=cand_med,
+                baseline_median=base_med,
+                noise_band=base_med * min_effect,
+                baseline_runs=len(baseline_ids),
+                regression=regression,
+                p_value=p,
+                reason=f"Mann-Whitney p={p:.2g}" if regression else "",
+            )
+        )
+
+    return run_id, findings
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _cmd_ingest(args: argparse.Namespace) -> int:
+    count = 0
+    with TrendStore(args.db) as store:
+        for raw in args.paths:
+            for record in load_records(Path(raw)):
+                if args.kind:
+                    record.kind = args.kind
+                if args.scenario:
+                    record.scenario = args.scenario
+                run_id = store.ingest(record, replace=args.replace)
+                status = f"run_id={run_id}" if run_id else "already ingested"
+                print(f"{record.kind}/{record.scenario}: {record.source} -> {status}")
+                count += int(run_id is not None)
+    print(f"Ingested {count} run(s) into {args.db}")
+    return 0
+
+
+def _cmd_compare(args: argparse.Namespace) -> int:
+    with TrendStore(args.db) as store:
+        run_id, findings = compare_run(
+            store,
+            args.kind,
+            args.scenario,
+            run_id=args.run_id,
+            baseline_runs=args.baseline_runs,
+            min_baseline=args.min_baseline,
+            mad_k=args.mad_k,
+            rel_tol=args.rel_tol,
+            alpha=args.alpha,
+            min_effect=args.min_effect,
+        )
+
+    if run_id is None:
+        print(f"No runs stored for {args.kind}/{args.scenario}.")
+        return 0
+
+    regressions = [f for f in findings if f.regression]
+    print(f"Series {args.kind}/{args.scenario}, candidate run_id={run_id}")
+    if not findings:
+        print(f"Not enough baseline runs (need >= {args.min_baseline}); nothing compared.")
+    for f in findings:
+        flag = "REGRESSION" if f.regression else "ok"
+        print(
+            f"  [{flag:>10}] {f.endpoint:<40} {f.metric:<14} "
+            f"{f.value:>10.2f} vs {f.baseline_median:>10.2f} ({f.delta_pct:+6.1f}%) {f.reason}"
+        )
+
+    if args.report:
+        report = {
+            "kind": args.kind,
+            "scenario": args.scenario,
+            "run_id": run_id,
+            "regressions": len(regressions),
+            "findings": [dict(vars(f), delta_pct=f.delta_pct) for f in findings],
+        }
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Report written: {args.report}")
+
+    print(f"{len(regressions)} regression(s) detected.")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser."""
+    parser = argparse.ArgumentParser(prog="python -m tools.trends", description=__doc__.split("\n")[0])
+    parser.add_argument("--db", type=Path, default=default_db_path(), help="SQLite trend DB path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ing = sub.add_parser("ingest", help="ingest run artifacts into the store")
+    ing.add_argument("paths", nargs="+", help="summary.json / junit.xml / trend record / run dir")
+    ing.add_argument("--kind", help="override inferred kind (k6/api/ui)")
+    ing.add_argument("--scenario", help="override inferred scenario/suite")
+    ing.add_argument("--replace", action="store_true", help="re-ingest already stored sources")
+    ing.set_defaults(func=_cmd_ingest)
+
+    cmp_ = sub.add_parser("compare", help="compare a run against the rolling baseline")
+    cmp_.add_argument("--kind", required=True)
+    cmp_.add_argument("--scenario", required=True)
+    cmp_.add_argument("--run-id", type=int, default=None, help="candidate run (default: latest)")
+    cmp_.add_argument("--baseline-runs", type=int, default=10)
+    cmp_.add_argument("--min-baseline", type=int, default=3)
+    cmp_.add_argument("--mad-k", type=float, default=3.0)
+    cmp_.add_argument("--rel-tol", type=float, default=0.10)
+    cmp_.add_argument("--alpha", type=float, default=0.01)
+    cmp_.add_argument(
+        "--min-effect", type=float, default=0.05, help="min relative median shift for a significant Mann-Whitney result"
+    )
+    cmp_.add_argument("--report", help="write findings as JSON to this path")
+    cmp_.add_argument("--fail-on-regression", action="store_true", help="exit 1 on regressions")
+    cmp_.set_defaults(func=_cmd_compare)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    args = build_parser().parse_args(argv)
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,383 @@
+"""Learn a Markov user-journey workload model from captured traffic.
+
+The k6 scripts (load/k6/smoke.js etc.) replay one fixed sequence per
+iteration. This tool learns what real sessions do instead: which endpoint
+they start on, the probability of moving from one endpoint to the next (or
+leaving), and how long users think between requests. load/k6/journey.js then
+drives every k6 iteration as one session sampled from that chain.
+
+Inputs (mixed freely, plain or .gz, `-` for stdin):
+- nginx `timing` JSON log (docker/nginx/timing.conf), e.g. `docker compose logs web`
+- nginx / Apache "combined" access logs
+- JSONL captures, one request per line:
+  {"ts": <epoch s>, "session": "...", "method": "GET", "path": "/products?page=2", "seconds": 0.05}
+  (`session` is optional; `client`/`remote_addr` + `user_agent` are used otherwise)
+
+Sessions are the requests of one client separated by no more than
+`--session-gap` seconds of inactivity. The client is the explicit `session`,
+the VU of k6 request IDs, or remote address + user agent. Endpoints are
+grouped like the adaptive timeouts (tools/endpoints.py), e.g.
+"GET /products/{id}" or "GET /products?page,sort". Only GET/HEAD requests
+become states, as request bodies are not captured; other requests, 5xx
+responses and static files still count as activity but are not replayed.
+
+The think time after a state is the gap between the end of its request and
+the start of the next one in the session. It is stored as an empirical
+quantile function (every 5%, ms), which journey.js samples by inverse
+transform. Each state keeps a uniform sample of `--examples` concrete URLs
+(query values included, frequent URLs repeated); the executor substitutes IDs
+in them with IDs of the target database.
+
+Model (JSON, format toolshop.workload-model/v1):
+    states       {state: {method, path, count, auth, examples}}
+    start        {state: probability}
+    transitions  {state: {next state | "$end": probability}}
+    think_ms     {state: [p0, p5, ..., p100]}
+    id_segment   regex of the path segments grouped as {id} (tools/endpoints.py)
+
+Usage
+-----
+    python -m tools.workload_model access.log.gz --output load/k6/models/journey.json
+    docker compose -p toolshop-e2e -f docker/docker-compose.yml logs --no-color --no-log-prefix web \\
+      | python -m tools.workload_model - --session-gap 900
+    python -m tools.workload_model capture.jsonl --min-count 20 --print
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, IO, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+from tools.artifacts import write_json
+from tools.endpoints import ID_SEGMENT, endpoint_key
+from tools.k6_summary import LogHistogram, open_ndjson
+
+FORMAT = "toolshop.workload-model/v1"
+DEFAULT_OUTPUT = Path("load/k6/models/journey.json")
+
+END = "$end"
+REPLAYABLE_METHODS = ("GET", "HEAD")
+THINK_QUANTILES = tuple(q / 100.0 for q in range(0, 101, 5))
+SWEEP_EVERY = 10_000  # requests between closing sessions of clients that went idle
+
+# Endpoints that need the demo user's token when replayed.
+DEFAULT_AUTH_PATHS = r"^/(users/me|invoices|favorites|messages)(/|$|\?)"
+# Static files served by nginx without PHP (SPA assets, images).
+STATIC_PATH = re.compile(r"\.(js|mjs|css|map|png|jpe?g|gif|svg|webp|ico|woff2?|ttf|txt|html?)$", re.IGNORECASE)
+# k6 request IDs are "<prefix>-<vu>-<seq>" (load/k6/*.js): one VU = one client.
+K6_REQUEST_ID = re.compile(r"^(k6-[0-9a-z]+-\d+)-\d+$")
+COMBINED_LINE = re.compile(
+    r'^(?P<addr>\S+) \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<uri>\S+)[^"]*" '
+    r'(?P<status>\d{3}) \S+(?: "[^"]*" "(?P<ua>[^"]*)")?'
+)
+
+
+@dataclass
+class Request:
+    """One captured request, normalised across input formats."""
+
+    client: str
+    start: float  # epoch seconds
+    end: float
+    method: str
+    uri: str
+    status: int = 200
+
+
+# -----------------------------------------------------------------------------
+# Inputs
+# -----------------------------------------------------------------------------
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _client(obj: dict[str, Any]) -> str:
+    if obj.get("session"):
+        return str(obj["session"])
+    m = K6_REQUEST_ID.match(str(obj.get("request_id") or ""))
+    if m:
+        return m.group(1)
+    addr = obj.get("client") or obj.get("remote_addr") or "-"
+    return f"{addr}|{obj.get('user_agent') or ''}"
+
+
+def parse_line(line: str) -> Optional[Request]:
+    """Parse a `timing` log line, a JSONL capture line or a combined log line."""
+    start = line.find("{")
+    if start >= 0:
+        try:
+            obj = json.loads(line[start:])
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(obj, dict):
+            return None
+        uri = obj.get("uri") or obj.get("path") or obj.get("url")
+        ts = _number(obj.get("ts"))
+        if not isinstance(uri, str) or ts is None:
+            return None
+        status = int(_number(obj.get("status")) or 200)
+        duration = _number(obj.get("request_time") if "request_time" in obj else obj.get("seconds")) or 0.0
+        method = str(obj.get("method") or "GET").upper()
+        if "request_time" in obj:  # nginx logs $msec when the response is done
+            return Request(_client(obj), ts - duration, ts, method, uri, status)
+        return Request(_client(obj), ts, ts + duration, method, uri, status)
+
+    m = COMBINED_LINE.match(line)
+    if not m:
+        return None
+    try:
+        ts = datetime.strptime(m.group("time"), "%d/%b/%Y:%H:%M:%S %z").timestamp()
+    except ValueError:
+        return None
+    client = f"{m.group('addr')}|{m.group('ua') or ''}"
+    return Request(client, ts, ts, m.group("method"), m.group("uri"), int(m.group("status")))
+
+
+def read_requests(lines: Iterable[str]) -> Iterator[Request]:
+    """Yield parsed requests (unparseable lines are skipped)."""
+    for line in lines:
+        req = parse_line(line)
+        if req is not None:
+            yield req
+
+
+# -----------------------------------------------------------------------------
+# Learning
+# -----------------------------------------------------------------------------
+@dataclass
+class _Session:
+    last_seen: float
+    state: Optional[str] = None  # last replayable state
+    state_end: float = 0.0
+    steps: int = 0
+
+
+@dataclass
+class _StateStats:
+    method: str
+    path: str
+    count: int = 0
+    examples: list[str] = field(default_factory=list)
+
+    def offer(self, uri: str, size: int, rng: random.Random) -> None:
+        """Uniform reservoir of the state's URLs (repeats keep their weight)."""
+        if len(self.examples) < size:
+            self.examples.append(uri)
+            return
+        j = rng.randrange(self.count)
+        if j < size:
+            self.examples[j] = uri
+
+
+class JourneyLearner:
+    """Streamed sessionisation and transition / think-time counting.
+
+    Requests must be roughly chronological per client (as in any access log);
+    memory is bounded by the number of concurrently open sessions plus the
+    per-state counters.
+    """
+
+    def __init__(self, session_gap: float = 1800.0, auth_paths: str = DEFAULT_AUTH_PATHS, max_examples: int = 50) -> None:
+        self.session_gap = session_gap
+        self.auth_paths = re.compile(auth_paths)
+        self.max_examples = max_examples
+        self._rng = random.Random(0)
+        self.states: dict[str, _StateStats] = {}
+        self.start: dict[str, int] = {}
+        self.transitions: dict[str, dict[str, int]] = {}
+        self.think: dict[str, LogHistogram] = {}
+        self.session_steps = LogHistogram()
+        self.open: dict[str, _Session] = {}
+        self.requests = 0
+        self.skipped = 0
+        self.sessions = 0
+        self.first_ts = math.inf
+        self.last_ts = -math.inf
+
+    def _count(self, table: dict[str, int], key: str) -> None:
+        table[key] = table.get(key, 0) + 1
+
+    def _close(self, session: _Session) -> None:
+        if session.state is not None:
+            self._count(self.transitions.setdefault(session.state, {}), END)
+            self.sessions += 1
+            self.session_steps.add(float(session.steps))
+
+    def _sweep(self, now: float) -> None:
+        idle = [c for c, s in self.open.items() if now - s.last_seen > self.session_gap]
+        for client in idle:
+            self._close(self.open.pop(client))
+
+    def add(self, req: Request) -> None:
+        """Account one request to its client's session."""
+        self.requests += 1
+        if self.requests % SWEEP_EVERY == 0:
+            self._sweep(req.start)
+        self.first_ts = min(self.first_ts, req.start)
+        self.last_ts = max(self.last_ts, req.end)
+        session = self.open.get(req.client)
+        if session is not None and req.start - session.last_seen > self.session_gap:
+            self._close(session)
+            session = None
+        if session is None:
+            session = self.open[req.client] = _Session(last_seen=req.end)
+        session.last_seen = max(session.last_seen, req.end)
+
+        path = urlsplit(req.uri).path
+        if req.method not in REPLAYABLE_METHODS or req.status >= 500 or STATIC_PATH.search(path):
+            self.skipped += 1
+            return
+
+        state = endpoint_key(req.method, req.uri)
+        stats = self.states.get(state)
+        if stats is None:
+            template = state.split(" ", 1)[1].split("?", 1)[0]
+            stats = self.states[state] = _StateStats(req.method, template)
+        stats.count += 1
+        stats.offer(req.uri, self.max_examples, self._rng)
+
+        if session.state is None:
+            self._count(self.start, state)
+        else:
+            self._count(self.transitions.setdefault(session.state, {}), state)
+            think = self.think.get(session.state)
+            if think is None:
+                think = self.think[session.state] = LogHistogram()
+            think.add(max(req.start - session.state_end, 0.0) * 1000.0)
+        session.state, session.state_end = state, req.end
+        session.steps += 1
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Consume log / capture lines."""
+        for req in read_requests(lines):
+            self.add(req)
+
+    def finish(self) -> None:
+        """Close all sessions still open at the end of the input."""
+        for session in self.open.values():
+            self._close(session)
+        self.open.clear()
+
+    def model(self, min_count: int = 1, sources: Optional[list[str]] = None) -> dict[str, Any]:
+        """Return the workload model; states seen fewer than `min_count` times are dropped."""
+        kept = {k for k, s in self.states.items() if s.count >= min_count}
+        span_minutes = (self.last_ts - self.first_ts) / 60.0 if self.last_ts > self.first_ts else 0.0
+        steps = self.session_steps
+        return {
+            "format": FORMAT,
+            "source": sources or [],
+            "id_segment": ID_SEGMENT.pattern,
+            "session_gap_seconds": self.session_gap,
+            "requests": self.requests,
+            "skipped_requests": self.skipped,
+            "sessions": self.sessions,
+            "sessions_per_minute": round(self.sessions / span_minutes, 3) if span_minutes else None,
+            "session_steps": {
+                "mean": round(steps.mean, 2),
+                "p50": round(steps.quantile(0.5), 1),
+                "p95": round(steps.quantile(0.95), 1),
+            },
+            "states": {
+                k: {
+                    "method": s.method,
+                    "path": s.path,
+                    "count": s.count,
+                    "auth": bool(self.auth_paths.search(s.path)),
+                    "examples": s.examples,
+                }
+                for k, s in sorted(self.states.items())
+                if k in kept
+            },
+            "start": _normalise(self.start, kept),
+            "transitions": {k: _normalise(self.transitions.get(k, {}), kept | {END}) or {END: 1.0} for k in sorted(kept)},
+            "think_ms": {
+                k: [round(self.think[k].quantile(q), 1) for q in THINK_QUANTILES]
+                for k in sorted(kept)
+                if k in self.think and self.think[k].count
+            },
+        }
+
+
+def _normalise(counts: dict[str, int], keep: set[str]) -> dict[str, float]:
+    """Counts -> probabilities over `keep` (descending, rounded to 4 places)."""
+    counts = {k: n for k, n in counts.items() if k in keep}
+    total = sum(counts.values())
+    if not total:
+        return {}
+    return {k: round(n / total, 4) for k, n in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))}
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def print_model(model: dict[str, Any], top: int = 3, out: IO[str] = sys.stdout) -> None:
+    """Print states with start probability, top transitions and median think time."""
+    print(
+        f"{model['sessions']} session(s) from {model['requests']} request(s) "
+        f"({model['skipped_requests']} not replayable); "
+        f"steps/session mean {model['session_steps']['mean']}, p95 {model['session_steps']['p95']}",
+        file=out,
+    )
+    print(f"{'state':<36} {'n':>7} {'start':>6} {'think p50':>10}  next", file=out)
+    for state, info in sorted(model["states"].items(), key=lambda kv: -kv[1]["count"]):
+        think = model["think_ms"].get(state)
+        p50 = f"{think[len(think) // 2] / 1000.0:.1f}s" if think else "-"
+        nxt = ", ".join(f"{k} {p:.0%}" for k, p in list(model["transitions"][state].items())[:top])
+        print(f"{state[:36]:<36} {info['count']:>7} {model['start'].get(state, 0.0):>6.0%} {p50:>10}  {nxt}", file=out)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.workload_model",
+        description="Learn endpoint transition probabilities and think times from access logs / captures.",
+    )
+    parser.add_argument("inputs", nargs="+", help="log / JSONL capture files (.gz ok), or - for stdin")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help=f"default: {DEFAULT_OUTPUT}")
+    parser.add_argument("--session-gap", type=float, default=1800.0, help="inactivity (s) that ends a session")
+    parser.add_argument("--min-count", type=int, default=5, help="drop states seen fewer times")
+    parser.add_argument("--examples", type=int, default=50, help="concrete URLs sampled per state")
+    parser.add_argument("--auth-paths", default=DEFAULT_AUTH_PATHS, help="regex of paths replayed with the demo user's token")
+    parser.add_argument("--print", action="store_true", help="print the learned states")
+    args = parser.parse_args(argv)
+
+    learner = JourneyLearner(args.session_gap, args.auth_paths, args.examples)
+    for name in args.inputs:
+        if name == "-":
+            learner.feed(sys.stdin)
+            continue
+        path = Path(name)
+        if not path.is_file():
+            print(f"No such file: {path}", file=sys.stderr)
+            return 2
+        with open_ndjson(path) as fh:
+            learner.feed(fh)
+    learner.finish()
+
+    model = learner.model(args.min_count, sources=[n if n != "-" else "stdin" for n in args.inputs])
+    if not model["states"]:
+        print(f"No replayable sessions in {', '.join(args.inputs)} ({learner.requests} request(s) parsed)", file=sys.stderr)
+        return 1
+    write_json(args.output, model)
+    if args.print:
+        print_model(model)
+    print(f"{len(model['states'])} state(s), {model['sessions']} session(s) -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())